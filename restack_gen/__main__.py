@@ -57,6 +57,13 @@ def main(argv: Sequence[str] | None = None) -> int:
 
             return interactive_main(argv)
         else:
+            # Prefer a warm daemon (`restack-gen serve`) when one is running
+            from .daemon import try_forward
+
+            exit_code = try_forward(argv)
+            if exit_code is not None:
+                return exit_code
+
             from .cli import main as std_main
 
             return std_main(argv)
@@ -7,21 +7,31 @@ restack-gen code generator tool.
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import sys
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import IntEnum
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from .commands import CommandRegistry
 from .constants import Config, Language
-from .utils.console import Color, print_error, print_info, print_success
+from .utils.console import (
+    Color,
+    print_error,
+    print_info,
+    print_success,
+    print_warning,
+)
 from .utils.ui_components import with_progress_bar
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
-    from .commands.new import NewCommand
+
+    from .core.golden import GoldenProjectCache
+    from .core.manifest import ManifestEntry
+    from .core.workers import AdaptiveLimit, ProjectResult
 
 
 class ExitCode(IntEnum):
@@ -37,12 +47,20 @@ class ConcurrentProjectCreator:
 
     def __init__(self, config: Config) -> None:
         self.config = config
+        self._golden_cache: Optional[GoldenProjectCache] = None
+        self._limit: Optional[AdaptiveLimit] = None
 
     @with_progress_bar(description="[cyan]Creating projects...")
     def create_projects(
         self, project_names: "Sequence[str]", *, progress, description: str
     ) -> int:
-        """Create multiple projects concurrently with a progress bar."""
+        """Create multiple projects concurrently with a progress bar.
+
+        Workers capture their own output and hand back a ProjectResult;
+        all printing happens here, on the main thread.
+        """
+        from .core.workers import AdaptiveLimit, create_executor, default_jobs
+
         if not project_names:
             print_error("No project names provided for concurrent creation")
             return ExitCode.ERROR
@@ -50,82 +68,90 @@ class ConcurrentProjectCreator:
         results: dict[str, int] = {}
         total = len(project_names)
         task = progress.add_task(description, total=total)
-
-        with ThreadPoolExecutor() as executor:
-            future_to_name = {
-                executor.submit(self._create_single_project, name): name
-                for name in project_names
-            }
-
-            for future in as_completed(future_to_name):
-                name = future_to_name[future]
-                try:
-                    result_name, exit_code = future.result()
-                    results[result_name] = exit_code
-                    status = "✓" if exit_code == ExitCode.SUCCESS else "✗"
-                    progress.update(
-                        task, advance=1, description=f"[cyan]Processing {name}"
-                    )
-                    if not self.config.quiet:
-                        print_info(f"{status} {result_name}")
-                except Exception as e:
-                    results[name] = ExitCode.ERROR
-                    progress.update(task, advance=1, description=f"[red]Failed {name}")
-                    if not self.config.quiet:
-                        print_info(f"✗ {name}")
-                    if self.config.verbose:
-                        print_error(f"Error creating {name}: {e}")
-
+        executor = self.config.executor
+        maximum = self.config.jobs or default_jobs(executor)
+        self._limit = AdaptiveLimit(maximum, adaptive=self.config.jobs is None)
+        share_golden = len(project_names) >= 2
+        if executor == "thread":
+            self._golden_cache = self._create_golden_cache(project_names)
+        pool, work = create_executor(executor, maximum, self.config, share_golden)
+        work = work or self._create_single_project
+
+        pending = iter(project_names)
+        in_flight: dict = {}
+        try:
+            with pool:
+                while True:
+                    # Top up to the current limit, which adapts as we go
+                    for name in pending:
+                        in_flight[pool.submit(work, name)] = name
+                        if len(in_flight) >= self._limit.limit:
+                            break
+                    if not in_flight:
+                        break
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = in_flight.pop(future)
+                        self._handle_result(name, future, results, progress, task)
+        finally:
+            if self._golden_cache is not None:
+                self._golden_cache.close()
+                self._golden_cache = None
+            if executor == "process":
+                from .core.staging import reclaim
+
+                # Workers delete their golden projects on exit; finish
+                # the job for any that were stopped before they could
+                reclaim(Path(self.config.cwd or Path.cwd()))
         return self._report_results(results)
 
-    def _create_single_project(self, name: str) -> tuple[str, int]:
-        """Create a single project and handle cleanup on failure.
-
-        Args:
-            name: Project name to create.
-
-        Returns:
-            Tuple of (project_name, exit_code).
-        """
-        from .commands.new import NewCommand
-
-        cmd = NewCommand(self.config)
-
+    def _handle_result(self, name: str, future, results, progress, task) -> None:
+        """Record and print one finished project."""
         try:
-            exit_code = cmd.execute([name])
-
-            if exit_code != ExitCode.SUCCESS:
-                self._cleanup_failed_project(cmd, name)
-
-            return (name, exit_code)
-
+            result = future.result()
         except Exception as e:
+            results[name] = ExitCode.ERROR
+            progress.update(task, advance=1, description=f"[red]Failed {name}")
+            if not self.config.quiet:
+                print_info(f"✗ {name}")
             if self.config.verbose:
-                print_error(f"Exception while creating {name}: {e}")
-                traceback.print_exc()
+                print_error(f"Error creating {name}: {e}")
+            return
+        results[result.name] = result.exit_code
+        self._limit.record(result.seconds)
+        ok = result.exit_code == ExitCode.SUCCESS
+        progress.update(task, advance=1, description=f"[cyan]Processing {name}")
+        if not self.config.quiet:
+            print_info(f"{'✓' if ok else '✗'} {result.name}")
+        # Successful projects are summarized; their details only when verbose
+        if result.output and (self.config.verbose or not ok):
+            sys.stdout.write(result.output)
+
+    def _create_golden_cache(
+        self, project_names: "Sequence[str]"
+    ) -> Optional[GoldenProjectCache]:
+        """Share a golden project across a batch of two or more projects."""
+        if len(project_names) < 2:
+            return None
+        from .core.golden import GoldenProjectCache
+
+        return GoldenProjectCache(Path(self.config.cwd or Path.cwd()))
 
-            self._cleanup_failed_project(cmd, name)
-            return (name, ExitCode.ERROR)
+    def _create_single_project(self, name: str) -> ProjectResult:
+        """Create a single project on a worker thread.
 
-    def _cleanup_failed_project(self, cmd: "NewCommand", name: str) -> None:
-        """Clean up project directory after creation failure.
+        NewCommand builds each project in a staging directory and only
+        publishes it on success, so failures need no cleanup here.
 
         Args:
-            cmd: NewCommand instance.
-            name: Project name.
+            name: Project name to create.
+
+        Returns:
+            ProjectResult with the exit code and the captured output.
         """
-        import shutil
+        from .core.workers import create_project
 
-        try:
-            # TODO: This accesses a private method - should be refactored
-            # Consider making get_app_directory public or handling cleanup
-            # inside NewCommand itself
-            app_dir = cmd._get_app_directory(name)
-            if app_dir.exists():
-                shutil.rmtree(app_dir, ignore_errors=True)
-        except Exception as e:
-            if self.config.verbose:
-                print_error(f"Failed to cleanup {name}: {e}")
+        return create_project(self.config, name, self._golden_cache)
 
     def _report_results(self, results: dict[str, int]) -> int:
         """Report final results and return appropriate exit code.
@@ -141,6 +167,22 @@ class ConcurrentProjectCreator:
         ]
         failed = [name for name, code in results.items() if code != ExitCode.SUCCESS]
 
+        if self.config.verbose and self._limit is not None:
+            print_info(
+                f"Workers: {self.config.executor} pool, "
+                f"{self._limit.limit}/{self._limit.maximum} in flight at the end, "
+                f"mean latency {self._limit.mean_latency:.2f}s per project"
+            )
+        # Process workers keep their own engines; the pool here is unused
+        if self.config.verbose and self.config.executor == "thread":
+            from .core.templates import get_engine_pool
+
+            stats = get_engine_pool().stats()
+            print_info(
+                f"Template cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"across {stats['engines']} engine(s)"
+            )
+
         if failed:
             print_error(f"Failed to create: {', '.join(failed)}")
             if successful and not self.config.quiet:
@@ -153,6 +195,158 @@ class ConcurrentProjectCreator:
         return ExitCode.SUCCESS
 
 
+class ManifestProjectCreator:
+    """Creates the projects listed in a JSONL manifest.
+
+    Entries are streamed with a bounded number in flight, so memory stays
+    flat however long the manifest is. Outcomes go to a journal next to the
+    manifest, which lets an interrupted run resume.
+    """
+
+    def __init__(self, config: Config, jobs: Optional[int] = None) -> None:
+        self.config = config
+        from .core.workers import default_jobs
+
+        self.jobs = jobs or config.jobs or default_jobs("thread")
+        self.base = Path(config.cwd or Path.cwd()).resolve()
+        self._golden_cache: Optional[GoldenProjectCache] = None
+
+    def create_from_manifest(self, manifest_path: Path) -> int:
+        from .core.golden import GoldenProjectCache
+        from .core.manifest import Journal, ManifestError, iter_manifest, parse_entry
+
+        manifest_path = Path(manifest_path)
+        if not manifest_path.is_file():
+            print_error(f"Manifest not found: {manifest_path}")
+            return ExitCode.ERROR
+
+        journal = Journal(manifest_path)
+        done = journal.load()
+        counts = {"created": 0, "skipped": 0, "failed": 0}
+        self._golden_cache = GoldenProjectCache(self.base)
+        pending: dict = {}
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        try:
+            warned = False
+            for line_no, text in iter_manifest(manifest_path):
+                try:
+                    entry = parse_entry(line_no, text)
+                except ManifestError as e:
+                    counts["failed"] += 1
+                    print_error(str(e))
+                    if not self.config.dry_run:
+                        journal.record(line_no, "", "failed", str(e))
+                    continue
+                if done.matches(line_no, entry.name):
+                    counts["skipped"] += 1
+                    continue
+                if line_no in done and not warned:
+                    warned = True
+                    print_warning(
+                        f"{manifest_path.name} changed since {journal.path.name} was "
+                        f"written (line {line_no} is now {entry.name!r}); entries "
+                        "whose line moved are not skipped"
+                    )
+                if self.config.dry_run:
+                    print_info(f"Would create {self._target(entry)}")
+                    continue
+                future = executor.submit(self._create_entry, entry)
+                pending[future] = entry
+                # Keep at most two entries per worker queued
+                if len(pending) >= self.jobs * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    self._settle(finished, pending, journal, counts)
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                self._settle(finished, pending, journal, counts)
+        except KeyboardInterrupt:
+            # Entries already recorded stay done; the rest run on resume.
+            # Running entries finish, so journal them or resume would fail
+            # them on their existing directories.
+            executor.shutdown(wait=True, cancel_futures=True)
+            ran = [f for f in pending if f.done() and not f.cancelled()]
+            self._settle(ran, pending, journal, counts)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            journal.close()
+            self._golden_cache.close()
+            self._golden_cache = None
+
+        return self._report_results(counts, journal)
+
+    def _target(self, entry: ManifestEntry) -> Path:
+        return self._entry_cwd(entry) / entry.name
+
+    def _entry_cwd(self, entry: ManifestEntry) -> Path:
+        if entry.cwd is None:
+            return self.base
+        return entry.cwd if entry.cwd.is_absolute() else self.base / entry.cwd
+
+    def _create_entry(self, entry: ManifestEntry) -> int:
+        """Create one manifest entry; runs on a worker thread."""
+        from .commands.new import NewCommand
+
+        cwd = self._entry_cwd(entry)
+        config = dataclasses.replace(
+            self.config,
+            lang=entry.lang or self.config.lang,
+            package_manager=entry.package_manager or self.config.package_manager,
+            cwd=cwd,
+            # Progress is reported per entry by the creator
+            quiet=True,
+        )
+        cwd.mkdir(parents=True, exist_ok=True)
+        cmd = NewCommand(config)
+        cmd.toml_overrides = entry.toml
+        # Golden directories live in the base directory; clones must stay
+        # on the same filesystem, so only share them with entries there
+        if cwd == self.base:
+            cmd.golden_cache = self._golden_cache
+        return cmd.execute([entry.name])
+
+    def _settle(self, finished, pending: dict, journal, counts: dict) -> None:
+        for future in finished:
+            entry = pending.pop(future)
+            try:
+                exit_code = future.result()
+                error = "" if exit_code == ExitCode.SUCCESS else "creation failed"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if self.config.verbose:
+                    print_error(f"Error creating {entry.name}: {e}")
+            if error:
+                counts["failed"] += 1
+                journal.record(entry.line, entry.name, "failed", error)
+            else:
+                counts["created"] += 1
+                journal.record(entry.line, entry.name, "ok")
+            if not self.config.quiet:
+                print_info(f"{'✗' if error else '✓'} {entry.name}")
+
+    def _report_results(self, counts: dict, journal) -> int:
+        summary = (
+            f"{counts['created']} created, {counts['skipped']} skipped, "
+            f"{counts['failed']} failed"
+        )
+        if counts["failed"]:
+            print_error(
+                f"Manifest finished with failures: {summary}",
+                hint=f"Fix the entries and re-run to resume (journal: {journal.path})",
+            )
+            return ExitCode.ERROR
+        if not self.config.quiet:
+            print_success(f"Manifest complete: {summary}")
+        return ExitCode.SUCCESS
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser.
 
@@ -185,6 +379,37 @@ def create_parser() -> argparse.ArgumentParser:
         metavar="NAME",
         help="Create multiple projects concurrently",
     )
+    parser.add_argument(
+        "--from-manifest",
+        type=Path,
+        metavar="PATH",
+        help="Create the projects listed in a JSONL manifest (resumable)",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        metavar="N",
+        help="Number of projects to create in parallel (default: adaptive)",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Worker pool for --concurrent-new (process scales across cores)",
+    )
+    parser.add_argument(
+        "--workspace",
+        type=Path,
+        metavar="PATH",
+        help="Upgrade every restack-gen project under PATH",
+    )
+    parser.add_argument(
+        "--from-file",
+        type=Path,
+        metavar="PATH",
+        help="Generate the components listed in a TOML file",
+    )
 
     # Configuration options
     parser.add_argument(
@@ -235,6 +460,17 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "--json",
+        dest="json_output",
+        action="store_true",
+        help="Print JSON for tooling (routes)",
+    )
+    parser.add_argument(
+        "--graph",
+        action="store_true",
+        help="Print the component call graph (routes), as DOT or with --json JSON",
+    )
     parser.add_argument(
         "--no-color",
         action="store_true",
@@ -271,6 +507,12 @@ def build_config(args: argparse.Namespace) -> Config:
         dry_run=args.dry_run,
         verbose=args.verbose,
         no_color=args.no_color,
+        jobs=args.jobs,
+        executor=args.executor,
+        workspace=args.workspace,
+        from_file=args.from_file,
+        json_output=args.json_output,
+        graph=args.graph,
     )
 
 
@@ -291,6 +533,20 @@ def handle_concurrent_new(
     return creator.create_projects(project_names)
 
 
+def handle_manifest_new(manifest_path: Path, config: Config) -> int:
+    """Handle project creation from a JSONL manifest.
+
+    Args:
+        manifest_path: Path to the manifest file.
+        config: Configuration object; entries may override lang, pm and cwd.
+
+    Returns:
+        Exit code.
+    """
+    creator = ManifestProjectCreator(config)
+    return creator.create_from_manifest(manifest_path)
+
+
 def execute_command(command_name: str, args: list[str], config: Config) -> int:
     """Execute a single command.
 
@@ -358,6 +614,17 @@ def main(argv: Sequence[str] | None = None) -> int:
             config = build_config(args)
             return handle_concurrent_new(args.concurrent_new, config)
 
+        # Handle manifest-driven project creation
+        if args.from_manifest is not None:
+            if args.command not in (None, "new") or args.args:
+                print_error(
+                    "--from-manifest cannot be combined with other commands "
+                    "or project names",
+                    hint="Usage: restack-gen new --from-manifest projects.jsonl",
+                )
+                return ExitCode.ERROR
+            return handle_manifest_new(args.from_manifest, build_config(args))
+
         # Show help if requested or no command given
         if args.help or not args.command:
             return show_help()
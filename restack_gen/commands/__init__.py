@@ -2,54 +2,89 @@
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
 
+from importlib import import_module
 from typing import Optional, Dict, Type
 from .base import Command
 from ..constants import Config
 
+# Built-in commands as "module:Class" specs; modules are imported on demand
+BUILTIN_COMMANDS: Dict[str, str] = {
+    "new": "restack_gen.commands.new:NewCommand",
+    "g": "restack_gen.commands.generate:GenerateCommand",
+    "generate": "restack_gen.commands.generate:GenerateCommand",
+    "routes": "restack_gen.commands.routes:RoutesCommand",
+    "dev": "restack_gen.commands.dev:DevCommand",
+    "build": "restack_gen.commands.build:BuildCommand",
+    "test": "restack_gen.commands.test:RestackTestsCommand",
+    "doctor": "restack_gen.commands.doctor:DoctorCommand",
+    "version": "restack_gen.commands.info:VersionCommand",
+    "list-templates": "restack_gen.commands.info:ListTemplatesCommand",
+    "ls-templates": "restack_gen.commands.info:ListTemplatesCommand",
+    "help": "restack_gen.commands.info:HelpCommand",
+    "telemetry": "restack_gen.commands.info:TelemetryCommand",
+    "serve": "restack_gen.commands.serve:ServeCommand",
+    "cache": "restack_gen.commands.cache:CacheCommand",
+    "sync": "restack_gen.commands.sync:SyncCommand",
+    "upgrade": "restack_gen.commands.upgrade:UpgradeCommand",
+}
+
+
+def load_command_class(spec: str) -> Type[Command]:
+    """Import and return the command class named by a "module:Class" spec."""
+    module_name, _, class_name = spec.partition(":")
+    if not module_name or not class_name:
+        raise ValueError(f"Invalid command spec: {spec!r}")
+    return getattr(import_module(module_name), class_name)
+
 
 class CommandRegistry:
-    """Registry of all available commands."""
+    """Registry of all available commands.
 
-    def __init__(self, config: Config):
+    Commands are stored as "module:Class" specs and imported only when
+    requested, so running one command does not pay for importing all others.
+    """
+
+    def __init__(self, config: Config, load_plugins: bool = True):
         self.config = config
-        self._commands: Dict[str, Type[Command]] = {}
-        self._register_commands()
+        self._commands: Dict[str, str] = {}
+        self._plugins: Dict[str, str] = {}
+        self._classes: Dict[str, Type[Command]] = {}
+        self._register_commands(load_plugins)
+
+    def _register_commands(self, load_plugins: bool = True):
+        """Register built-in commands and any plugin entry points."""
+        self._commands = dict(BUILTIN_COMMANDS)
+        if not load_plugins:
+            return
+        from .plugins import PluginManifest
+
+        for name, spec in PluginManifest().load().items():
+            # Built-ins always win so a plugin cannot shadow core commands
+            if name not in self._commands:
+                self._commands[name] = spec
+                self._plugins[name] = spec
 
-    def _register_commands(self):
-        """Register all available commands."""
-        from .new import NewCommand
-        from .generate import GenerateCommand
-        from .routes import RoutesCommand
-        from .dev import DevCommand
-        from .build import BuildCommand
-        from .test import RestackTestsCommand
-        from .doctor import DoctorCommand
-        from .info import (
-            VersionCommand,
-            HelpCommand,
-            ListTemplatesCommand,
-            TelemetryCommand,
-        )
+    def get_class(self, command: str) -> Optional[Type[Command]]:
+        """Resolve a command name to its class, importing it on first use."""
+        spec = self._commands.get(command)
+        if spec is None:
+            return None
+        if spec not in self._classes:
+            try:
+                self._classes[spec] = load_command_class(spec)
+            except (ImportError, AttributeError):
+                if command not in self._plugins:
+                    raise
+                # Stale manifest entry (plugin uninstalled); rescan next start
+                from .plugins import PluginManifest
 
-        self._commands = {
-            "new": NewCommand,
-            "g": GenerateCommand,
-            "generate": GenerateCommand,
-            "routes": RoutesCommand,
-            "dev": DevCommand,
-            "build": BuildCommand,
-            "test": RestackTestsCommand,
-            "doctor": DoctorCommand,
-            "version": VersionCommand,
-            "list-templates": ListTemplatesCommand,
-            "ls-templates": ListTemplatesCommand,
-            "help": HelpCommand,
-            "telemetry": TelemetryCommand,
-        }
+                PluginManifest().invalidate()
+                return None
+        return self._classes[spec]
 
     def get(self, command: str) -> Optional[Command]:
         """Get command instance."""
-        command_class = self._commands.get(command)
+        command_class = self.get_class(command)
         if command_class:
             return command_class(self.config)
         return None
@@ -58,8 +93,8 @@ class CommandRegistry:
         """List all unique command names."""
         seen = set()
         commands = []
-        for name, cmd_class in self._commands.items():
-            if cmd_class not in seen:
+        for name, spec in self._commands.items():
+            if spec not in seen:
                 commands.append(name)
-                seen.add(cmd_class)
+                seen.add(spec)
         return sorted(commands)
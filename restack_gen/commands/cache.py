@@ -0,0 +1,63 @@
+"""`restack-gen cache`: inspect and reset on-disk caches."""
+
+from __future__ import annotations
+
+from .base import Command
+from ..utils.console import Color, print_error, print_success
+
+
+def _format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+class CacheCommand(Command):
+    """Show statistics for, or clear, the template bytecode and render caches."""
+
+    def execute(self, args: list[str]) -> int:
+        from ..core.bytecode import TemplateBytecodeCache
+
+        cache = TemplateBytecodeCache()
+        subcommand = args[0].lower() if args else "stats"
+        if subcommand in ("stats", "show"):
+            return self._show_stats(cache)
+        if subcommand == "clear":
+            return self._clear(cache)
+        print_error(f"Unknown cache subcommand: {subcommand}")
+        print("Usage: restack-gen cache [stats|clear]")
+        return 1
+
+    def _show_stats(self, cache) -> int:
+        """Print cache location, entry count and size."""
+        stats = cache.stats()
+        print(f"{Color.BOLD}Template bytecode cache:{Color.RESET}")
+        print(f"  Directory: {stats['directory']}")
+        print(f"  Entries:   {stats['entries']}")
+        print(
+            f"  Size:      {_format_size(stats['size'])} "
+            f"(limit {_format_size(stats['max_size'])})"
+        )
+        from ..core.render_cache import RenderCache, render_cache_dir
+
+        render_stats = RenderCache(directory=render_cache_dir()).stats()
+        print(f"{Color.BOLD}Render cache (disk tier):{Color.RESET}")
+        print(f"  Directory: {render_stats['directory']}")
+        print(f"  Entries:   {render_stats['disk_entries']}")
+        return 0
+
+    def _clear(self, cache) -> int:
+        """Remove every cached entry."""
+        from ..core.render_cache import RenderCache, render_cache_dir
+
+        renders = RenderCache(directory=render_cache_dir())
+        entries = cache.stats()["entries"] + renders.stats()["disk_entries"]
+        if self.config.dry_run:
+            self.dry_run_log(f"Would remove {entries} cached template(s)")
+            return 0
+        cache.clear()
+        renders.clear()
+        print_success(f"Cleared {entries} cached template(s)")
+        return 0
@@ -2,57 +2,149 @@
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
 import subprocess
+from pathlib import Path
+from typing import Optional
+
 from .base import Command
 from ..core.project import ProjectStructure
 from ..utils.console import print_error, print_info, print_warning
 
 
 class DevCommand(Command):
-    """Start development server."""
+    """Start development server.
 
-    def execute(self, args: list[str]) -> int:
-        import sys
-        import shutil
+    With a worker to run (service.py, or src/server.ts in a TypeScript
+    project), the engine and the worker run under a supervisor that
+    restarts the worker when a module it imports changes. Otherwise the
+    engine script is run in the foreground.
+    """
 
+    def execute(self, args: list[str]) -> int:
         project = ProjectStructure(self.config.cwd)
-        run_script_sh = project.scripts_dir / "run_engine.sh"
-        run_script_bat = project.scripts_dir / "run_engine.bat"
-        script_to_run = None
-        if sys.platform.startswith("win") and run_script_bat.exists():
-            script_to_run = run_script_bat
-        elif run_script_sh.exists():
-            script_to_run = run_script_sh
-        if not script_to_run:
+        script_to_run = self._find_script(project)
+        worker = self._worker(project.root)
+        if not script_to_run and worker is None:
             print_warning(
                 "No run_engine script found (scripts/run_engine.sh or scripts/run_engine.bat)"
             )
             print("Create one of these scripts to start your local engine")
             return 1
+        if worker is not None:
+            return self._supervise(project, script_to_run, *worker)
         if self.config.dry_run:
             self.dry_run_log(f"Would execute: {script_to_run}")
             return 0
         try:
             print_info("Starting local engine...")
-            if sys.platform.startswith("win") and script_to_run.suffix == ".bat":
-                result = subprocess.run(
-                    [str(script_to_run)], cwd=project.root, shell=True
+            command = self._engine_command(script_to_run)
+            if command is None:
+                return 1
+            result = subprocess.run(command[0], cwd=project.root, shell=command[1])
+            return result.returncode
+        except Exception as e:
+            print_error(f"Failed to start dev server: {e}")
+            return 1
+
+    def _find_script(self, project: ProjectStructure) -> Optional[Path]:
+        import sys
+
+        run_script_sh = project.scripts_dir / "run_engine.sh"
+        run_script_bat = project.scripts_dir / "run_engine.bat"
+        if sys.platform.startswith("win") and run_script_bat.exists():
+            return run_script_bat
+        if run_script_sh.exists():
+            return run_script_sh
+        return None
+
+    def _engine_command(self, script: Path) -> Optional[tuple[list[str], bool]]:
+        """(argv, shell) running the engine script on this platform."""
+        import shutil
+        import sys
+
+        if sys.platform.startswith("win") and script.suffix == ".bat":
+            return [str(script)], True
+        if sys.platform.startswith("win") and script.suffix == ".sh":
+            bash_path = shutil.which("bash")
+            if not bash_path:
+                print_error(
+                    "Bash is required to run .sh scripts on Windows. Please install Git Bash or WSL."
                 )
-                return result.returncode
-            elif sys.platform.startswith("win") and script_to_run.suffix == ".sh":
-                bash_path = shutil.which("bash")
-                if bash_path:
-                    result = subprocess.run(
-                        [bash_path, str(script_to_run)], cwd=project.root
-                    )
-                    return result.returncode
-                else:
-                    print_error(
-                        "Bash is required to run .sh scripts on Windows. Please install Git Bash or WSL."
-                    )
-                    return 1
-            else:
-                result = subprocess.run([str(script_to_run)], cwd=project.root)
-                return result.returncode
+                return None
+            return [bash_path, str(script)], False
+        return [str(script)], False
+
+    def _worker(self, root: Path) -> Optional[tuple[list[str], str]]:
+        """(argv, entry module) of the project's worker, if it has one."""
+        import shutil
+        import sys
+
+        from ..constants import Language
+        from ..core.project import recorded_language
+
+        if (
+            recorded_language(root) == Language.TYPESCRIPT
+            and (root / "src" / "server.ts").is_file()
+            and shutil.which("npx")
+        ):
+            return [shutil.which("npx"), "tsx", "src/server.ts"], "src/server.ts"
+        if not (root / "service.py").is_file():
+            return None
+        python = sys.executable
+        for venv_python in (".venv/bin/python", ".venv/Scripts/python.exe"):
+            if (root / venv_python).is_file():
+                python = str(root / venv_python)
+                break
+        return [python, "service.py"], "service.py"
+
+    def _supervise(
+        self,
+        project: ProjectStructure,
+        script: Optional[Path],
+        worker: list[str],
+        entry: str,
+    ) -> int:
+        from ..core.supervisor import Supervisor
+        from ..core.watch import open_watcher
+
+        root = project.root
+        worker_display = " ".join([Path(worker[0]).name, *worker[1:]])
+        if self.config.dry_run:
+            if script:
+                self.dry_run_log(f"Would execute: {script}")
+            self.dry_run_log(
+                f"Would run {worker_display}, restarting it when a module it "
+                "imports changes"
+            )
+            return 0
+        engine = None
+        if script is None:
+            print_warning("No run_engine script found; starting the worker only")
+        else:
+            engine = self._engine_command(script)
+            if engine is None:
+                return 1
+        try:
+            watcher = open_watcher(root, [root / "src"])
+            supervisor = Supervisor(
+                root,
+                worker,
+                entry,
+                watcher,
+                engine=engine[0] if engine else None,
+                engine_shell=engine[1] if engine else False,
+                log=print_info,
+            )
+            if engine:
+                print_info("Starting local engine...")
+            print_info(
+                f"Running {worker_display}; reloading on changes ({watcher.kind}), "
+                "Ctrl-C to stop"
+            )
+            code = supervisor.run()
         except Exception as e:
             print_error(f"Failed to start dev server: {e}")
             return 1
+        summary = supervisor.summary()
+        if summary:
+            print_info(summary)
+        return code
@@ -5,28 +5,112 @@ from typing import Optional
 from pathlib import Path
 from .base import Command
 from ..constants import GenerationType, Language
-from ..core.project import ProjectStructure
-from ..core.templates import TemplateEngine, build_template_context
+from ..core.index import ComponentIndex
+from ..core.lockfile import GenerationLock
+from ..core.pipeline import FileJob
+from ..core.plan import GenerationPlan
+from ..core.project import ProjectStructure, recorded_language, scan_language
+from ..core.templates import (
+    TEMPLATES_ROOT,
+    TemplateEngine,
+    build_template_context,
+    get_engine,
+    template_pack_exists,
+)
 from ..core.validation import Validator
-from ..utils.console import print_error, print_success, confirm
+from ..utils.console import (
+    confirm,
+    print_error,
+    print_info,
+    print_success,
+    print_warning,
+)
+from ..utils.toml import TOMLLoader
 
 
 class GenerateCommand(Command):
     """Generate code components."""
 
+    _TYPE_VALUES = frozenset(t.value for t in GenerationType)
+
     def execute(self, args: list[str]) -> int:
+        if self.config.from_file is not None:
+            if args:
+                print_error("--from-file cannot be combined with components")
+                return 1
+            components = self._load_components_file(Path(self.config.from_file))
+            if components is None:
+                return 1
+            if not components:
+                print_warning(f"No components listed in {self.config.from_file}")
+                return 0
+            return self._generate_batch(components)
         if len(args) < 2:
             print_error("Type and name required")
-            print("Usage: restack-gen g <type> <name> [options]")
-            return 1
-        gen_type_str, gen_name = args[0], args[1]
-        # Validate and execute
-        gen_type = self._validate_type(gen_type_str)
-        if not gen_type:
+            print("Usage: restack-gen g <type> <name> [<name>...] [<type> <name>...]")
             return 1
-        if not self._validate_name(gen_name):
+        components = self._parse_components(args)
+        if components is None:
             return 1
-        return self._generate(gen_type, gen_name)
+        if len(components) == 1:
+            return self._generate(*components[0])
+        return self._generate_batch(components)
+
+    def _parse_components(
+        self, args: list[str]
+    ) -> "Optional[list[tuple[GenerationType, str]]]":
+        """Parse ``<type> <name>... [<type> <name>...]`` into (type, name) pairs."""
+        gen_type = self._validate_type(args[0])
+        if not gen_type:
+            return None
+        components = []
+        names = 0
+        for arg in args[1:]:
+            if arg in self._TYPE_VALUES:
+                if not names:
+                    break
+                gen_type, names = GenerationType(arg), 0
+                continue
+            if not self._validate_name(arg):
+                return None
+            components.append((gen_type, arg))
+            names += 1
+        if not names:
+            print_error(f"No names given for {gen_type.value}")
+            return None
+        return components
+
+    def _load_components_file(
+        self, path: Path
+    ) -> "Optional[list[tuple[GenerationType, str]]]":
+        """Read components from a TOML file of ``<type> = [names]`` entries.
+
+        Keys may be singular or plural (``agent`` or ``agents``); a single
+        name may be given as a string.
+        """
+        try:
+            data = TOMLLoader.load(path)
+        except (FileNotFoundError, ValueError) as e:
+            print_error(str(e))
+            return None
+        data = data.get("components", data)
+        components = []
+        for key, names in data.items():
+            gen_type = self._validate_type(key[:-1] if key.endswith("s") else key)
+            if not gen_type:
+                return None
+            if isinstance(names, str):
+                names = [names]
+            if not isinstance(names, list) or not all(
+                isinstance(n, str) for n in names
+            ):
+                print_error(f"{path}: {key} must be a list of names")
+                return None
+            for name in names:
+                if not self._validate_name(name):
+                    return None
+                components.append((gen_type, name))
+        return components
 
     def _validate_type(self, gen_type_str: str) -> "Optional[GenerationType]":
         """Validate generation type."""
@@ -48,29 +132,81 @@ class GenerateCommand(Command):
 
     def _generate(self, gen_type: GenerationType, gen_name: str) -> int:
         """Perform the generation."""
+        return self._generate_batch([(gen_type, gen_name)])
+
+    def _generate_batch(self, components: list[tuple[GenerationType, str]]) -> int:
+        """Generate several components as one plan.
+
+        The project is scanned and the template engine set up once for
+        the whole batch, and every file is written by a single plan
+        execution instead of one per component.
+        """
         try:
             # Always use the provided --cwd (project root) as the base for ProjectStructure, resolved absolutely
             project_root = (
                 Path(self.config.cwd).resolve() if self.config.cwd else Path.cwd()
             )
             project = ProjectStructure(project_root)
-            # Ensure per-project src/ structure exists
-            project.ensure_structure()
-            lang = self._detect_language(project)
+            index = ComponentIndex.load(project.root, save=not self.config.dry_run)
+            lang = self._detect_language(project, index)
             engine = self._setup_engine(lang)
-            output_file = self._get_output_path(project, gen_type, gen_name, lang)
-            if not self._check_overwrite(output_file):
+            # Per-project src/ structure is created alongside the files
+            plan = GenerationPlan(project.root, project.structure_dirs())
+            names: dict[Path, str] = {}
+            kinds: dict[Path, GenerationType] = {}
+            for gen_type, gen_name in components:
+                output_file = self._get_output_path(project, gen_type, gen_name, lang)
+                if output_file in names:
+                    print_warning(f"Listed twice, generating once: {gen_name}")
+                    continue
+                self._warn_name_collision(index, gen_type, output_file.stem)
+                if not self._check_overwrite(output_file):
+                    continue
+                context = build_template_context(gen_name, app_name=project.root.name)
+                template_name = f"{gen_type.value}.{lang.value}.j2"
+                plan.add(FileJob(output_file, template_name, context, engine=engine))
+                names[output_file] = gen_name
+                kinds[output_file] = gen_type
+            if not plan.files:
                 return 0
             if self.config.dry_run:
-                self.dry_run_log(f"Would generate {gen_type.value}: {output_file}")
+                for line in plan.describe():
+                    self.dry_run_log(line)
+                self._register(project.root, lang, plan, kinds, names)
                 return 0
-            # Render and write
-            context = build_template_context(gen_name, app_name=project_root.name)
-            template_name = f"{gen_type.value}.{lang.value}.j2"
-            content = engine.render(template_name, context)
-            output_file.write_text(content, encoding="utf-8")
-            print_success(f"Generated {gen_type.value}: {output_file}")
-            return 0
+            timings = plan.execute()
+            failed = [t for t in timings if not t.ok]
+            if failed and len(timings) == 1:
+                raise failed[0].error
+            self._record_lock(project.root, lang, plan, names)
+            index.update(t.job.path for t in timings if t.ok)
+            index.save()
+            for timing in timings:
+                output_file = timing.job.path
+                if not timing.ok:
+                    print_error(f"Failed to generate {output_file}: {timing.error}")
+                elif self.config.quiet and len(timings) > 1:
+                    continue
+                elif timing.skipped:
+                    print_success(f"Up to date, write skipped: {output_file}")
+                else:
+                    kind = kinds[output_file].value
+                    print_success(f"Generated {kind}: {output_file}")
+            if len(timings) > 1 and not self.config.quiet:
+                print_info(
+                    f"Generated {len(timings) - len(failed)} of {len(timings)} "
+                    f"component(s)"
+                )
+            # One edit of service.py / routes.ts for the whole batch
+            written = {t.job.path for t in timings if t.ok}
+            self._register(
+                project.root,
+                lang,
+                plan,
+                {p: k for p, k in kinds.items() if p in written},
+                names,
+            )
+            return 1 if failed else 0
         except Exception as e:
             print_error(f"Failed to generate code: {e}")
             if self.config.verbose:
@@ -79,23 +215,89 @@ class GenerateCommand(Command):
                 traceback.print_exc()
             return 1
 
-    def _detect_language(self, project: ProjectStructure) -> Language:
-        """Detect project language from files."""
+    def _record_lock(
+        self,
+        root: Path,
+        lang: Language,
+        plan: GenerationPlan,
+        names: dict[Path, str],
+    ):
+        """Add the generated components to the project's lock file."""
+        try:
+            lock = GenerationLock.find(root) or GenerationLock(root, lang.value)
+        except ValueError as e:
+            print_warning(f"Not updating lock file: {e}")
+            return
+        lock.record_plan(plan, components=names)
+        lock.save()
+
+    def _register(
+        self,
+        root: Path,
+        lang: Language,
+        plan: GenerationPlan,
+        kinds: dict[Path, GenerationType],
+        names: dict[Path, str],
+    ) -> None:
+        """Add the generated components to service.py or routes.ts."""
+        from ..core.registry import Registration, component_symbol, register_components
+
+        # Content rendered for --dry-run; written files are read back
+        sources = {planned.path: planned.content for planned in plan.files}
+        registrations = []
+        for path, gen_type in kinds.items():
+            rel = path.relative_to(root).as_posix()
+            symbol = component_symbol(path, gen_type.value, sources.get(path))
+            if symbol is None:
+                print_warning(f"Not registering {rel}: no {gen_type.value} defined")
+                continue
+            registrations.append(Registration(gen_type.value, rel, symbol, names[path]))
+        if not registrations:
+            return
+        update = register_components(
+            root, lang, registrations, dry_run=self.config.dry_run
+        )
+        for problem in update.problems:
+            print_warning(f"Not registered: {problem}")
+        if not update.added:
+            return
+        rel = update.path.relative_to(root).as_posix()
+        symbols = ", ".join(r.symbol for r in update.added)
+        if self.config.dry_run:
+            self.dry_run_log(f"Would register {symbols} in {rel}")
+        else:
+            self.log(f"Registered {symbols} in {rel}")
+
+    def _detect_language(
+        self, project: ProjectStructure, index: "Optional[ComponentIndex]" = None
+    ) -> Language:
+        """Detect project language from its metadata or source files."""
         if self.config.lang:
             return self.config.lang
-        if list(project.src_dir.glob("**/*.py")):
-            return Language.PYTHON
-        if list(project.src_dir.glob("**/*.ts")):
-            return Language.TYPESCRIPT
-        return Language.PYTHON
+        # Metadata first: reading one file beats walking a large src/ tree
+        root = project.src_dir.parent
+        indexed = index.language() if index is not None else None
+        return (
+            recorded_language(root)
+            or (Language(indexed) if indexed else None)
+            or scan_language(project.src_dir)
+            or Language.PYTHON
+        )
+
+    def _warn_name_collision(
+        self, index: ComponentIndex, gen_type: GenerationType, module: str
+    ) -> None:
+        """Warn when another kind of component already uses the module name."""
+        for rel, entry in index.named(module).items():
+            if entry.kind != gen_type.value:
+                print_warning(f"Name {module} is already used by {rel}")
 
     def _setup_engine(self, lang: Language) -> TemplateEngine:
         """Setup template engine for language."""
-        templates_root = Path(__file__).parent.parent.parent / "templates"
-        template_dir = templates_root / lang.value
-        if not template_dir.exists():
+        template_dir = TEMPLATES_ROOT / lang.value
+        if not template_pack_exists(template_dir):
             raise FileNotFoundError(f"No templates found for {lang.value}")
-        return TemplateEngine(template_dir)
+        return get_engine(template_dir)
 
     def _get_output_path(
         self,
@@ -113,7 +315,6 @@ class GenerateCommand(Command):
             GenerationType.WORKFLOW: "workflows",
         }
         output_dir = project.get_subdir(subdir_map[gen_type])
-        output_dir.mkdir(parents=True, exist_ok=True)
         return output_dir / f"{snake_case(gen_name)}.{lang.value}"
 
     def _check_overwrite(self, output_file: Path) -> bool:
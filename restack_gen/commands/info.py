@@ -23,9 +23,9 @@ class ListTemplatesCommand(Command):
         self.templates_root = templates_root
 
     def execute(self, args: list[str]) -> int:
-        templates_root = (
-            self.templates_root or Path(__file__).parent.parent.parent / "templates"
-        )
+        from ..core.templates import TEMPLATES_ROOT
+
+        templates_root = self.templates_root or TEMPLATES_ROOT
         if not templates_root.exists():
             print_warning("Templates directory not found")
             return 1
@@ -40,10 +40,10 @@ class ListTemplatesCommand(Command):
         if not lang_dir.exists():
             print_error(f"No templates for language: {lang.value}")
             return 1
-        templates = self._get_templates(lang_dir)
+        catalog = self._get_catalog(lang_dir)
         print(f"{Color.BOLD}Templates ({lang.value}):{Color.RESET}")
-        for t in sorted(templates):
-            print(f"  • {t}")
+        for t in sorted(catalog.names()):
+            print(self._format_template(catalog, t))
         return 0
 
     def _show_all_templates(self, templates_root: Path) -> int:
@@ -52,21 +52,31 @@ class ListTemplatesCommand(Command):
         for lang_dir in sorted(templates_root.iterdir()):
             if not lang_dir.is_dir() or lang_dir.name.startswith("."):
                 continue
-            templates = self._get_templates(lang_dir)
-            if templates:
+            catalog = self._get_catalog(lang_dir)
+            if len(catalog):
                 print(f"{Color.CYAN}{lang_dir.name}:{Color.RESET}")
-                for t in sorted(templates):
-                    print(f"  • {t}")
+                for t in sorted(catalog.names()):
+                    print(self._format_template(catalog, t))
                 print()
         return 0
 
+    def _get_catalog(self, directory: Path):
+        """Get the template catalog for a template directory."""
+        from ..core.templates import get_engine
+
+        return get_engine(directory).catalog
+
     def _get_templates(self, directory: Path) -> list[str]:
         """Get list of template files in directory."""
-        return [
-            p.name
-            for p in directory.iterdir()
-            if p.is_file() and not p.name.startswith(".")
-        ]
+        return self._get_catalog(directory).names()
+
+    def _format_template(self, catalog, name: str) -> str:
+        """Format one listing line; verbose mode adds kind and variables."""
+        info = catalog.get(name)
+        if not self.config.verbose or info is None:
+            return f"  • {name}"
+        variables = ", ".join(info.variables) or "-"
+        return f"  • {name} [{info.kind}] vars: {variables}"
 
 
 class TelemetryCommand(Command):
@@ -137,6 +147,8 @@ class HelpCommand(Command):
   {Color.CYAN}new{Color.RESET} <app_name>              Create a new Restack app
   {Color.CYAN}g{Color.RESET}, {Color.CYAN}generate{Color.RESET} <type> <name>  Generate code (agent|function|workflow)
   {Color.CYAN}routes{Color.RESET}                       List registered agents/workflows/functions
+  {Color.CYAN}sync{Color.RESET}                         Re-render generated files whose inputs changed
+  {Color.CYAN}upgrade{Color.RESET} [--workspace DIR]    Merge template updates into edited projects
   {Color.CYAN}dev{Color.RESET}                          Start local engine and hot-reload
   {Color.CYAN}build{Color.RESET}                        Type check, lint, and package
   {Color.CYAN}test{Color.RESET} [args]                  Run tests with pytest
@@ -144,6 +156,8 @@ class HelpCommand(Command):
   {Color.CYAN}list-templates{Color.RESET}               List available code templates
   {Color.CYAN}version{Color.RESET}                      Show version information
   {Color.CYAN}telemetry{Color.RESET}                   Manage telemetry settings
+  {Color.CYAN}serve{Color.RESET} [start|stop|status]   Run the warm background daemon
+  {Color.CYAN}cache{Color.RESET} [stats|clear]         Inspect or clear the template cache
   {Color.CYAN}help{Color.RESET}                         Show this help message
 
 {Color.BOLD}OPTIONS:{Color.RESET}
@@ -151,6 +165,9 @@ class HelpCommand(Command):
   --lang <py|ts>               Language (auto-detect if omitted)
   --pm <uv|pip|pnpm|npm>       Package manager preference
   --cwd <path>                 Run in a custom directory
+  --workspace <path>           Upgrade every project under a directory
+  --json                       Print routes as JSON
+  --graph                      Print the component call graph (DOT, or JSON)
   --force                      Overwrite existing files
   --dry-run                    Preview actions without executing
   -q, --quiet                  Reduce output verbosity
@@ -172,9 +189,11 @@ class HelpCommand(Command):
   restack-gen g agent EmailHandler
   restack-gen g function send_email
   restack-gen g workflow email_campaign
+  restack-gen g agent Billing Support function send_email  # several at once
 
   # Development workflow
   restack-gen routes          # List all components
+  restack-gen routes --graph  # Call graph as DOT
   restack-gen test            # Run tests
   restack-gen dev             # Start dev server
 
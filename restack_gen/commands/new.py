@@ -2,23 +2,53 @@
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
 from pathlib import Path
+from typing import Optional
 import json
+import re
 from .base import Command
 from ..constants import Language, VERSION
-from ..core.project import ProjectStructure
-from ..core.templates import TemplateEngine, build_template_context
+from ..core.golden import GOLDEN_PROBE, GoldenProjectCache
+from ..core.lockfile import GenerationLock
+from ..core.pipeline import FileJob
+from ..core.plan import GenerationPlan
+from ..core.project import ProjectStructure, project_table
+from ..core.staging import StagedDirectory
+from ..core.templates import (
+    TEMPLATES_ROOT,
+    TemplateEngine,
+    build_template_context,
+    get_engine,
+    template_pack_exists,
+)
 from ..core.validation import Validator
 from ..utils.console import print_error, print_success, print_warning
+from ..utils.files import write_if_changed
 from ..utils.text import snake_case, pascal_case
 from ..utils.toml import TOMLLoader
 
 
+def _merge_toml(base: dict, overrides: dict) -> dict:
+    """Recursively merge TOML tables, with overrides winning."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_toml(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 class NewCommand(Command):
     """Create a new Restack app."""
 
-    def execute(self, args: list[str]) -> int:
-        import shutil
+    # Set by batch creators to clone name-independent files from a golden
+    # project instead of rendering them for every app
+    golden_cache: Optional[GoldenProjectCache] = None
+    # restack.toml values that take precedence over the template's (e.g.
+    # per-project overrides from a --from-manifest entry)
+    toml_overrides: Optional[dict] = None
 
+    def execute(self, args: list[str]) -> int:
         if len(args) < 1:
             print_error("App name required")
             print("Usage: restack-gen new <app_name> [options]")
@@ -39,14 +69,8 @@ class NewCommand(Command):
         try:
             return self._create_app(app_name, app_dir)
         except Exception as e:
+            # Output is staged, so a failure never leaves a partial app behind
             print_error(f"Failed to create app: {e}")
-            # Error recovery: cleanup partial output
-            if app_dir.exists():
-                try:
-                    shutil.rmtree(app_dir, ignore_errors=True)
-                    print_warning(f"Cleaned up partial output: {app_dir}")
-                except Exception as cleanup_err:
-                    print_warning(f"Failed to clean up {app_dir}: {cleanup_err}")
             if self.config.verbose:
                 import traceback
 
@@ -66,114 +90,215 @@ class NewCommand(Command):
         return base_dir / app_name
 
     def _show_dry_run(self, app_dir: Path):
-        """Show what would be created in dry-run mode."""
-        self.dry_run_log(f"Would create directory: {app_dir}")
-        self.dry_run_log("Would create project structure")
-        self.dry_run_log("Would generate sample files")
+        """Show the generation plan in dry-run mode."""
+        lang = self.config.lang or Language.PYTHON
+        engine = self._get_engine(lang)
+        plan = self._plan_app(engine, app_dir.name, app_dir, lang, {})
+        for line in plan.describe(base=app_dir.parent):
+            self.dry_run_log(line)
 
     def _create_app(self, app_name: str, app_dir: Path) -> int:
-        """Create the application."""
-        project = ProjectStructure(app_dir)
-        project.ensure_structure()
-        self.log(f"Created directory structure at {app_dir}", "success")
+        """Create the application in a staging directory, then publish it."""
         lang = self.config.lang or Language.PYTHON
-        engine, toml_values = self._setup_templates(app_name, app_dir, lang)
-        self._create_readme(app_dir, app_name)
-        self._generate_samples(engine, project, app_name, lang, toml_values)
-        self._generate_test_sample(engine, project, app_name, lang, toml_values)
-        # --- BEGIN: Write tsconfig.json for TypeScript projects ---
-        if lang == Language.TYPESCRIPT:
-            import datetime
-
-            template_name = "tsconfig.json.j2"
-            context = {
-                "project_name": app_name,
-                "description": f"Generated by restack-gen v{VERSION}",
-                "lang": lang.value,
-                "date": datetime.date.today().isoformat(),
-                "generator_version": VERSION,
-                "timestamp": datetime.datetime.now().isoformat(),
-            }
-            if engine.template_exists(template_name):
-                content = engine.render(template_name, context)
-                tsconfig_path = app_dir / "tsconfig.json"
-                with open(tsconfig_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                self.log(f"Generated tsconfig.json: {tsconfig_path.name}")
-            else:
-                print_warning(
-                    "tsconfig.json.j2 template not found for TypeScript project."
-                )
-        # --- END: Write tsconfig.json for TypeScript projects ---
-        # --- BEGIN: Write pyproject.toml for Python projects ---
-        if lang == Language.PYTHON:
-            import datetime
-
-            template_name = "pyproject.toml.j2"
-            context = {
-                "project_name": app_name,
-                "description": f"Generated by restack-gen v{VERSION}",
-                "lang": lang.value,
-                "date": datetime.date.today().isoformat(),
-                "generator_version": VERSION,
-                "timestamp": datetime.datetime.now().isoformat(),
-            }
-            if engine.template_exists(template_name):
-                content = engine.render(template_name, context)
-                pyproject_path = app_dir / "pyproject.toml"
-                with open(pyproject_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                self.log(f"Generated pyproject.toml: {pyproject_path.name}")
-            else:
-                print_warning(
-                    "pyproject.toml.j2 template not found for Python project."
-                )
-        # --- END: Write pyproject.toml for Python projects ---
-        self._create_service(app_dir, app_name)
-        self._create_run_script(project.scripts_dir)
+        with StagedDirectory(app_dir) as stage:
+            engine, toml_values = self._setup_templates(app_name, stage.path, lang)
+            plan = self._plan_app(engine, app_name, stage.path, lang, toml_values)
+            if self.golden_cache is not None:
+                self._clone_from_golden(plan, engine, lang, toml_values)
+            self._apply_plan(plan)
+            self._write_lock(stage.path, plan, app_name, lang, toml_values)
+            stage.publish()
+        self.log(f"Created directory structure at {app_dir}", "success")
         self._show_next_steps(app_name)
         return 0
 
+    def _plan_app(
+        self,
+        engine: TemplateEngine,
+        app_name: str,
+        app_dir: Path,
+        lang: Language,
+        toml_values: dict,
+    ) -> GenerationPlan:
+        """Plan every directory and file of a new application."""
+        # The app being created is its own root, even inside another project
+        project = ProjectStructure(app_dir, discover=False)
+        jobs = [
+            *self._readme_jobs(app_dir, app_name),
+            *self._sample_jobs(engine, project, app_name, lang, toml_values),
+            *self._test_sample_jobs(engine, project, app_name, lang, toml_values),
+            *self._config_jobs(engine, app_dir, app_name, lang),
+            self._service_job(app_dir, app_name),
+            self._run_script_job(project.scripts_dir),
+        ]
+        return GenerationPlan(app_dir, project.structure_dirs(), jobs)
+
+    def _clone_from_golden(
+        self,
+        plan: GenerationPlan,
+        engine: TemplateEngine,
+        lang: Language,
+        toml_values: dict,
+    ):
+        """Swap name-independent files in the plan for golden-project clones."""
+        key = GoldenProjectCache.key(lang.value, toml_values, engine.fingerprint)
+        try:
+            golden = self.golden_cache.get(
+                key,
+                lambda root: self._plan_app(
+                    engine, GOLDEN_PROBE, root, lang, toml_values
+                ),
+            )
+        except Exception as e:
+            # Cloning is an optimization; render everything instead
+            if self.config.verbose:
+                print_warning(f"Could not build golden project: {e}")
+            return
+        cloned = golden.substitute(plan)
+        if self.config.verbose:
+            self.log(f"Cloned {cloned} shared file(s) from golden project")
+
+    def _write_lock(
+        self,
+        app_dir: Path,
+        plan: GenerationPlan,
+        app_name: str,
+        lang: Language,
+        toml_values: dict,
+    ):
+        """Record how each file was generated, for `restack-gen sync`."""
+        lock = GenerationLock(app_dir, lang.value, app_name, toml_values)
+        lock.record_plan(plan)
+        lock.save()
+
+    def _apply_plan(self, plan: GenerationPlan):
+        """Validate and execute a generation plan.
+
+        Failures of optional files are reported as warnings; any other
+        failure is raised once every file has been attempted.
+        """
+        timings = plan.execute()
+        first_error = None
+        skipped = 0
+        for timing in timings:
+            job = timing.job
+            skipped += timing.skipped
+            if not timing.ok:
+                if job.optional:
+                    print_warning(f"Could not generate {job.label}: {timing.error}")
+                elif first_error is None:
+                    first_error = timing.error
+                continue
+            if job.label:
+                message = f"Generated {job.label}: {job.path.name}"
+                if self.config.verbose:
+                    message += (
+                        f" (render {timing.render_seconds * 1000:.1f} ms, "
+                        f"write {timing.write_seconds * 1000:.1f} ms)"
+                    )
+                self.log(message)
+        if skipped and self.config.verbose:
+            self.log(f"Skipped {skipped} write(s) of unchanged file(s)")
+        if first_error is not None:
+            raise first_error
+
+    def _config_jobs(
+        self, engine: TemplateEngine, app_dir: Path, app_name: str, lang: Language
+    ) -> list[FileJob]:
+        """Plan tsconfig.json (TypeScript) or pyproject.toml (Python)."""
+        import datetime
+
+        if lang == Language.TYPESCRIPT:
+            template_name, filename = "tsconfig.json.j2", "tsconfig.json"
+        else:
+            template_name, filename = "pyproject.toml.j2", "pyproject.toml"
+        if not engine.template_exists(template_name):
+            project_kind = "TypeScript" if lang == Language.TYPESCRIPT else "Python"
+            print_warning(
+                f"{template_name} template not found for {project_kind} project."
+            )
+            return []
+        context = {
+            "project_name": app_name,
+            "description": f"Generated by restack-gen v{VERSION}",
+            "lang": lang.value,
+            "date": datetime.date.today().isoformat(),
+            "generator_version": VERSION,
+            "timestamp": datetime.datetime.now().isoformat(),
+        }
+        return [
+            FileJob(
+                app_dir / filename,
+                template_name,
+                context,
+                engine=engine,
+                label=filename,
+            )
+        ]
+
     def _setup_templates(
         self, app_name: str, app_dir: Path, lang: Language
     ) -> tuple[TemplateEngine, dict]:
         """Setup template engine and load TOML config."""
-        templates_root = Path(__file__).parent.parent.parent / "templates"
-        template_dir = templates_root / lang.value
-        if not template_dir.exists():
-            print_warning(f"No templates found for {lang.value}, using minimal setup")
-            template_dir = templates_root
-        engine = TemplateEngine(template_dir)
-        toml_values = self._load_toml_config(templates_root, app_name, app_dir)
+        engine = self._get_engine(lang)
+        toml_values = self._load_toml_config(TEMPLATES_ROOT, app_name, app_dir, lang)
         return engine, toml_values
 
+    def _get_engine(self, lang: Language) -> TemplateEngine:
+        """Get the template engine for a language pack."""
+        template_dir = TEMPLATES_ROOT / lang.value
+        if not template_pack_exists(template_dir):
+            print_warning(f"No templates found for {lang.value}, using minimal setup")
+            template_dir = TEMPLATES_ROOT
+        return get_engine(template_dir)
+
     def _load_toml_config(
-        self, templates_root: Path, app_name: str, app_dir: Path
+        self,
+        templates_root: Path,
+        app_name: str,
+        app_dir: Path,
+        lang: Optional[Language] = None,
     ) -> dict:
-        """Load and parse TOML configuration."""
+        """Load and parse TOML configuration.
+
+        With lang, restack.toml also records the project language in its
+        [project] table, which `generate` reads instead of scanning src/.
+        """
         toml_values = {}
+        data = {}
         toml_template = templates_root / "restack.toml.j2"
-        if not toml_template.exists():
-            return toml_values
-        try:
-            from jinja2 import Environment, FileSystemLoader
-
-            env = Environment(loader=FileSystemLoader(str(templates_root)))
-            template = env.get_template("restack.toml.j2")
-            output = template.render({"app_name": app_name})
-            with open(app_dir / "restack.toml", "w", encoding="utf-8") as f:
-                f.write(output)
-            if TOMLLoader.is_available():
-                data = TOMLLoader.load(app_dir / "restack.toml")
-                toml_values = self._extract_toml_values(data)
-        except Exception as e:
-            if self.config.verbose:
-                print_warning(f"Could not parse TOML: {e}")
+        if toml_template.exists():
+            try:
+                output = get_engine(templates_root).render(
+                    "restack.toml.j2", {"app_name": app_name}
+                )
+                if lang is not None and not re.search(r"(?m)^\[project\]", output):
+                    output = output.rstrip("\n") + "\n\n" + project_table(lang)
+                app_dir.mkdir(parents=True, exist_ok=True)
+                write_if_changed(app_dir / "restack.toml", output)
+                if TOMLLoader.is_available():
+                    data = TOMLLoader.load(app_dir / "restack.toml")
+            except Exception as e:
+                if self.config.verbose:
+                    print_warning(f"Could not parse TOML: {e}")
+        elif lang is not None:
+            app_dir.mkdir(parents=True, exist_ok=True)
+            write_if_changed(
+                app_dir / "restack.toml",
+                "# restack-gen project settings\n" + project_table(lang),
+            )
+        if self.toml_overrides:
+            data = _merge_toml(data, self.toml_overrides)
+        if data:
+            toml_values = self._extract_toml_values(data)
         return toml_values
 
     def _extract_toml_values(self, data: dict) -> dict:
         """Extract values from parsed TOML data."""
         toml_values = {}
+        # [project] is metadata about the project, not render settings
+        if not any(key != "project" for key in data):
+            return toml_values
         # Extract timeouts
         timeouts = data.get("timeouts", {})
         start_to_close = timeouts.get("start_to_close")
@@ -190,15 +315,12 @@ class NewCommand(Command):
         toml_values["queues_default"] = queues.get("default", "default")
         return toml_values
 
-    def _create_readme(self, app_dir: Path, app_name: str):
-        """Create README file using Jinja2 template if available."""
-        from ..core.templates import TemplateEngine
+    def _readme_jobs(self, app_dir: Path, app_name: str) -> list[FileJob]:
+        """Plan the README, falling back to a minimal one without a template."""
         import datetime
 
         lang = self.config.lang or Language.PYTHON
-        templates_root = Path(__file__).parent.parent.parent / "templates"
-        template_dir = templates_root / lang.value
-        engine = TemplateEngine(template_dir)
+        engine = get_engine(TEMPLATES_ROOT / lang.value)
         template_name = "README.md.j2"
         context = {
             "project_name": app_name,
@@ -210,25 +332,26 @@ class NewCommand(Command):
             "timestamp": datetime.datetime.now().isoformat(),
         }
         readme_path = app_dir / "README.md"
-        readme_path.parent.mkdir(parents=True, exist_ok=True)
         if engine.template_exists(template_name):
-            content = engine.render(template_name, context)
-        else:
-            # fallback to minimal README
-            content = f"# {app_name}\n\nGenerated by restack-gen v{VERSION}\n"
-        with open(readme_path, "w", encoding="utf-8") as f:
-            f.write(content)
+            return [FileJob(readme_path, template_name, context, engine=engine)]
+        # fallback to minimal README
+        content = f"# {app_name}\n\nGenerated by restack-gen v{VERSION}\n"
+        return [FileJob(readme_path, content=content)]
 
-    def _generate_samples(
+    def _sample_jobs(
         self,
         engine: TemplateEngine,
         project: ProjectStructure,
         app_name: str,
         lang: Language,
         toml_values: dict,
-    ):
-        """Generate sample agent, function, and workflow."""
+    ) -> list[FileJob]:
+        """Plan sample agent, function, and workflow files."""
         ext = lang.value
+        # service.py and the agent/workflow templates import llm_chat itself
+        llm_chat_template = f"function_llm_chat.{ext}.j2"
+        if not engine.template_exists(llm_chat_template):
+            llm_chat_template = f"function.{ext}.j2"
         samples = [
             (
                 "agent",
@@ -238,7 +361,7 @@ class NewCommand(Command):
             ),
             (
                 "function",
-                f"function.{ext}.j2",
+                llm_chat_template,
                 project.get_subdir("functions") / f"llm_chat.{ext}",
                 "llm_chat",
             ),
@@ -246,48 +369,56 @@ class NewCommand(Command):
                 "workflow",
                 f"workflow.{ext}.j2",
                 project.get_subdir("workflows") / f"automated_workflow.{ext}",
-                "automated_workflow",
+                "automated",  # The template appends "Workflow"
             ),
         ]
+        jobs = []
         for sample_type, template_name, output_path, entity_name in samples:
             if engine.template_exists(template_name):
-                try:
-                    context = build_template_context(
-                        entity_name, app_name=app_name, **toml_values
+                context = build_template_context(
+                    entity_name, app_name=app_name, **toml_values
+                )
+                jobs.append(
+                    FileJob(
+                        output_path,
+                        template_name,
+                        context,
+                        engine=engine,
+                        label=f"sample {sample_type}",
+                        optional=True,
                     )
-                    content = engine.render(template_name, context)
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        f.write(content)
-                    self.log(f"Generated sample {sample_type}: {output_path.name}")
-                except Exception as e:
-                    print_warning(f"Could not generate sample {sample_type}: {e}")
-
-    def _generate_test_sample(
+                )
+        return jobs
+
+    def _test_sample_jobs(
         self,
         engine: TemplateEngine,
         project: ProjectStructure,
         app_name: str,
         lang: Language,
         toml_values: dict,
-    ):
-        """Generate sample test file."""
+    ) -> list[FileJob]:
+        """Plan the sample test file."""
         ext = lang.value
         template_name = f"test_sample.{ext}.j2"
-        output_path = project.tests_dir / f"test_sample.{ext}"
-        if engine.template_exists(template_name):
-            try:
-                context = build_template_context(
-                    "sample", app_name=app_name, project_name=app_name, **toml_values
-                )
-                content = engine.render(template_name, context)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                self.log(f"Generated sample test: {output_path.name}")
-            except Exception as e:
-                print_warning(f"Could not generate sample test: {e}")
+        if not engine.template_exists(template_name):
+            return []
+        context = build_template_context(
+            "sample", app_name=app_name, project_name=app_name, **toml_values
+        )
+        return [
+            FileJob(
+                project.tests_dir / f"test_sample.{ext}",
+                template_name,
+                context,
+                engine=engine,
+                label="sample test",
+                optional=True,
+            )
+        ]
 
-    def _create_service(self, app_dir: Path, app_name: str):
-        """Create service.py registrar."""
+    def _service_job(self, app_dir: Path, app_name: str) -> FileJob:
+        """Plan the service.py registrar."""
         service_code = f"""from restack_ai import Restack
 from src.agents.{snake_case(app_name)} import {pascal_case(app_name)}
 from src.functions.llm_chat import llm_chat
@@ -296,21 +427,20 @@ from src.workflows.automated_workflow import AutomatedWorkflow
 client = Restack()
 
 async def main():
-	await client.start_service(
-		agents=[{pascal_case(app_name)}],
-		workflows=[AutomatedWorkflow],
-		functions=[llm_chat]
-	)
+\tawait client.start_service(
+\t\tagents=[{pascal_case(app_name)}],
+\t\tworkflows=[AutomatedWorkflow],
+\t\tfunctions=[llm_chat]
+\t)
 
 if __name__ == '__main__':
-	import asyncio
-	asyncio.run(main())
+\timport asyncio
+\tasyncio.run(main())
 """
-        with open(app_dir / "service.py", "w", encoding="utf-8") as f:
-            f.write(service_code)
+        return FileJob(app_dir / "service.py", content=service_code)
 
-    def _create_run_script(self, scripts_dir: Path):
-        """Create run_engine.sh script."""
+    def _run_script_job(self, scripts_dir: Path) -> FileJob:
+        """Plan the executable run_engine.sh script."""
         script_content = """#!/usr/bin/env bash
 set -e
 
@@ -320,16 +450,14 @@ echo "Starting Restack engine..."
 # or
 # restack-engine start
 """
-        script_path = scripts_dir / "run_engine.sh"
-        with open(script_path, "w", encoding="utf-8") as f:
-            f.write(script_content)
-        try:
-            script_path.chmod(0o755)
-        except Exception:
-            pass
+        return FileJob(
+            scripts_dir / "run_engine.sh", content=script_content, mode=0o755
+        )
 
     def _show_next_steps(self, app_name: str):
         """Show next steps to user."""
+        if self.config.quiet:
+            return
         print_success(f"Created new Restack app: {app_name}")
         print()
         print("Next steps:")
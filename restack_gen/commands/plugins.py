@@ -0,0 +1,95 @@
+"""Discovery of third-party commands registered through entry points.
+
+Plugins expose commands under the ``restack_gen.commands`` entry point
+group, e.g. in their ``pyproject.toml``::
+
+    [project.entry-points."restack_gen.commands"]
+    deploy = "my_plugin.commands:DeployCommand"
+
+Scanning installed distributions is comparatively expensive, so the
+result is cached in a small JSON manifest under the user cache dir. The
+manifest is keyed by the mtimes of the ``sys.path`` entries: installing
+or removing a distribution touches its site-packages directory, which
+invalidates the manifest without having to rescan on every start.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from ..constants import VERSION
+from ..utils.paths import user_cache_dir
+
+ENTRY_POINT_GROUP = "restack_gen.commands"
+MANIFEST_NAME = "plugins.json"
+
+
+def _environment_key() -> str:
+    """Fingerprint the import environment cheaply (one stat per path entry)."""
+    parts = [VERSION, sys.version.split()[0]]
+    for entry in sys.path:
+        try:
+            parts.append(f"{entry}:{os.stat(entry or '.').st_mtime_ns}")
+        except OSError:
+            continue
+    return "|".join(parts)
+
+
+def scan_entry_points() -> dict[str, str]:
+    """Scan installed distributions for command entry points."""
+    from importlib import metadata
+
+    commands: dict[str, str] = {}
+    try:
+        eps = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except Exception:
+        return commands
+    for ep in eps:
+        commands[ep.name] = ep.value
+    return commands
+
+
+class PluginManifest:
+    """On-disk cache of discovered plugin commands."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or user_cache_dir() / MANIFEST_NAME
+
+    def load(self) -> dict[str, str]:
+        """Return plugin commands, rescanning only when the environment changed."""
+        key = _environment_key()
+        cached = self._read()
+        if cached is not None and cached.get("key") == key:
+            return dict(cached.get("commands", {}))
+        commands = scan_entry_points()
+        self._write({"key": key, "commands": commands})
+        return commands
+
+    def invalidate(self) -> None:
+        """Drop the manifest so the next load rescans entry points."""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data: dict) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # A read-only cache dir only costs us a rescan next time
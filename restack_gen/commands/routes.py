@@ -1,6 +1,8 @@
 # restack-gen 0.1.0
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
+import json
+
 from .base import Command
 from ..core.project import ProjectStructure
 from ..utils.console import Color, print_warning
@@ -11,53 +13,62 @@ class RoutesCommand(Command):
 
     def execute(self, args: list[str]) -> int:
         project = ProjectStructure(self.config.cwd)
+        table = self._build_table(project)
+        if self.config.graph:
+            from ..core.graph import build_graph
+
+            graph = build_graph(table)
+            print(
+                graph.to_json() if self.config.json_output else graph.to_dot(), end=""
+            )
+            return 0
+        if self.config.json_output:
+            print(json.dumps(table.to_dict(), indent=2))
+            return 0
         print(f"{Color.BOLD}Registered Routes:{Color.RESET}\n")
-        service_path = project.root / "service.py"
-        if service_path.exists():
-            agents, workflows, functions = self._parse_service(service_path)
-            self._print_list("Agents", agents)
-            self._print_list("Workflows", workflows)
-            self._print_list("Functions", functions)
-            if not (agents or workflows or functions):
-                print_warning("No routes found in project")
-        else:
+        for kind, title in (
+            ("agent", "Agents"),
+            ("workflow", "Workflows"),
+            ("function", "Functions"),
+        ):
+            self._print_list(title, [r for r in table.routes if r.kind == kind])
+        if not table.routes:
             print_warning("No routes found in project")
+        self._print_unregistered(table.unregistered)
+        for rel, error in sorted(table.errors.items()):
+            print_warning(f"Could not parse {rel}: {error}")
         return 0
 
-    def _parse_service(self, service_path):
-        """Parse service.py to extract registered components."""
-        agents = []
-        workflows = []
-        functions = []
-        try:
-            with open(service_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            # Simple regex to find the lists
-            import re
-
-            agent_match = re.search(r"agents=\[([^\]]*)\]", content)
-            workflow_match = re.search(r"workflows=\[([^\]]*)\]", content)
-            function_match = re.search(r"functions=\[([^\]]*)\]", content)
-            if agent_match:
-                agents = [
-                    x.strip() for x in agent_match.group(1).split(",") if x.strip()
-                ]
-            if workflow_match:
-                workflows = [
-                    x.strip() for x in workflow_match.group(1).split(",") if x.strip()
-                ]
-            if function_match:
-                functions = [
-                    x.strip() for x in function_match.group(1).split(",") if x.strip()
-                ]
-        except Exception:
-            pass
-        return agents, workflows, functions
+    def _build_table(self, project: ProjectStructure):
+        """Resolve the project's routes, checking the indexed components."""
+        from ..core.index import ComponentIndex
+        from ..core.routes import RouteTable
+
+        save = not self.config.dry_run
+        index = ComponentIndex.load(project.root, save=save)
+        table = RouteTable(project.root, jobs=self.config.jobs).build(index.entries)
+        if save:
+            table.save_cache()
+        if self.config.verbose:
+            print(f"Parsed {table.parsed} file(s), {len(table.registries)} registry")
+        return table
+
+    def _print_unregistered(self, routes: list):
+        """List components defined under src/ that no registry registers."""
+        if routes:
+            print(f"{Color.YELLOW}Not registered:{Color.RESET}")
+            for route in routes:
+                print(f"  • {route.name} ({route.kind})")
+            print()
 
     def _print_list(self, title: str, items: list):
-        """Print a list of items."""
+        """Print a list of routes, with where each is defined."""
         if items:
             print(f"{Color.CYAN}{title}:{Color.RESET}")
-            for item in items:
-                print(f"  • {item}")
+            for route in items:
+                if route.resolved:
+                    where = f"{route.source}:{route.line}"
+                else:
+                    where = f"{Color.YELLOW}(definition not found){Color.RESET}"
+                print(f"  • {route.name}  {where}")
             print()
@@ -0,0 +1,104 @@
+"""`restack-gen serve`: manage the warm background daemon."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+
+from .base import Command
+from ..utils.console import print_error, print_info, print_success, print_warning
+
+
+class ServeCommand(Command):
+    """Run or control the warm restack-gen daemon."""
+
+    START_TIMEOUT = 5.0
+
+    def execute(self, args: list[str]) -> int:
+        from .. import daemon
+
+        if not hasattr(daemon.socket, "AF_UNIX"):
+            print_error("Daemon mode requires Unix domain socket support")
+            return 1
+        subcommand = args[0].lower() if args else "run"
+        if subcommand == "run":
+            return self._run(daemon)
+        if subcommand == "start":
+            return self._start(daemon)
+        if subcommand == "stop":
+            return self._stop(daemon)
+        if subcommand == "status":
+            return self._status(daemon)
+        print_error(f"Unknown serve subcommand: {subcommand}")
+        print("Usage: restack-gen serve [run|start|stop|status]")
+        return 1
+
+    def _run(self, daemon) -> int:
+        """Serve in the foreground until interrupted or stopped."""
+        path = daemon.socket_path()
+        if self.config.dry_run:
+            self.dry_run_log(f"Would start daemon on {path}")
+            return 0
+        self.log(f"Serving on {path} (Ctrl-C to stop)")
+        try:
+            daemon.DaemonServer(path).serve_forever()
+        except RuntimeError as e:
+            print_error(str(e))
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    def _start(self, daemon) -> int:
+        """Start the daemon in the background and wait until it answers."""
+        if daemon.ping() is not None:
+            print_info(f"Daemon already running on {daemon.socket_path()}")
+            return 0
+        if self.config.dry_run:
+            self.dry_run_log("Would start daemon in the background")
+            return 0
+        subprocess.Popen(
+            [sys.executable, "-m", "restack_gen", "serve", "run"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while time.monotonic() < deadline:
+            status = daemon.ping()
+            if status is not None:
+                print_success(f"Daemon started (pid {status.get('pid')})")
+                return 0
+            time.sleep(0.05)
+        print_error("Daemon did not start in time")
+        return 1
+
+    def _stop(self, daemon) -> int:
+        """Stop a running daemon."""
+        if daemon.request_shutdown():
+            print_success("Daemon stopped")
+            return 0
+        print_warning("No daemon running")
+        return 1
+
+    def _status(self, daemon) -> int:
+        """Report whether a daemon is running."""
+        status = daemon.ping()
+        if status is None:
+            print_info("No daemon running")
+            return 1
+        print_info(
+            f"Daemon running (pid {status.get('pid')}, version "
+            f"{status.get('version')}, "
+            f"{status.get('requests_served', 0)} requests served)"
+        )
+        templates = status.get("templates")
+        if templates:
+            print_info(
+                f"Template engines: {templates.get('engines', 0)}, compiled "
+                f"templates: {templates.get('templates', 0)}, hits: "
+                f"{templates.get('hits', 0)}, misses: {templates.get('misses', 0)}"
+            )
+        return 0
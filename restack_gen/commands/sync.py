@@ -0,0 +1,69 @@
+"""`restack-gen sync`: re-render generated files whose inputs changed."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from .base import Command
+from ..constants import Language
+from ..core.lockfile import LOCKFILE_NAME, GenerationLock
+from ..core.regenerate import regenerate
+from ..utils.console import print_error, print_success, print_warning
+
+
+class SyncCommand(Command):
+    """Bring a generated project up to date with its templates and TOML.
+
+    Only files whose template or render context changed since they were
+    generated are re-rendered; files edited since are left alone unless
+    --force is given.
+    """
+
+    def execute(self, args: list[str]) -> int:
+        start = Path(self.config.cwd).resolve() if self.config.cwd else Path.cwd()
+        try:
+            lock = GenerationLock.find(start)
+        except ValueError as e:
+            print_error(str(e))
+            return 1
+        if lock is None:
+            print_error(
+                f"No {LOCKFILE_NAME} found in {start} or its parents",
+                hint="sync works on projects created by `restack-gen new`",
+            )
+            return 1
+        try:
+            lang = Language(lock.lang or Language.PYTHON.value)
+        except ValueError:
+            print_error(f"Unknown language in {lock.path}: {lock.lang}")
+            return 1
+        try:
+            return self._sync(lock, lang)
+        except Exception as e:
+            print_error(f"Failed to sync: {e}")
+            if self.config.verbose:
+                import traceback
+
+                traceback.print_exc()
+            return 1
+
+    def _sync(self, lock: GenerationLock, lang: Language) -> int:
+        report = regenerate(lock, self.config)
+        for change in report.changes:
+            if change.action == "skipped":
+                print_warning(f"Skipped {change.path}: {change.detail}")
+        if self.config.dry_run:
+            for line in report.plan:
+                self.dry_run_log(line)
+            return 0
+        updated = [c for c in report.changes if c.action == "updated"]
+        for change in updated:
+            self.log(f"Updated {change.path}")
+        if not self.config.quiet:
+            identical = sum(c.identical for c in updated)
+            print_success(
+                f"Synced {lock.root.name}: {len(updated)} updated "
+                f"({identical} identical, write skipped), "
+                f"{report.unchanged} unchanged, {report.count('skipped')} skipped"
+            )
+        return 0
@@ -0,0 +1,152 @@
+"""`restack-gen upgrade`: merge template updates into generated projects."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from .base import Command
+from ..core.lockfile import LOCKFILE_NAME
+from ..core.regenerate import ProjectReport, upgrade_project
+from ..utils.console import Color, print_error, print_success, print_warning
+
+PROJECT_MARKERS = ("restack.toml", LOCKFILE_NAME)
+# Never searched for projects: dependencies, caches, VCS metadata
+_SKIP_DIRS = {"node_modules", "__pycache__", "venv", "dist", "build"}
+
+
+def find_projects(workspace: Path) -> list[Path]:
+    """Every project under workspace, sorted.
+
+    A project is a directory holding restack.toml or a lock file; the
+    search does not descend into projects or hidden directories.
+    """
+    projects = []
+    for directory, dirnames, filenames in os.walk(workspace):
+        if any(marker in filenames for marker in PROJECT_MARKERS):
+            projects.append(Path(directory))
+            dirnames.clear()
+            continue
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d not in _SKIP_DIRS
+        ]
+    return sorted(projects)
+
+
+class UpgradeCommand(Command):
+    """Bring projects up to date with the installed templates.
+
+    Like sync, but files edited since generation are three-way merged
+    with the new render instead of skipped; overlapping edits are written
+    with conflict markers. With --workspace, every project found under
+    the directory is upgraded, in parallel across processes.
+    """
+
+    def execute(self, args: list[str]) -> int:
+        if args:
+            print_error(f"Unexpected argument: {args[0]}")
+            print("Usage: restack-gen upgrade [--workspace DIR]")
+            return 1
+        if self.config.workspace is None:
+            start = Path(self.config.cwd).resolve() if self.config.cwd else Path.cwd()
+            root = next(
+                (d for d in [start, *start.parents] if (d / LOCKFILE_NAME).is_file()),
+                None,
+            )
+            if root is None:
+                print_error(
+                    f"No {LOCKFILE_NAME} found in {start} or its parents",
+                    hint="use --workspace DIR to upgrade every project under DIR",
+                )
+                return 1
+            roots = [root]
+        else:
+            workspace = Path(self.config.workspace).resolve()
+            if not workspace.is_dir():
+                print_error(f"Workspace not found: {workspace}")
+                return 1
+            roots = find_projects(workspace)
+            if not roots:
+                print_warning(f"No restack-gen projects found under {workspace}")
+                return 0
+            self.log(f"Found {len(roots)} project(s) under {workspace}")
+        reports = self._upgrade(roots)
+        for report in reports:
+            self._print_report(report)
+        return self._summarize(reports)
+
+    def _upgrade(self, roots: list[Path]) -> list[ProjectReport]:
+        """Upgrade each project, in worker processes when there are several."""
+        from ..core.workers import default_jobs
+
+        jobs = min(len(roots), self.config.jobs or default_jobs("process"))
+        if jobs <= 1:
+            return [upgrade_project(root, self.config) for root in roots]
+
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawn, as for `new --executor process`: never fork a threaded parent
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return list(pool.map(upgrade_project, roots, [self.config] * len(roots)))
+
+    def _print_report(self, report: ProjectReport) -> None:
+        """Per-repo report: counts, then one line per file that changed."""
+        name = report.root.name
+        if report.error:
+            print_error(f"{name}: {report.error}")
+            if report.output:
+                print(report.output, end="")
+            return
+        if report.skipped:
+            print_warning(f"{name}: skipped, {report.skipped}")
+            return
+        if self.config.verbose and report.output:
+            print(report.output, end="")
+        if self.config.quiet and report.ok:
+            return
+        counts = ", ".join(
+            f"{report.count(action)} {action}"
+            for action in ("updated", "merged", "conflict", "skipped")
+        )
+        print(
+            f"{Color.BOLD}{name}{Color.RESET}: {counts}, {report.unchanged} unchanged"
+        )
+        for change in report.changes:
+            if change.action == "updated" and not self.config.verbose:
+                continue
+            label = (
+                change.action.upper() if change.action == "conflict" else change.action
+            )
+            detail = f" ({change.detail})" if change.detail else ""
+            print(f"  {label:<9} {change.path}{detail}")
+        for line in report.plan:
+            self.dry_run_log(line)
+
+    def _summarize(self, reports: list[ProjectReport]) -> int:
+        failed = [r for r in reports if r.error]
+        skipped = [r for r in reports if r.skipped]
+        conflicted = [r for r in reports if not r.error and r.count("conflict")]
+        if len(reports) > 1 and not self.config.quiet:
+            merged = sum(r.count("merged") for r in reports)
+            updated = sum(r.count("updated") for r in reports)
+            upgraded = len(reports) - len(failed) - len(skipped)
+            summary = (
+                f"\nUpgraded {upgraded} of {len(reports)} "
+                f"project(s): {updated} file(s) updated, {merged} merged"
+            )
+            if skipped:
+                summary += f", {len(skipped)} skipped"
+            print(summary)
+        if conflicted:
+            print_warning(
+                f"{len(conflicted)} project(s) have merge conflicts; "
+                "resolve the <<<<<<< markers and commit"
+            )
+        if failed or conflicted:
+            return 1
+        if not self.config.quiet and not self.config.dry_run:
+            print_success("Upgrade complete")
+        return 0
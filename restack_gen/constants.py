@@ -30,3 +30,14 @@ class Config:
     dry_run: bool = False
     verbose: bool = False
     no_color: bool = False
+    # Worker pool for batch creation; jobs=None sizes the pool adaptively
+    jobs: Optional[int] = None
+    executor: str = "thread"
+    # Directory `upgrade` searches for projects; None upgrades the current one
+    workspace: Optional[Path] = None
+    # TOML file listing components for `generate` to create in one batch
+    from_file: Optional[Path] = None
+    # Print machine-readable JSON instead of text (routes)
+    json_output: bool = False
+    # Print the component call graph instead of the route list (routes)
+    graph: bool = False
@@ -0,0 +1,164 @@
+"""Persistent Jinja2 bytecode cache shared by all restack-gen processes.
+
+Compiled templates are stored under ``<user cache dir>/bytecode`` so a
+fresh interpreter can skip lexing, parsing and compiling templates it has
+seen before. Entries are keyed by the template's cache key, its source
+checksum, the generator ``VERSION`` and the interpreter cache tag, so a
+template edit or an upgrade never reads stale bytecode.
+
+Writes go through Jinja's temp-file-and-rename path, which keeps
+concurrent writers (e.g. ``--concurrent-new`` workers or several CLI
+processes) from exposing partially written entries. The directory is
+pruned oldest-first once it grows beyond ``max_size`` bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from jinja2 import FileSystemBytecodeCache
+
+from ..constants import VERSION
+from ..utils.paths import user_cache_dir
+
+DISABLE_ENV = "RESTACK_GEN_NO_BYTECODE_CACHE"
+DEFAULT_MAX_SIZE = 16 * 1024 * 1024
+# Pruning trims to this fraction of max_size to avoid pruning on every write
+PRUNE_TARGET = 0.8
+
+
+def cache_entries(directory: str, suffix: str) -> list[os.DirEntry]:
+    """List cache files with the given suffix; a missing directory is empty."""
+    try:
+        with os.scandir(directory) as it:
+            return [e for e in it if e.is_file() and e.name.endswith(suffix)]
+    except OSError:
+        return []
+
+
+def prune_cache_dir(directory: str, suffix: str, limit: int) -> int:
+    """Evict least recently used cache files until the directory fits.
+
+    Returns the number of entries removed.
+    """
+    entries = []
+    total = 0
+    for entry in cache_entries(directory, suffix):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        total += st.st_size
+    if total <= limit:
+        return 0
+    target = int(limit * PRUNE_TARGET)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # Another process pruned it first
+        total -= size
+        removed += 1
+    return removed
+
+
+def bytecode_cache_dir() -> Path:
+    """Return the directory holding cached template bytecode."""
+    return user_cache_dir() / "bytecode"
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """Size-bounded, version-aware filesystem bytecode cache."""
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_size: int = DEFAULT_MAX_SIZE
+    ):
+        super().__init__(str(directory or bytecode_cache_dir()), pattern="%s.jbc")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _get_cache_filename(self, bucket) -> str:
+        tag = sys.implementation.cache_tag or "py"
+        digest = hashlib.sha1(
+            f"{VERSION}:{tag}:{bucket.key}:{bucket.checksum}".encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.directory, self.pattern % (digest,))
+
+    def load_bytecode(self, bucket) -> None:
+        super().load_bytecode(bucket)
+        with self._lock:
+            if bucket.code is None:
+                self.misses += 1
+                return
+            self.hits += 1
+        # Refresh mtime so pruning evicts least recently used entries first
+        try:
+            os.utime(self._get_cache_filename(bucket))
+        except OSError:
+            pass
+
+    def dump_bytecode(self, bucket) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            super().dump_bytecode(bucket)
+        except OSError:
+            return  # An unwritable cache must never break rendering
+        self.prune()
+
+    def _entries(self) -> list[os.DirEntry]:
+        return cache_entries(self.directory, ".jbc")
+
+    def prune(self, max_size: Optional[int] = None) -> int:
+        """Evict oldest entries until the cache fits. Returns entries removed."""
+        limit = self.max_size if max_size is None else max_size
+        return prune_cache_dir(self.directory, ".jbc", limit)
+
+    def clear(self) -> None:
+        if os.path.isdir(self.directory):
+            super().clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return on-disk size and in-process hit/miss counters."""
+        sizes = []
+        for entry in self._entries():
+            try:
+                sizes.append(entry.stat().st_size)
+            except OSError:
+                continue
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "entries": len(sizes),
+                "size": sum(sizes),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Global instances, one per cache directory
+_caches: dict[str, TemplateBytecodeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_bytecode_cache() -> Optional[TemplateBytecodeCache]:
+    """Get the shared bytecode cache, or None when disabled."""
+    if os.environ.get(DISABLE_ENV):
+        return None
+    directory = str(bytecode_cache_dir())
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = TemplateBytecodeCache(Path(directory))
+        return cache
@@ -0,0 +1,192 @@
+"""Template catalog: an index of the templates in a template pack.
+
+For every template the catalog records its name, language, kind
+(agent/function/workflow/test/config), the context variables it needs
+(found with ``jinja2.meta``), the templates it includes and a content
+hash. Engines answer
+``template_exists`` and ``list_templates`` from the catalog instead of
+probing the filesystem on every call.
+
+Catalogs are persisted per pack under ``<user cache dir>/catalogs`` and
+keyed by the pack fingerprint, so a process only re-parses templates when
+the pack actually changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ..utils.paths import user_cache_dir
+
+CATALOG_FORMAT = 2
+KINDS = ("agent", "function", "workflow", "test")
+LANGUAGES = ("py", "ts")
+
+
+@dataclass
+class TemplateInfo:
+    """Catalog entry describing a single template."""
+
+    name: str
+    language: Optional[str]
+    kind: str
+    variables: list[str] = field(default_factory=list)
+    sha1: str = ""
+    size: int = 0
+    # Templates pulled in via include/import/extends ("*" if dynamic)
+    references: list[str] = field(default_factory=list)
+
+
+def infer_kind(name: str) -> str:
+    """Infer template kind from its file name (e.g. agent_rag.py.j2 -> agent)."""
+    stem = name.split(".", 1)[0]
+    prefix = stem.split("_", 1)[0].lower()
+    return prefix if prefix in KINDS else "config"
+
+
+def infer_language(name: str, pack_name: str) -> Optional[str]:
+    """Infer template language from the pack name or the inner extension."""
+    if pack_name in LANGUAGES:
+        return pack_name
+    suffixes = name.split(".")[1:]
+    for suffix in suffixes:
+        if suffix in LANGUAGES:
+            return suffix
+    return None
+
+
+def catalog_path(templates_dir: Path) -> Path:
+    """Return the persisted catalog location for a template pack."""
+    key = hashlib.sha1(str(Path(templates_dir).resolve()).encode("utf-8"))
+    return user_cache_dir() / "catalogs" / f"{key.hexdigest()}.json"
+
+
+class TemplateCatalog:
+    """In-memory index of a template pack."""
+
+    def __init__(self, templates: dict[str, TemplateInfo], fingerprint: str = ""):
+        self.templates = templates
+        self.fingerprint = fingerprint
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.templates
+
+    def __iter__(self) -> Iterator[TemplateInfo]:
+        return iter(self.templates.values())
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def get(self, name: str) -> Optional[TemplateInfo]:
+        return self.templates.get(name)
+
+    def names(self) -> list[str]:
+        return list(self.templates)
+
+    def by_kind(self, kind: str) -> list[TemplateInfo]:
+        return [info for info in self.templates.values() if info.kind == kind]
+
+    @classmethod
+    def build(cls, templates_dir: Path, env=None, fingerprint: str = ""):
+        """Scan and parse every template in a pack."""
+        templates: dict[str, TemplateInfo] = {}
+        if not templates_dir.is_dir():
+            return cls(templates, fingerprint)
+        if env is None:
+            from jinja2 import Environment
+
+            env = Environment()
+        from jinja2 import meta
+
+        ignored = set(env.globals)
+        with os.scandir(templates_dir) as it:
+            entries = sorted(
+                (e for e in it if e.is_file() and not e.name.startswith(".")),
+                key=lambda e: e.name,
+            )
+        for entry in entries:
+            with open(entry.path, "rb") as f:
+                data = f.read()
+            try:
+                source = data.decode("utf-8")
+                ast = env.parse(source)
+                variables = sorted(meta.find_undeclared_variables(ast) - ignored)
+                references = sorted(
+                    ref or "*" for ref in meta.find_referenced_templates(ast)
+                )
+            except Exception:
+                # Not a parseable template; still list it
+                variables, references = [], []
+            templates[entry.name] = TemplateInfo(
+                name=entry.name,
+                language=infer_language(entry.name, templates_dir.name),
+                kind=infer_kind(entry.name),
+                variables=variables,
+                sha1=hashlib.sha1(data).hexdigest(),
+                size=len(data),
+                references=references,
+            )
+        return cls(templates, fingerprint)
+
+    @classmethod
+    def from_names(cls, names, pack_name: str) -> "TemplateCatalog":
+        """Build a metadata-only catalog (e.g. for compiled-only packs)."""
+        return cls(
+            {
+                name: TemplateInfo(
+                    name=name,
+                    language=infer_language(name, pack_name),
+                    kind=infer_kind(name),
+                )
+                for name in sorted(names)
+            }
+        )
+
+    @classmethod
+    def load(
+        cls, templates_dir: Path, fingerprint: Optional[str] = None, env=None
+    ) -> "TemplateCatalog":
+        """Load the persisted catalog, rebuilding it if the pack changed."""
+        if fingerprint is None:
+            from .templates import template_pack_fingerprint
+
+            fingerprint = template_pack_fingerprint(templates_dir)
+        path = catalog_path(templates_dir)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                data.get("format") == CATALOG_FORMAT
+                and data.get("fingerprint") == fingerprint
+            ):
+                templates = {
+                    name: TemplateInfo(**info)
+                    for name, info in data.get("templates", {}).items()
+                }
+                return cls(templates, fingerprint)
+        except (OSError, ValueError, TypeError):
+            pass
+        catalog = cls.build(templates_dir, env=env, fingerprint=fingerprint)
+        catalog.save(path)
+        return catalog
+
+    def save(self, path: Path) -> None:
+        """Persist the catalog atomically; failures only cost a rebuild."""
+        data = {
+            "format": CATALOG_FORMAT,
+            "fingerprint": self.fingerprint,
+            "templates": {name: asdict(info) for name, info in self.templates.items()},
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
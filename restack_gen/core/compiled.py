@@ -0,0 +1,136 @@
+"""Ahead-of-time compiled template packs.
+
+The built-in packs under ``templates/<lang>`` can be precompiled into
+importable Python modules (``Environment.compile_templates`` format) with::
+
+    python tools/compile_templates.py
+
+which writes ``restack_gen/_compiled_templates/<lang>/`` together with a
+``manifest.json`` recording the source hash of every template. The
+release workflow runs this before building the wheel so that cold starts
+import plain Python modules instead of lexing and parsing templates.
+
+At runtime a compiled module is only used when the manifest matches the
+running generator and Jinja2 versions and, if the source template is
+present, its hash still matches. Everything else, including user-supplied
+template directories, falls back to the regular source loader.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+from ..constants import VERSION
+
+COMPILED_ROOT = Path(__file__).parent.parent / "_compiled_templates"
+MANIFEST_NAME = "manifest.json"
+
+
+def _source_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def _jinja_version() -> str:
+    from importlib import metadata
+
+    try:
+        return metadata.version("jinja2")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def compile_pack(source_dir: Path, target_dir: Path) -> int:
+    """Precompile every template in source_dir into target_dir.
+
+    Returns the number of templates compiled.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    env = Environment(loader=FileSystemLoader(str(source_dir)))
+    names = sorted(
+        p.name for p in source_dir.iterdir() if p.is_file() and p.suffix == ".j2"
+    )
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for stale in target_dir.glob("tmpl_*.py"):
+        stale.unlink()
+    env.compile_templates(
+        str(target_dir), zip=None, ignore_errors=False, filter_func=names.__contains__
+    )
+    manifest = {
+        "version": VERSION,
+        "jinja2": _jinja_version(),
+        "templates": {name: _source_hash(source_dir / name) for name in names},
+    }
+    with open(target_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return len(names)
+
+
+def compile_all(
+    templates_root: Path, target_root: Path = COMPILED_ROOT
+) -> dict[str, int]:
+    """Precompile every language pack under templates_root."""
+    results = {}
+    for lang_dir in sorted(templates_root.iterdir()):
+        if lang_dir.is_dir() and not lang_dir.name.startswith("."):
+            target_dir = target_root / lang_dir.name
+            results[lang_dir.name] = compile_pack(lang_dir, target_dir)
+    return results
+
+
+def compiled_dir_for(
+    templates_dir: Path,
+    templates_root: Path,
+    compiled_root: Optional[Path] = None,
+) -> Optional[Path]:
+    """Return the compiled pack matching a built-in template dir, if any."""
+    try:
+        if templates_dir.resolve().parent != templates_root.resolve():
+            return None
+    except OSError:
+        return None
+    compiled_dir = (compiled_root or COMPILED_ROOT) / templates_dir.name
+    if not (compiled_dir / MANIFEST_NAME).exists():
+        return None
+    return compiled_dir
+
+
+def usable_templates(compiled_dir: Path, source_dir: Path) -> set[str]:
+    """Return template names whose compiled modules can be trusted."""
+    try:
+        with open(compiled_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if manifest.get("version") != VERSION:
+        return set()
+    if manifest.get("jinja2") != _jinja_version():
+        return set()
+    templates = manifest.get("templates", {})
+    if not source_dir.is_dir():
+        # Compiled-only install: the manifest is the source of truth
+        return set(templates)
+    usable = set()
+    for name, digest in templates.items():
+        try:
+            if _source_hash(source_dir / name) == digest:
+                usable.add(name)
+        except OSError:
+            continue
+    return usable
+
+
+def create_compiled_loader(compiled_dir: Path, names: set[str]):
+    """Build a ModuleLoader restricted to the verified template names."""
+    from jinja2 import ModuleLoader, TemplateNotFound
+
+    class CompiledTemplateLoader(ModuleLoader):
+        def load(self, environment, name, globals=None):
+            if name not in names:
+                raise TemplateNotFound(name)
+            return super().load(environment, name, globals)
+
+    return CompiledTemplateLoader(str(compiled_dir))
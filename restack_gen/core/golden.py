@@ -0,0 +1,153 @@
+"""Golden projects: render shared files once per batch, clone them after.
+
+When many projects are created with the same language, restack.toml
+values and template pack, most files come out identical. A golden project
+is planned once for a probe name; every file whose path and content do
+not mention the probe is written to a hidden golden directory next to
+the targets (same filesystem, so clones can be reflinks). Later projects
+clone those files and only render the name-dependent ones (the agent
+module, ``service.py``, README).
+
+Cloned files keep the volatile values (dates, timestamps) of the moment
+the golden project was rendered, i.e. the start of the batch.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import shutil
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional
+
+from ..constants import VERSION
+from .plan import GenerationPlan
+from .staging import STAGE_SUFFIX, TRASH_DIRNAME, reclaim
+
+GOLDEN_PROBE = "restackgoldenprobe"
+HARDLINK_ENV = "RESTACK_GEN_GOLDEN_HARDLINK"
+
+
+@dataclass
+class GoldenFile:
+    path: Path
+    size: int
+    sha256: str
+
+
+class GoldenProject:
+    """Name-independent files of a rendered project, keyed by relative path."""
+
+    def __init__(self, root: Path, files: dict[Path, GoldenFile]):
+        self.root = root
+        self.files = files
+        self.hardlink = bool(os.environ.get(HARDLINK_ENV))
+
+    @classmethod
+    def build(cls, plan: GenerationPlan) -> "GoldenProject":
+        """Render a probe plan and keep only files not mentioning the probe."""
+        plan.render()
+        root = plan.root
+        shared = GenerationPlan(root)
+        shared.rendered = True
+        files: dict[Path, GoldenFile] = {}
+        for planned in plan.files:
+            rel = planned.path.relative_to(root)
+            if planned.error is not None or planned.content is None:
+                continue
+            if GOLDEN_PROBE in str(rel).lower():
+                continue
+            if GOLDEN_PROBE in planned.content.lower():
+                continue
+            shared.files.append(planned)
+            files[rel] = GoldenFile(planned.path, planned.size, planned.sha256)
+        if files:
+            shared.execute()
+        return cls(root, files)
+
+    def substitute(self, plan: GenerationPlan) -> int:
+        """Replace planned files covered by the golden project with clones.
+
+        Returns the number of files that will be cloned.
+        """
+        cloned = 0
+        for planned in plan.files:
+            try:
+                rel = planned.path.relative_to(plan.root)
+            except ValueError:
+                continue
+            golden = self.files.get(rel)
+            if golden is None:
+                continue
+            planned.job = replace(
+                planned.job, source=golden.path, content=None, hardlink=self.hardlink
+            )
+            planned.content = None
+            planned.size = golden.size
+            planned.sha256 = golden.sha256
+            planned.error = None
+            cloned += 1
+        return cloned
+
+
+class GoldenProjectCache:
+    """Builds golden projects on demand and shares them across threads.
+
+    Golden directories live in ``parent`` (next to the projects being
+    created) and are discarded by ``close()``.
+    """
+
+    def __init__(self, parent: Path):
+        self.parent = Path(parent)
+        self._lock = threading.Lock()
+        self._golden: dict[str, GoldenProject] = {}
+        self._building: dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def key(lang: str, toml_values: dict[str, Any], fingerprint: Optional[str]) -> str:
+        return json.dumps(
+            [VERSION, lang, fingerprint, toml_values], sort_keys=True, default=str
+        )
+
+    def get(self, key: str, plan_for) -> GoldenProject:
+        """Return the golden project for key, building it with plan_for(root)."""
+        with self._lock:
+            golden = self._golden.get(key)
+            if golden is not None:
+                return golden
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                golden = self._golden.get(key)
+            if golden is None:
+                token = secrets.token_hex(4)
+                root = self.parent / f".golden.{os.getpid()}.{token}{STAGE_SUFFIX}"
+                golden = GoldenProject.build(plan_for(root))
+                with self._lock:
+                    self._golden[key] = golden
+        return golden
+
+    def close(self) -> None:
+        """Delete the golden directories (via the trash) before returning.
+
+        Deletion is not left to a background thread: it would be killed
+        when the process exits and leave the golden project behind.
+        """
+        with self._lock:
+            goldens = list(self._golden.values())
+            self._golden.clear()
+        if not goldens:
+            return
+        trash = self.parent / TRASH_DIRNAME
+        for golden in goldens:
+            if not golden.root.exists():
+                continue
+            try:
+                trash.mkdir(exist_ok=True)
+                os.rename(golden.root, trash / golden.root.name)
+            except OSError:
+                shutil.rmtree(golden.root, ignore_errors=True)
+        reclaim(self.parent)
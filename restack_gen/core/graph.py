@@ -0,0 +1,275 @@
+"""Component call graph: which agents, workflows and functions run which.
+
+Edges come from the facts the routes engine already caches per file
+(see ``routes.FileFacts.calls``): ``agent.step``/``workflow.step``
+calls, ``child_execute``/``child_start`` calls, and names imported
+under ``with import_functions():``. Each callee is resolved through
+imports like a registration, so only changed files are re-parsed and
+the graph costs little more than ``routes`` itself.
+
+Nodes carry fan-out (components called directly), fan-in, reach
+(components reachable, directly or not) and depth (the longest chain of
+calls below the node). Strongly connected components of more than one
+node, or a node calling itself, are reported as cycles; depth and reach
+count a cycle as one step.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .index import COMPONENT_DIRS
+from .routes import RouteTable
+
+_SHAPES = {"agent": "box", "workflow": "ellipse", "function": "note"}
+
+
+@dataclass
+class Node:
+    id: str
+    kind: str
+    name: str
+    source: str
+    line: Optional[int] = None
+    registered: bool = False
+    fan_out: int = 0
+    fan_in: int = 0
+    reach: int = 0
+    depth: int = 0
+
+
+@dataclass
+class Edge:
+    source: str
+    target: str
+    via: str
+    line: int
+
+
+@dataclass
+class CallGraph:
+    nodes: dict[str, Node] = field(default_factory=dict)
+    edges: list[Edge] = field(default_factory=list)
+    # Calls whose target could not be resolved to a component:
+    # {"from": node id, "symbol": name as written, "via": ..., "line": ...}
+    unresolved: list[dict] = field(default_factory=list)
+    cycles: list[list[str]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "nodes": [
+                {
+                    "id": n.id,
+                    "kind": n.kind,
+                    "name": n.name,
+                    "source": n.source,
+                    "line": n.line,
+                    "registered": n.registered,
+                    "fan_out": n.fan_out,
+                    "fan_in": n.fan_in,
+                    "reach": n.reach,
+                    "depth": n.depth,
+                }
+                for n in self.nodes.values()
+            ],
+            "edges": [
+                {"from": e.source, "to": e.target, "via": e.via, "line": e.line}
+                for e in self.edges
+            ],
+            "unresolved": self.unresolved,
+            "cycles": self.cycles,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2) + "\n"
+
+    def to_dot(self) -> str:
+        in_cycle = {node_id for cycle in self.cycles for node_id in cycle}
+        cycle_of = {
+            node_id: i for i, cycle in enumerate(self.cycles) for node_id in cycle
+        }
+        lines = ["digraph routes {", "  rankdir=LR;"]
+        for node in self.nodes.values():
+            attrs = [
+                f'label="{node.name}\\n{node.kind} · fan-out {node.fan_out}"',
+                f"shape={_SHAPES.get(node.kind, 'box')}",
+            ]
+            if node.id in in_cycle:
+                attrs.append("color=red")
+            if not node.registered:
+                attrs.append("style=dashed")
+            lines.append(f'  "{node.id}" [{", ".join(attrs)}];')
+        for edge in self.edges:
+            attrs = [f'label="{edge.via}"']
+            if cycle_of.get(edge.source, -1) == cycle_of.get(edge.target, -2):
+                attrs.append("color=red")
+            lines.append(f'  "{edge.source}" -> "{edge.target}" [{", ".join(attrs)}];')
+        for i, call in enumerate(self.unresolved):
+            missing = f"?{i}"
+            lines.append(
+                f'  "{missing}" [label="{call["symbol"]}\\n(not found)", '
+                "shape=plaintext, fontcolor=gray];"
+            )
+            lines.append(
+                f'  "{call["from"]}" -> "{missing}" '
+                f'[label="{call["via"]}", style=dotted];'
+            )
+        for cycle in self.cycles:
+            lines.append(f"  // cycle: {' -> '.join([*cycle, cycle[0]])}")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def _node_kind(source: str, kind: Optional[str]) -> Optional[str]:
+    """A definition's component kind: its decorator, or for TypeScript
+    (which has none) the src/ directory it lives in."""
+    if kind or not source.endswith(".ts"):
+        return kind
+    parts = source.split("/")
+    return COMPONENT_DIRS.get(parts[1]) if len(parts) > 2 else None
+
+
+def _strongly_connected(nodes: list[str], edges: dict[str, list[str]]) -> list:
+    """Tarjan's algorithm, iteratively; components in reverse topological order."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components = []
+    for start in nodes:
+        if start in index:
+            continue
+        work = [(start, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = low[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            targets = edges.get(node, [])
+            if i < len(targets):
+                work.append((node, i + 1))
+                target = targets[i]
+                if target not in index:
+                    work.append((target, 0))
+                elif target in on_stack:
+                    low[node] = min(low[node], index[target])
+                continue
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+
+def _measure(graph: CallGraph) -> None:
+    """Fan-in/out, reach, depth and cycles of every node."""
+    out: dict[str, list[str]] = {node_id: [] for node_id in graph.nodes}
+    for edge in graph.edges:
+        if edge.target not in out[edge.source]:
+            out[edge.source].append(edge.target)
+            graph.nodes[edge.target].fan_in += 1
+    for node_id, targets in out.items():
+        graph.nodes[node_id].fan_out = len(targets)
+    components = _strongly_connected(list(graph.nodes), out)
+    component_of = {}
+    for i, component in enumerate(components):
+        for node_id in component:
+            component_of[node_id] = i
+        if len(component) > 1 or component[0] in out[component[0]]:
+            graph.cycles.append(sorted(component))
+    # Tarjan yields callees before callers, so one pass fills both
+    reach: list[set[int]] = []
+    depth: list[int] = []
+    for i, component in enumerate(components):
+        below: set[int] = set()
+        deepest = 0
+        for node_id in component:
+            for target in out[node_id]:
+                j = component_of[target]
+                if j != i:
+                    below.add(j)
+                    below |= reach[j]
+                    deepest = max(deepest, depth[j] + 1)
+        reach.append(below)
+        depth.append(deepest)
+        members = sum(len(components[j]) for j in below) + len(component) - 1
+        for node_id in component:
+            graph.nodes[node_id].reach = members
+            graph.nodes[node_id].depth = deepest
+    graph.cycles.sort()
+
+
+def build_graph(table: RouteTable) -> CallGraph:
+    """The call graph of a built route table."""
+    graph = CallGraph()
+
+    def add(source: str, name: str, line, kind: str, registered=False) -> str:
+        node_id = f"{source}:{name}"
+        node = graph.nodes.get(node_id)
+        if node is None:
+            node = graph.nodes[node_id] = Node(node_id, kind, name, source, line)
+        node.registered = node.registered or registered
+        return node_id
+
+    for route in table.routes:
+        if route.resolved:
+            add(route.source, route.definition, route.line, route.kind, True)
+    for route in table.unregistered:
+        if route.line is not None:
+            add(route.source, route.name, route.line, route.kind)
+
+    # Follow calls out of every component file, including ones reached
+    # only as callees
+    pending = sorted({node.source for node in graph.nodes.values()})
+    seen = set(pending)
+    while pending:
+        rel = pending.pop()
+        facts = table.facts(rel)
+        if facts is None:
+            continue
+        callers = [
+            name
+            for name, (kind, _) in facts.definitions.items()
+            if f"{rel}:{name}" in graph.nodes
+        ]
+        for caller, symbol, via, line in facts.calls:
+            sources = [caller] if caller else callers
+            sources = [f"{rel}:{c}" for c in sources if f"{rel}:{c}" in graph.nodes]
+            if not sources:
+                continue
+            found = table.resolve(symbol, rel)
+            kind = _node_kind(found[0], found[3]) if found else None
+            if kind is None:
+                if via != "import":  # Imported models and helpers are no calls
+                    graph.unresolved.extend(
+                        {"from": s, "symbol": symbol, "via": via, "line": line}
+                        for s in sources
+                    )
+                continue
+            target = add(found[0], found[1], found[2], kind)
+            if found[0] not in seen:
+                seen.add(found[0])
+                pending.append(found[0])
+            for source in sources:
+                graph.edges.append(Edge(source, target, via, line))
+    # A name imported under import_functions() and also called is one edge
+    called = {(e.source, e.target) for e in graph.edges if e.via != "import"}
+    graph.edges = [
+        e
+        for e in graph.edges
+        if e.via != "import" or (e.source, e.target) not in called
+    ]
+    graph.edges.sort(key=lambda e: (e.source, e.target, e.line))
+    _measure(graph)
+    return graph
@@ -0,0 +1,227 @@
+"""Project component index: ``.restack/index``.
+
+Lists every agent, workflow and function module under ``src/agents``,
+``src/workflows`` and ``src/functions`` with its language, mtime, size
+and SHA-256, plus the mtime of every directory it walked. ``refresh``
+only lists the directories whose mtime changed (files were added,
+removed or renamed in them); in the others it stats the files already
+indexed. Files whose mtime or size changed are hashed again, so
+commands that need the list of components (routes, name-collision
+checks, language detection) read it without re-walking and re-reading
+the whole tree. ``generate`` updates the entries of the files it writes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..utils.files import file_sha256, write_if_changed
+
+INDEX_PATH = Path(".restack") / "index"
+INDEX_FORMAT = 1
+# Component kind for each directory under src/
+COMPONENT_DIRS = {"agents": "agent", "workflows": "workflow", "functions": "function"}
+_LANGUAGES = {".py": "py", ".ts": "ts"}
+_SKIP_DIRS = {"__pycache__", "node_modules"}
+
+
+@dataclass
+class IndexEntry:
+    """One component module."""
+
+    kind: str
+    name: str
+    lang: str
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def _is_component(name: str) -> bool:
+    stem, ext = os.path.splitext(name)
+    return ext in _LANGUAGES and not stem.startswith(("_", ".")) and stem != "index"
+
+
+class ComponentIndex:
+    """The component index of one project, keyed by POSIX path from root."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.entries: dict[str, IndexEntry] = {}
+        # Directory mtimes as of the last refresh, keyed like entries
+        self.directories: dict[str, int] = {}
+        self.dirty = False
+
+    @property
+    def path(self) -> Path:
+        return self.root / INDEX_PATH
+
+    @classmethod
+    def load(
+        cls, root: Path, refresh: bool = True, save: bool = True
+    ) -> "ComponentIndex":
+        """Read a project's index, refreshing and saving it if it is stale.
+
+        A missing, corrupt or newer-format index is always rebuilt from
+        the tree; otherwise refresh=False trusts it as is. With
+        save=False (dry runs) a refreshed index is not written back.
+        """
+        index = cls(root)
+        try:
+            with open(index.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != INDEX_FORMAT:
+                raise ValueError(f"unsupported index format in {index.path}")
+            for rel, entry in data.get("components", {}).items():
+                index.entries[rel] = IndexEntry(**entry)
+            index.directories = {
+                rel: int(mtime) for rel, mtime in data.get("directories", {}).items()
+            }
+        except (OSError, ValueError, TypeError):
+            index.entries.clear()
+            index.directories.clear()
+            refresh = True  # Nothing usable on disk
+        if refresh:
+            index.refresh()
+        if index.dirty and save:
+            try:
+                index.save()
+            except OSError:
+                pass  # Read-only tree: the index still serves this run
+        return index
+
+    def _stat_entry(
+        self, rel: str, kind: str, st: os.stat_result, path: str
+    ) -> Optional[IndexEntry]:
+        """The entry for a file, reusing the indexed hash if it is unchanged."""
+        old = self.entries.get(rel)
+        if (
+            old is not None
+            and old.mtime_ns == st.st_mtime_ns
+            and old.size == st.st_size
+        ):
+            return old
+        sha256 = file_sha256(Path(path))
+        if sha256 is None:
+            return None  # Vanished while we looked
+        stem, ext = os.path.splitext(os.path.basename(path))
+        return IndexEntry(
+            kind, stem, _LANGUAGES[ext], st.st_mtime_ns, st.st_size, sha256
+        )
+
+    def refresh(self) -> int:
+        """Bring the index in line with the tree; returns entries changed.
+
+        Directories whose mtime is unchanged are not listed again: their
+        indexed files are stat()ed again and their subdirectories walked.
+        """
+        found: dict[str, IndexEntry] = {}
+        directories: dict[str, int] = {}
+        children: dict[str, list[str]] = {}
+        for rel_dir in self.directories:
+            children.setdefault(rel_dir.rpartition("/")[0], []).append(rel_dir)
+        files: dict[str, list[str]] = {}
+        for rel in self.entries:
+            files.setdefault(rel.rpartition("/")[0], []).append(rel)
+        for dirname, kind in COMPONENT_DIRS.items():
+            pending = [f"src/{dirname}"]
+            while pending:
+                rel_dir = pending.pop()
+                directory = os.path.join(self.root, rel_dir)
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                directories[rel_dir] = mtime
+                if self.directories.get(rel_dir) == mtime:
+                    for rel in files.get(rel_dir, ()):
+                        path = os.path.join(self.root, rel)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        indexed = self._stat_entry(rel, kind, st, path)
+                        if indexed is not None:
+                            found[rel] = indexed
+                    pending.extend(children.get(rel_dir, ()))
+                    continue
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for entry in entries:
+                    rel = f"{rel_dir}/{entry.name}"
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in _SKIP_DIRS:
+                                pending.append(rel)
+                            continue
+                        if not _is_component(entry.name):
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    indexed = self._stat_entry(rel, kind, st, entry.path)
+                    if indexed is not None:
+                        found[rel] = indexed
+        changed = sum(1 for rel, e in found.items() if self.entries.get(rel) is not e)
+        changed += sum(1 for rel in self.entries if rel not in found)
+        if changed or directories != self.directories:
+            self.entries = found
+            self.directories = directories
+            self.dirty = True
+        return changed
+
+    def update(self, paths: Iterable[Path]) -> None:
+        """Index (or drop) specific files, e.g. those generate just wrote."""
+        for path in paths:
+            path = Path(path)
+            try:
+                rel = path.relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            parts = rel.split("/")
+            kind = COMPONENT_DIRS.get(parts[1]) if len(parts) > 2 else None
+            if parts[0] != "src" or kind is None or not _is_component(path.name):
+                continue
+            try:
+                indexed = self._stat_entry(rel, kind, os.stat(path), str(path))
+            except OSError:
+                indexed = None
+            if indexed is None:
+                if self.entries.pop(rel, None) is not None:
+                    self.dirty = True
+            elif self.entries.get(rel) is not indexed:
+                self.entries[rel] = indexed
+                self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {
+            "format": INDEX_FORMAT,
+            "components": {rel: asdict(e) for rel, e in sorted(self.entries.items())},
+            "directories": dict(sorted(self.directories.items())),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(self.path, json.dumps(data, indent=1, sort_keys=True) + "\n")
+        self.dirty = False
+
+    def components(self, kind: Optional[str] = None) -> list[IndexEntry]:
+        """Indexed components, optionally of one kind, sorted by name."""
+        entries = [e for e in self.entries.values() if kind is None or e.kind == kind]
+        return sorted(entries, key=lambda e: (e.kind, e.name))
+
+    def named(self, name: str) -> dict[str, IndexEntry]:
+        """Components whose module name is name, of any kind, by path."""
+        return {rel: e for rel, e in self.entries.items() if e.name == name}
+
+    def language(self) -> Optional[str]:
+        """The language most components are written in, if any."""
+        counts = Counter(e.lang for e in self.entries.values())
+        return counts.most_common(1)[0][0] if counts else None
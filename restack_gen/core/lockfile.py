@@ -0,0 +1,240 @@
+"""Generation lock file: what produced each generated file.
+
+Every project created by ``new`` carries a ``.restack-gen.lock`` at its
+root; ``generate`` adds the components it writes. For each
+template-rendered file the lock records the template, a hash of the
+template source, a hash of the render context (volatile values such as
+timestamps excluded) and a hash of the output as written. ``sync`` uses
+it to re-render only files whose inputs changed, and to recognise files
+the user has edited since (their content no longer matches the output
+hash).
+
+The output of every recorded file is also kept, content-addressed, under
+``.restack-gen/pristine/``. It is the merge base ``upgrade`` needs to
+three-way merge a new template render into a file the user has edited,
+so it should be committed along with the lock file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from ..constants import VERSION
+from ..utils.files import atomic_writer, clone_file, write_if_changed
+from .render_cache import VOLATILE_KEYS
+
+LOCKFILE_NAME = ".restack-gen.lock"
+LOCKFILE_FORMAT = 1
+PRISTINE_DIR = Path(".restack-gen") / "pristine"
+
+
+def context_hash(context: dict[str, Any]) -> str:
+    """Hash the inputs of a render, ignoring values that change every run."""
+    stable = {k: v for k, v in context.items() if k not in VOLATILE_KEYS}
+    data = json.dumps(stable, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class LockedFile:
+    """How one generated file was produced."""
+
+    template: str
+    template_hash: str
+    context_hash: str
+    output_sha256: str
+    # Component name for files written by `generate`; None for app files
+    component: Optional[str] = None
+    # App name the component was rendered with (older locks: the root's)
+    app_name: Optional[str] = None
+
+
+class GenerationLock:
+    """The lock file of one project, keyed by POSIX path relative to root."""
+
+    def __init__(
+        self,
+        root: Path,
+        lang: Optional[str] = None,
+        app_name: Optional[str] = None,
+        toml_values: Optional[dict[str, Any]] = None,
+    ):
+        self.root = Path(root)
+        self.lang = lang
+        # Set for projects created by `new`; sync re-plans app files from it
+        self.app_name = app_name
+        self.toml_values = dict(toml_values or {})
+        self.files: dict[str, LockedFile] = {}
+
+    @property
+    def path(self) -> Path:
+        return self.root / LOCKFILE_NAME
+
+    @classmethod
+    def find(cls, start: Path) -> Optional["GenerationLock"]:
+        """Load the lock file of the project containing start, if any."""
+        start = Path(start).resolve()
+        for directory in [start, *start.parents]:
+            if (directory / LOCKFILE_NAME).is_file():
+                return cls.load(directory)
+        return None
+
+    @classmethod
+    def load(cls, root: Path) -> Optional["GenerationLock"]:
+        """Read a project's lock file; None if it has none.
+
+        Raises ValueError if the lock file is corrupt or from a newer
+        restack-gen.
+        """
+        path = Path(root) / LOCKFILE_NAME
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            raise ValueError(f"Corrupt lock file {path}: {e}")
+        if data.get("format", 0) > LOCKFILE_FORMAT:
+            raise ValueError(
+                f"{path} was written by a newer restack-gen; please upgrade"
+            )
+        lock = cls(
+            root,
+            lang=data.get("lang"),
+            app_name=data.get("app_name"),
+            toml_values=data.get("toml_values"),
+        )
+        for rel, entry in data.get("files", {}).items():
+            lock.files[rel] = LockedFile(**entry)
+        return lock
+
+    @property
+    def pristine_dir(self) -> Path:
+        return self.root / PRISTINE_DIR
+
+    def _pristine_path(self, sha256: str) -> Path:
+        return self.pristine_dir / sha256[:2] / sha256
+
+    def store_pristine(self, sha256: str, data: bytes) -> None:
+        """Keep a generated output as the merge base for later upgrades."""
+        path = self._pristine_path(sha256)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_writer(path) as f:
+            f.write(data)
+
+    def copy_pristine(self, sha256: str, source: Path) -> None:
+        """Keep a generated file, already on disk, as a merge base."""
+        path = self._pristine_path(sha256)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        clone_file(source, path)
+
+    def read_pristine(self, sha256: str) -> Optional[str]:
+        """The output recorded with this hash, or None if it was not kept."""
+        try:
+            data = self._pristine_path(sha256).read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(data).hexdigest() != sha256:
+            return None  # Damaged; no base is better than a wrong one
+        return data.decode("utf-8")
+
+    def prune_pristine(self) -> int:
+        """Delete stored outputs no file refers to; returns the count."""
+        keep = {f.output_sha256 for f in self.files.values()}
+        removed = 0
+        try:
+            buckets = list(os.scandir(self.pristine_dir))
+        except OSError:
+            return 0
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name not in keep:
+                    try:
+                        os.unlink(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+    def relative(self, path: Path) -> str:
+        return Path(path).relative_to(self.root).as_posix()
+
+    def record(
+        self,
+        path: Path,
+        template: str,
+        template_hash: str,
+        context: dict[str, Any],
+        output_sha256: str,
+        component: Optional[str] = None,
+    ) -> None:
+        self.files[self.relative(path)] = LockedFile(
+            template,
+            template_hash,
+            context_hash(context),
+            output_sha256,
+            component,
+            context.get("app_name") if component else None,
+        )
+
+    def record_plan(
+        self,
+        plan,
+        component: Optional[str] = None,
+        components: Optional[dict[Path, str]] = None,
+    ) -> int:
+        """Record every template-rendered file of an executed plan.
+
+        ``component`` names the component of every file, ``components``
+        that of each output path; files already in the lock keep their
+        component unless one is given. Returns the number of files
+        recorded.
+        """
+        recorded = 0
+        for planned in plan.files:
+            job = planned.job
+            if not job.template_name or planned.error is not None:
+                continue
+            if not planned.sha256 or job.engine is None:
+                continue
+            if planned.content is not None:
+                self.store_pristine(planned.sha256, planned.content.encode("utf-8"))
+            else:
+                # Streamed to disk, or cloned from a golden project
+                self.copy_pristine(planned.sha256, Path(job.source or planned.path))
+            template_hash, _ = job.engine.render_key(job.template_name)
+            existing = self.files.get(self.relative(planned.path))
+            name = (components or {}).get(planned.path, component)
+            self.record(
+                planned.path,
+                job.template_name,
+                template_hash,
+                job.context,
+                planned.sha256,
+                name or (existing.component if existing else None),
+            )
+            recorded += 1
+        return recorded
+
+    def save(self) -> None:
+        self.prune_pristine()
+        data = {
+            "format": LOCKFILE_FORMAT,
+            "generator_version": VERSION,
+            "lang": self.lang,
+            "app_name": self.app_name,
+            "toml_values": self.toml_values,
+            "files": {rel: asdict(f) for rel, f in sorted(self.files.items())},
+        }
+        write_if_changed(self.path, json.dumps(data, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,214 @@
+"""Project manifests for batch creation.
+
+A manifest is a JSONL file with one project per line::
+
+    {"name": "acme-agent", "lang": "py", "pm": "uv", "cwd": "customers/acme",
+     "toml": {"timeouts": {"start_to_close": 60}}}
+
+Only ``name`` is required. Blank lines and lines starting with ``#`` are
+ignored. Entries are streamed, never loaded all at once.
+
+Progress is appended to a journal next to the manifest
+(``<manifest>.journal``), one JSON line per finished entry. A later run
+skips entries the journal records as done, matched by line number and
+project name, so an interrupted batch resumes where it stopped; delete
+the journal to start over. Entries whose line moved since (lines
+inserted or removed above them) no longer match and are run again.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import threading
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ..constants import Language
+
+JOURNAL_SUFFIX = ".journal"
+PACKAGE_MANAGERS = ("uv", "pip", "pnpm", "npm")
+
+
+class ManifestError(ValueError):
+    """A manifest line is not a valid project entry."""
+
+
+@dataclass
+class ManifestEntry:
+    """A single project to create."""
+
+    line: int
+    name: str
+    lang: Optional[Language] = None
+    package_manager: Optional[str] = None
+    cwd: Optional[Path] = None
+    toml: dict[str, Any] = field(default_factory=dict)
+
+
+def parse_entry(line_no: int, text: str) -> ManifestEntry:
+    """Parse one manifest line into an entry."""
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise ManifestError(f"line {line_no}: invalid JSON ({e})")
+    if not isinstance(data, dict):
+        raise ManifestError(f"line {line_no}: expected a JSON object")
+    name = data.get("name")
+    if not isinstance(name, str) or not name:
+        raise ManifestError(f"line {line_no}: 'name' is required")
+    lang = data.get("lang")
+    try:
+        lang = Language(lang) if lang else None
+    except ValueError:
+        raise ManifestError(f"line {line_no}: unknown lang {lang!r}")
+    pm = data.get("pm", data.get("package_manager"))
+    if pm is not None and pm not in PACKAGE_MANAGERS:
+        raise ManifestError(f"line {line_no}: unknown package manager {pm!r}")
+    toml = data.get("toml") or {}
+    if not isinstance(toml, dict):
+        raise ManifestError(f"line {line_no}: 'toml' must be an object")
+    cwd = data.get("cwd")
+    return ManifestEntry(
+        line=line_no,
+        name=name,
+        lang=lang,
+        package_manager=pm,
+        cwd=Path(cwd) if cwd else None,
+        toml=toml,
+    )
+
+
+def iter_manifest(path: Path) -> Iterator[tuple[int, str]]:
+    """Yield (line number, text) for every non-blank, non-comment line."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, text in enumerate(f, start=1):
+            text = text.strip()
+            if text and not text.startswith("#"):
+                yield line_no, text
+
+
+def name_tag(name: str) -> int:
+    """64-bit digest of a project name, as kept per done line."""
+    return int.from_bytes(
+        hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class LineRanges:
+    """Set of line numbers stored as sorted, merged ``[start, end]`` ranges.
+
+    Each line carries a 64-bit tag (the project's ``name_tag``), kept in
+    one array per range. Entries finish roughly in manifest order, so the
+    bookkeeping stays proportional to the number of gaps and each line
+    costs 8 bytes.
+    """
+
+    def __init__(self):
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._tags: list[array] = []
+
+    def add(self, line: int, tag: int = 0) -> None:
+        i = bisect.bisect_right(self._starts, line) - 1
+        if i >= 0 and self._starts[i] <= line <= self._ends[i]:
+            self._tags[i][line - self._starts[i]] = tag
+            return
+        joins_left = i >= 0 and self._ends[i] == line - 1
+        joins_right = i + 1 < len(self._starts) and self._starts[i + 1] == line + 1
+        if joins_left and joins_right:
+            self._ends[i] = self._ends[i + 1]
+            self._tags[i].append(tag)
+            self._tags[i].extend(self._tags[i + 1])
+            del self._starts[i + 1], self._ends[i + 1], self._tags[i + 1]
+        elif joins_left:
+            self._ends[i] = line
+            self._tags[i].append(tag)
+        elif joins_right:
+            self._starts[i + 1] = line
+            self._tags[i + 1].insert(0, tag)
+        else:
+            self._starts.insert(i + 1, line)
+            self._ends.insert(i + 1, line)
+            self._tags.insert(i + 1, array("Q", [tag]))
+
+    def tag(self, line: int) -> Optional[int]:
+        """The tag stored with line, or None if the line is not in the set."""
+        i = bisect.bisect_right(self._starts, line) - 1
+        if i >= 0 and line <= self._ends[i]:
+            return self._tags[i][line - self._starts[i]]
+        return None
+
+    def matches(self, line: int, name: str) -> bool:
+        """Whether line is in the set and was recorded for this name."""
+        return self.tag(line) == name_tag(name)
+
+    def __contains__(self, line: int) -> bool:
+        return self.tag(line) is not None
+
+    def __len__(self) -> int:
+        return sum(e - s + 1 for s, e in zip(self._starts, self._ends))
+
+    @property
+    def ranges(self) -> int:
+        return len(self._starts)
+
+
+class Journal:
+    """Append-only record of finished manifest entries."""
+
+    def __init__(self, manifest_path: Path):
+        self.path = Path(str(manifest_path) + JOURNAL_SUFFIX)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self) -> LineRanges:
+        """Return the entries already created successfully.
+
+        Lines are tagged with the recorded project name; check an entry
+        with ``matches(line, name)``.
+        """
+        done = LineRanges()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for text in f:
+                    try:
+                        record = json.loads(text)
+                    except ValueError:
+                        continue  # Torn last line from an interrupted run
+                    if record.get("status") == "ok" and isinstance(
+                        record.get("line"), int
+                    ):
+                        done.add(record["line"], name_tag(str(record.get("name"))))
+        except FileNotFoundError:
+            pass
+        return done
+
+    def record(self, entry_line: int, name: str, status: str, error: str = ""):
+        """Append an outcome; flushed so an interrupted run keeps it."""
+        record = {"line": entry_line, "name": name, "status": status}
+        if error:
+            record["error"] = error
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a+", encoding="utf-8")
+                self._terminate_torn_line()
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def _terminate_torn_line(self) -> None:
+        """Start on a fresh line if a previous run died mid-write."""
+        size = self._file.seek(0, 2)
+        if size:
+            self._file.seek(size - 1)
+            if self._file.read(1) != "\n":
+                self._file.write("\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,110 @@
+"""Line-based three-way merge.
+
+``merge3`` combines the user's version of a generated file with a new
+render of its template, using the render the user started from as the
+common base. Regions changed on only one side take that side's lines;
+regions changed identically on both sides are taken once; anything else
+becomes a conflict, marked diff3-style so editors and ``git`` recognise
+it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+
+@dataclass
+class MergeResult:
+    text: str
+    conflicts: int
+
+    @property
+    def clean(self) -> bool:
+        return self.conflicts == 0
+
+
+def _sync_regions(
+    base: list[str], ours: list[str], theirs: list[str]
+) -> list[tuple[int, int, int, int, int, int]]:
+    """Base ranges unchanged on both sides, with their positions in each.
+
+    Returns ``(base_start, base_end, ours_start, ours_end, theirs_start,
+    theirs_end)`` tuples, ending with an empty region at the very end.
+    """
+    ours_blocks = SequenceMatcher(None, base, ours, autojunk=False)
+    theirs_blocks = SequenceMatcher(None, base, theirs, autojunk=False)
+    a_blocks = ours_blocks.get_matching_blocks()
+    b_blocks = theirs_blocks.get_matching_blocks()
+    regions = []
+    i = j = 0
+    while i < len(a_blocks) and j < len(b_blocks):
+        a_base, a_match, a_len = a_blocks[i]
+        b_base, b_match, b_len = b_blocks[j]
+        start = max(a_base, b_base)
+        end = min(a_base + a_len, b_base + b_len)
+        if start < end:
+            regions.append(
+                (
+                    start,
+                    end,
+                    a_match + start - a_base,
+                    a_match + end - a_base,
+                    b_match + start - b_base,
+                    b_match + end - b_base,
+                )
+            )
+        if a_base + a_len < b_base + b_len:
+            i += 1
+        else:
+            j += 1
+    n = len(base)
+    regions.append((n, n, len(ours), len(ours), len(theirs), len(theirs)))
+    return regions
+
+
+def _terminated(lines: list[str]) -> list[str]:
+    """Lines with a final newline, so conflict markers start a line."""
+    if lines and not lines[-1].endswith("\n"):
+        return [*lines[:-1], lines[-1] + "\n"]
+    return lines
+
+
+def merge3(
+    base: str,
+    ours: str,
+    theirs: str,
+    ours_label: str = "current",
+    theirs_label: str = "new template",
+) -> MergeResult:
+    """Merge ``theirs`` into ``ours`` given their common ancestor ``base``."""
+    base_lines = base.splitlines(keepends=True)
+    ours_lines = ours.splitlines(keepends=True)
+    theirs_lines = theirs.splitlines(keepends=True)
+    out: list[str] = []
+    conflicts = 0
+    z = a = b = 0
+    for z_start, z_end, a_start, a_end, b_start, b_end in _sync_regions(
+        base_lines, ours_lines, theirs_lines
+    ):
+        base_chunk = base_lines[z:z_start]
+        ours_chunk = ours_lines[a:a_start]
+        theirs_chunk = theirs_lines[b:b_start]
+        if ours_chunk == theirs_chunk:
+            out.extend(ours_chunk)
+        elif ours_chunk == base_chunk:
+            out.extend(theirs_chunk)
+        elif theirs_chunk == base_chunk:
+            out.extend(ours_chunk)
+        else:
+            conflicts += 1
+            out.append(f"<<<<<<< {ours_label}\n")
+            out.extend(_terminated(ours_chunk))
+            out.append("||||||| base\n")
+            out.extend(_terminated(base_chunk))
+            out.append("=======\n")
+            out.extend(_terminated(theirs_chunk))
+            out.append(f">>>>>>> {theirs_label}\n")
+        out.extend(base_lines[z_start:z_end])
+        z, a, b = z_end, a_end, b_end
+    return MergeResult("".join(out), conflicts)
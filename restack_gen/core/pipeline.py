@@ -0,0 +1,155 @@
+"""Asynchronous render-and-write pipeline for generated files.
+
+The event loop hands files to a pool of writer threads through a bounded
+queue, which caps the number of files in flight. Template files are
+streamed by the writer with ``TemplateEngine.render_to``, so one file is
+rendered while others are still being written and no output is held in
+memory as a whole; files with literal content are written as they are,
+and golden files are cloned. On slow (e.g. network) filesystems a
+project is written in roughly the time of its slowest file rather than
+the sum of all of them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from ..utils.files import clone_file, write_if_changed
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+@dataclass
+class FileJob:
+    """A file to generate from a template or from literal content."""
+
+    path: Path
+    template_name: Optional[str] = None
+    context: dict[str, Any] = field(default_factory=dict)
+    engine: Any = None
+    content: Optional[str] = None
+    # Existing file to clone instead of rendering (see core.golden)
+    source: Optional[Path] = None
+    mode: Optional[int] = None
+    label: str = ""
+    # Optional files only warn on failure instead of failing the run
+    optional: bool = False
+    hardlink: bool = False
+
+    @property
+    def streamed(self) -> bool:
+        """Whether the pipeline renders this file while writing it."""
+        return self.content is None and self.source is None
+
+    def render(self) -> Optional[str]:
+        """Return the file content, or None for files cloned from source."""
+        if not self.streamed:
+            return self.content
+        return self.engine.render(self.template_name, self.context)
+
+
+@dataclass
+class FileTiming:
+    """Per-file outcome of a pipeline run."""
+
+    job: FileJob
+    # Streamed files are rendered while written: their time is write time
+    render_seconds: float = 0.0
+    write_seconds: float = 0.0
+    bytes_written: int = 0
+    # SHA-256 of the file's content (empty for clones)
+    sha256: str = ""
+    error: Optional[BaseException] = None
+    # Content was identical to the existing file, so nothing was written
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _write(
+    job: FileJob, content: Optional[str], create_dirs: bool
+) -> tuple[int, float, bool, str]:
+    start = time.perf_counter()
+    if create_dirs:
+        job.path.parent.mkdir(parents=True, exist_ok=True)
+    skipped, sha256 = False, ""
+    if job.source is not None:
+        size = clone_file(job.source, job.path, hardlink=job.hardlink)
+    else:
+        if content is not None:
+            result = write_if_changed(job.path, content)
+        else:
+            result = job.engine.render_to(
+                job.path, job.template_name, job.context, skip_unchanged=True
+            )
+        size, skipped, sha256 = result.bytes_written, result.skipped, result.sha256
+    if job.mode is not None:
+        try:
+            job.path.chmod(job.mode)
+        except Exception:
+            pass  # Permissions are best effort (e.g. on Windows)
+    return size, time.perf_counter() - start, skipped, sha256
+
+
+class GenerationPipeline:
+    """Write (and stream-render) files from a thread pool, in bounded batches."""
+
+    def __init__(
+        self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, create_dirs: bool = True
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        # Plans create their directories up front and turn this off
+        self.create_dirs = create_dirs
+
+    def run(self, jobs: list[FileJob]) -> list[FileTiming]:
+        """Generate every job; returns timings in job order."""
+        return asyncio.run(self.run_async(jobs))
+
+    async def run_async(self, jobs: list[FileJob]) -> list[FileTiming]:
+        loop = asyncio.get_running_loop()
+        timings = [FileTiming(job) for job in jobs]
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+        workers = min(self.max_in_flight, len(jobs)) or 1
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="restack-gen-write"
+        ) as executor:
+
+            async def writer():
+                while True:
+                    item = await queue.get()
+                    try:
+                        if item is None:
+                            return
+                        timing, content = item
+                        try:
+                            result = await loop.run_in_executor(
+                                executor, _write, timing.job, content, self.create_dirs
+                            )
+                            (
+                                timing.bytes_written,
+                                timing.write_seconds,
+                                timing.skipped,
+                                timing.sha256,
+                            ) = result
+                        except Exception as e:
+                            timing.error = e
+                    finally:
+                        queue.task_done()
+
+            tasks = [asyncio.create_task(writer()) for _ in range(workers)]
+            for timing in timings:
+                # Blocks while max_in_flight files await writing; template
+                # files are rendered by the writer as they are streamed
+                await queue.put((timing, timing.job.content))
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+        return timings
@@ -0,0 +1,214 @@
+"""Declarative generation plans.
+
+Commands first describe everything they are going to produce (directories
+plus files with their template and context) as a ``GenerationPlan``.
+The whole batch is validated up front (paths, duplicates, templates)
+without rendering anything. Executing the plan creates each directory
+once and streams the files, grouped by directory, through the async
+``GenerationPipeline``, which records each file's SHA-256 as it is
+written. Only ``describe()`` (``--dry-run``) renders the plan ahead, to
+list the exact size and hash of every file without touching the disk;
+a plan rendered that way writes the content it rendered.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .pipeline import DEFAULT_MAX_IN_FLIGHT, FileJob, FileTiming, GenerationPipeline
+
+
+@dataclass
+class PlannedFile:
+    """A file in a plan.
+
+    content and size are known once the plan is rendered; sha256 once it
+    is rendered or executed.
+    """
+
+    job: FileJob
+    content: Optional[str] = None
+    size: int = 0
+    sha256: str = ""
+    render_seconds: float = 0.0
+    error: Optional[BaseException] = None
+
+    @property
+    def path(self) -> Path:
+        return self.job.path
+
+
+def _format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    return f"{size / 1024:.1f} KiB"
+
+
+class GenerationPlan:
+    """Directories and files to generate, applied as a single batch."""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        directories: Iterable[Path] = (),
+        jobs: Iterable[FileJob] = (),
+    ):
+        self.root = Path(root) if root is not None else None
+        self._directories: list[Path] = []
+        self.files: list[PlannedFile] = []
+        self.rendered = False
+        for directory in directories:
+            self.add_directory(directory)
+        for job in jobs:
+            self.add(job)
+
+    def add_directory(self, path: Path) -> None:
+        path = Path(path)
+        if path not in self._directories:
+            self._directories.append(path)
+
+    def add(self, job: FileJob) -> None:
+        self.files.append(PlannedFile(job))
+        self.rendered = False
+
+    @property
+    def directories(self) -> list[Path]:
+        """Every directory the plan needs, parents first."""
+        needed = set(self._directories)
+        needed.update(f.path.parent for f in self.files)
+        if self.root is not None:
+            needed.add(self.root)
+        return sorted(needed, key=lambda p: (len(p.parts), str(p)))
+
+    def render(self) -> "GenerationPlan":
+        """Render every file, recording content, size, hash and errors."""
+        for planned in self.files:
+            if planned.job.source is not None:
+                continue  # Clones carry their size and hash already
+            start = time.perf_counter()
+            try:
+                content = planned.job.render()
+                data = content.encode("utf-8")
+                planned.content = content
+                planned.size = len(data)
+                planned.sha256 = hashlib.sha256(data).hexdigest()
+                planned.error = None
+            except Exception as e:
+                planned.error = e
+            planned.render_seconds = time.perf_counter() - start
+        self.rendered = True
+        return self
+
+    def validate(self) -> list[str]:
+        """Check the whole batch before anything is written.
+
+        Nothing is rendered: template errors surface per file when the
+        plan is executed (or here, for a plan already rendered). Returns
+        human-readable problems; an empty list means the plan can be
+        executed.
+        """
+        problems = []
+        seen: set[Path] = set()
+        root = os.path.abspath(self.root) if self.root is not None else None
+        for planned in self.files:
+            path = planned.path
+            if path in seen:
+                problems.append(f"{path} is generated more than once")
+            seen.add(path)
+            if root is not None:
+                absolute = os.path.abspath(path)
+                if os.path.commonpath([root, absolute]) != root:
+                    problems.append(f"{path} is outside {self.root}")
+            if path.is_dir():
+                problems.append(f"{path} is an existing directory")
+            if planned.job.optional:
+                continue
+            job = planned.job
+            if (
+                job.streamed
+                and job.engine is not None
+                and not job.engine.template_exists(job.template_name)
+            ):
+                problems.append(
+                    f"Template not found for {path.name}: {job.template_name}"
+                )
+            elif planned.error is not None:
+                problems.append(f"Could not render {path.name}: {planned.error}")
+        return problems
+
+    def describe(self, base: Optional[Path] = None) -> list[str]:
+        """Return one line per planned directory and file."""
+        if not self.rendered:
+            self.render()
+        base = base if base is not None else self.root
+
+        def show(path: Path) -> str:
+            if base is not None:
+                try:
+                    return str(path.relative_to(base))
+                except ValueError:
+                    pass
+            return str(path)
+
+        new_dirs = [d for d in self.directories if not d.is_dir()]
+        lines = [f"Would create directory: {show(d)}/" for d in new_dirs]
+        total = 0
+        for planned in self.files:
+            if planned.error is not None:
+                lines.append(f"Would fail: {show(planned.path)} ({planned.error})")
+                continue
+            total += planned.size
+            action = "overwrite" if planned.path.exists() else "write"
+            lines.append(
+                f"Would {action} {show(planned.path)} "
+                f"({_format_size(planned.size)}, sha256 {planned.sha256[:12]})"
+            )
+        lines.append(
+            f"Plan: {len(new_dirs)} new director(ies), "
+            f"{len(self.files)} file(s), {_format_size(total)}"
+        )
+        return lines
+
+    def execute(self, max_in_flight: Optional[int] = None) -> list[FileTiming]:
+        """Validate, create directories once, then write files in parallel.
+
+        Returns timings in plan order and records each file's hash;
+        files that failed to render are reported with their error and
+        not written.
+        """
+        problems = self.validate()
+        if problems:
+            raise ValueError("; ".join(problems))
+        for directory in self.directories:
+            directory.mkdir(parents=True, exist_ok=True)
+        writable = [p for p in self.files if p.error is None]
+        # Group writes by directory for locality
+        writable.sort(key=lambda p: (str(p.path.parent), p.path.name))
+        # Content rendered ahead (by describe) is written as it is
+        jobs = [
+            p.job if p.content is None else replace(p.job, content=p.content)
+            for p in writable
+        ]
+        pipeline = GenerationPipeline(
+            max_in_flight or DEFAULT_MAX_IN_FLIGHT, create_dirs=False
+        )
+        written = {
+            id(planned): timing for planned, timing in zip(writable, pipeline.run(jobs))
+        }
+        timings = []
+        for planned in self.files:
+            timing = written.get(id(planned))
+            if timing is None:
+                timing = FileTiming(planned.job, error=planned.error)
+            else:
+                timing.job = planned.job
+                planned.error = timing.error
+                planned.sha256 = timing.sha256 or planned.sha256
+                timing.render_seconds = planned.render_seconds
+            timings.append(timing)
+        return timings
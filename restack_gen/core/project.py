@@ -1,26 +1,174 @@
 # restack-gen 0.1.0
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
+import json
+import os
+import threading
+from collections import deque
 from pathlib import Path
+from typing import Optional
+
+from ..constants import Language
+
+PROJECT_MARKER = "restack.toml"
+# Never scanned for source files: dependencies, virtualenvs, caches, output
+SCAN_SKIP_DIRS = frozenset(
+    {"node_modules", "venv", "env", "__pycache__", "site-packages", "dist", "build"}
+)
+# Directory entries a language scan looks at before giving up
+SCAN_LIMIT = 5000
+_EXTENSIONS = {".py": Language.PYTHON, ".ts": Language.TYPESCRIPT}
+
+
+def project_table(lang: Language) -> str:
+    """The [project] table `new` writes to restack.toml."""
+    return f'[project]\nlang = "{lang.value}"\n'
+
+
+def recorded_language(root: Path) -> Optional[Language]:
+    """The language recorded in restack.toml, or in the generation lock."""
+    from ..utils.toml import TOMLLoader
+    from .lockfile import LOCKFILE_NAME
+
+    lang = None
+    marker = root / PROJECT_MARKER
+    if marker.is_file() and TOMLLoader.is_available():
+        try:
+            project = TOMLLoader.load(marker).get("project", {})
+            lang = project.get("lang") if isinstance(project, dict) else None
+        except ValueError:
+            pass
+    if lang is None:
+        try:
+            with open(root / LOCKFILE_NAME, "r", encoding="utf-8") as f:
+                lang = json.load(f).get("lang")
+        except (OSError, ValueError, AttributeError):
+            pass
+    try:
+        return Language(lang) if lang else None
+    except ValueError:
+        return None
+
+
+def scan_language(directory: Path, limit: int = SCAN_LIMIT) -> Optional[Language]:
+    """Language of the first source file found, breadth first.
+
+    Stops at the first .py or .ts file, skips SCAN_SKIP_DIRS and hidden
+    directories, and gives up after looking at limit entries.
+    """
+    pending = deque([directory])
+    seen = 0
+    while pending and seen < limit:
+        try:
+            entries = os.scandir(pending.popleft())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                seen += 1
+                if seen > limit:
+                    break
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not name.startswith(".") and name not in SCAN_SKIP_DIRS:
+                            pending.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+                lang = _EXTENSIONS.get(os.path.splitext(name)[1])
+                if lang is not None:
+                    return lang
+    return None
+
+
+ROOT_ENV = "RESTACK_PROJECT_ROOT"
+# Root discovery never walks above a directory holding one of these
+REPO_MARKERS = (".git", ".hg", ".svn")
+
+# Resolved start path -> (root, mtimes of the directories walked)
+_ROOT_CACHE_SIZE = 1024
+_root_cache: dict[Path, tuple[Path, tuple[tuple[Path, int], ...]]] = {}
+_root_cache_lock = threading.Lock()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _walk_to_root(start: Path) -> tuple[Path, tuple[tuple[Path, int], ...]]:
+    """Find the directory holding PROJECT_MARKER at or above start.
+
+    The walk stops at a repository root or where the filesystem changes;
+    without a marker the project root is start itself. Also returns the
+    mtime of every directory looked at, which changes when a marker is
+    created or removed in it.
+    """
+    walked = []
+    device = None
+    for directory in [start, *start.parents]:
+        try:
+            st = os.stat(directory)
+        except OSError:
+            break
+        if device is not None and st.st_dev != device:
+            break  # Mount point: the parent is another filesystem
+        device = st.st_dev
+        walked.append((directory, st.st_mtime_ns))
+        if (directory / PROJECT_MARKER).is_file():
+            return directory, tuple(walked)
+        if any((directory / marker).exists() for marker in REPO_MARKERS):
+            break
+    return start, tuple(walked)
+
+
+def find_project_root(start: Optional[Path] = None) -> Path:
+    """The project root for start (default: the working directory).
+
+    $RESTACK_PROJECT_ROOT, when set, is used without looking at the disk.
+    Otherwise results are cached per resolved start path and reused while
+    none of the directories walked has changed (one stat per directory
+    instead of several).
+    """
+    override = os.environ.get(ROOT_ENV)
+    if override:
+        return Path(override).expanduser().resolve()
+    start = Path(start).resolve() if start is not None else Path.cwd().resolve()
+    with _root_cache_lock:
+        cached = _root_cache.get(start)
+    if cached is not None:
+        root, walked = cached
+        if all(_mtime_ns(directory) == mtime for directory, mtime in walked):
+            return root
+    root, walked = _walk_to_root(start)
+    with _root_cache_lock:
+        if len(_root_cache) >= _ROOT_CACHE_SIZE:
+            _root_cache.clear()
+        _root_cache[start] = (root, walked)
+    return root
+
+
+def clear_root_cache() -> None:
+    with _root_cache_lock:
+        _root_cache.clear()
 
 
 class ProjectStructure:
     """Handles project directory structure and paths."""
 
-    def __init__(self, project_root: Path | None = None):
-        # Use provided project_root or default to current working directory
-        if project_root is None:
-            start_path = Path.cwd().resolve()
+    def __init__(self, project_root: Path | None = None, discover: bool = True):
+        # Use provided project_root or default to current working directory.
+        # With discover, the root is the nearest directory with restack.toml
+        # (see find_project_root); without, project_root is used as is.
+        if discover:
+            root = find_project_root(project_root)
+        elif project_root is None:
+            root = Path.cwd().resolve()
         else:
-            start_path = project_root.resolve()
-
-        # Search for marker file (restack.toml) in current and parent directories
-        marker = "restack.toml"
-        root = start_path
-        for parent in [start_path] + list(start_path.parents):
-            if (parent / marker).exists():
-                root = parent
-                break
+            root = Path(project_root).resolve()
         self.root = root
         self.src_dir = self.root / "src"
         self.tests_dir = self.root / "tests"
@@ -30,14 +178,17 @@ class ProjectStructure:
         """Get subdirectory path under src/."""
         return self.src_dir / subdir
 
-    def ensure_structure(self):
-        """Create standard project structure."""
-        dirs = [
+    def structure_dirs(self) -> list[Path]:
+        """Directories making up the standard project structure."""
+        return [
             self.src_dir / "agents",
             self.src_dir / "functions",
             self.src_dir / "workflows",
             self.tests_dir,
             self.scripts_dir,
         ]
-        for dir_path in dirs:
+
+    def ensure_structure(self):
+        """Create standard project structure."""
+        for dir_path in self.structure_dirs():
             dir_path.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,226 @@
+"""Re-render a generated project from its lock file.
+
+Shared by ``sync`` and ``upgrade``. Files whose template and render
+context are unchanged since generation are left alone. Files the user
+has not touched are replaced by a fresh render. Files the user edited
+are skipped by ``sync``; ``upgrade`` three-way merges the fresh render
+into them, using the stored pristine output as the merge base.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from ..constants import Language
+from ..utils.files import file_sha256
+from .lockfile import GenerationLock, context_hash
+from .merge import merge3
+from .pipeline import FileJob
+from .plan import GenerationPlan
+from .templates import TemplateEngine, build_template_context
+
+if TYPE_CHECKING:
+    from ..constants import Config
+
+
+@dataclass
+class FileChange:
+    """What happened (or would happen) to one generated file."""
+
+    path: str
+    # "updated", "merged", "conflict" or "skipped"
+    action: str
+    detail: str = ""
+    # The new content matched the file on disk, so nothing was written
+    identical: bool = False
+
+
+@dataclass
+class ProjectReport:
+    """Outcome of re-rendering one project; picklable for worker processes."""
+
+    root: Path
+    changes: list[FileChange] = field(default_factory=list)
+    unchanged: int = 0
+    error: str = ""
+    # Why the project was left alone (e.g. it has no lock file)
+    skipped: str = ""
+    # Dry-run plan lines, and anything printed while working
+    plan: list[str] = field(default_factory=list)
+    output: str = ""
+
+    def count(self, action: str) -> int:
+        return sum(1 for change in self.changes if change.action == action)
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and not self.count("conflict")
+
+
+def _toml_values(new, lock: GenerationLock) -> dict:
+    """TOML-derived values from restack.toml, else those used at creation.
+
+    A restack.toml holding only the [project] table has no settings, so
+    the values recorded at creation (e.g. manifest overrides) still apply.
+    """
+    from ..utils.toml import TOMLLoader
+
+    toml_path = lock.root / "restack.toml"
+    if toml_path.is_file() and TOMLLoader.is_available():
+        values = new._extract_toml_values(TOMLLoader.load(toml_path))
+        if values:
+            return values
+    return lock.toml_values
+
+
+def expected_jobs(
+    new,
+    engine: TemplateEngine,
+    lock: GenerationLock,
+    lang: Language,
+    toml_values: dict,
+) -> list[FileJob]:
+    """Every template-rendered file the project should contain now."""
+    from ..utils.console import print_warning
+
+    jobs = []
+    if lock.app_name:
+        plan = new._plan_app(engine, lock.app_name, lock.root, lang, toml_values)
+        jobs = [p.job for p in plan.files if p.job.template_name]
+    for rel, locked in sorted(lock.files.items()):
+        if locked.component is None:
+            continue
+        if not engine.template_exists(locked.template):
+            print_warning(f"Skipped {rel}: template {locked.template} is gone")
+            continue
+        # Same context `generate` renders components with
+        context = build_template_context(
+            locked.component, app_name=locked.app_name or lock.root.name
+        )
+        jobs.append(FileJob(lock.root / rel, locked.template, context, engine=engine))
+    return jobs
+
+
+def regenerate(
+    lock: GenerationLock, config: Config, merge: bool = False
+) -> ProjectReport:
+    """Bring one project up to date; see the module docstring."""
+    from ..commands.new import NewCommand
+
+    lang = Language(lock.lang or Language.PYTHON.value)
+    # The project's language wins over --lang
+    new = NewCommand(dataclasses.replace(config, lang=lang))
+    engine = new._get_engine(lang)
+    toml_values = _toml_values(new, lock)
+    report = ProjectReport(lock.root)
+
+    # (job with final content, change, new pristine render)
+    updates: list[tuple[FileJob, FileChange, str]] = []
+    for job in expected_jobs(new, engine, lock, lang, toml_values):
+        rel = lock.relative(job.path)
+        locked = lock.files.get(rel)
+        template_hash, _ = engine.render_key(job.template_name)
+        if (
+            locked is not None
+            and locked.template == job.template_name
+            and locked.template_hash == template_hash
+            and locked.context_hash == context_hash(job.context)
+        ):
+            report.unchanged += 1
+            continue
+        current_sha = file_sha256(job.path)
+        expected = locked.output_sha256 if locked is not None else None
+        rendered = job.render()
+        if current_sha == expected or config.force:
+            change = FileChange(rel, "updated")
+            updates.append(
+                (dataclasses.replace(job, content=rendered), change, rendered)
+            )
+            continue
+        # Edited, deleted, or created by hand since generation
+        base = None
+        if merge and locked is not None and current_sha is not None:
+            base = lock.read_pristine(locked.output_sha256)
+        if base is None:
+            if not merge:
+                detail = "changed since it was generated (use --force to overwrite)"
+            elif current_sha is None:
+                detail = "deleted since it was generated"
+            else:
+                detail = "edited, and no merge base was recorded"
+            report.changes.append(FileChange(rel, "skipped", detail))
+            continue
+        try:
+            current = job.path.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            report.changes.append(FileChange(rel, "skipped", "not a text file"))
+            continue
+        result = merge3(base, current, rendered)
+        if result.clean:
+            change = FileChange(rel, "merged")
+        else:
+            change = FileChange(
+                rel, "conflict", f"{result.conflicts} conflicting hunk(s)"
+            )
+        updates.append(
+            (dataclasses.replace(job, content=result.text), change, rendered)
+        )
+
+    plan = GenerationPlan(lock.root, jobs=[job for job, _, _ in updates])
+    report.changes.extend(change for _, change, _ in updates)
+    if config.dry_run:
+        report.plan = plan.describe()
+        return report
+    if updates:
+        for timing, (job, change, rendered) in zip(plan.execute(), updates):
+            if not timing.ok:
+                raise timing.error
+            change.identical = timing.skipped
+            # The fresh render, not the merged file, is the next merge base
+            data = rendered.encode("utf-8")
+            sha256 = hashlib.sha256(data).hexdigest()
+            lock.store_pristine(sha256, data)
+            existing = lock.files.get(change.path)
+            lock.record(
+                job.path,
+                job.template_name,
+                engine.render_key(job.template_name)[0],
+                job.context,
+                sha256,
+                existing.component if existing else None,
+            )
+    if updates or lock.toml_values != toml_values:
+        lock.toml_values = toml_values
+        lock.save()
+    return report
+
+
+def upgrade_project(root: Path, config: Config) -> ProjectReport:
+    """Upgrade one project of a workspace, capturing what it prints.
+
+    Runs in worker processes, so it never raises; failures are reported.
+    """
+    import io
+
+    from ..utils.console import capture_output
+
+    buffer = io.StringIO()
+    report: Optional[ProjectReport] = None
+    with capture_output(buffer):
+        try:
+            lock = GenerationLock.load(root)
+            if lock is None:
+                report = ProjectReport(
+                    Path(root),
+                    skipped="no .restack-gen.lock (generated before restack-gen 0.2?)",
+                )
+            else:
+                report = regenerate(lock, config, merge=True)
+        except Exception as e:
+            report = ProjectReport(Path(root), error=str(e) or type(e).__name__)
+    report.output = buffer.getvalue()
+    return report
@@ -0,0 +1,487 @@
+"""Register generated components in ``service.py`` and ``routes.ts``.
+
+``generate`` adds each new component to the project's registry: an
+import, and an entry in the ``agents=``/``workflows=``/``functions=``
+lists of ``start_service(...)`` (Python) or the exported
+``agents``/``workflows``/``functions`` maps (TypeScript). Edits are
+insertions at positions taken from ``ast`` or the routes tokenizer, so
+the rest of the file, its comments and its formatting are left as they
+are; all components of a batch are added in a single rewrite.
+Components already imported or registered are not added again.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ..constants import Language
+from ..utils.files import write_if_changed
+from ..utils.text import pascal_case
+from .routes import KINDS, parse_python, parse_typescript, tokenize_typescript
+
+PYTHON_REGISTRY = "service.py"
+TS_REGISTRIES = ("src/routes.ts", "routes.ts")
+_TS_HEADER = "/* Registry listing for `restack-gen routes` */\n"
+_TS_EXPORT = re.compile(r"^export\s+(?:async\s+)?function\s+([A-Za-z_$][\w$]*)", re.M)
+
+
+@dataclass
+class Registration:
+    """One component to register."""
+
+    kind: str
+    # Module path from the project root, e.g. src/agents/billing.py
+    path: str
+    # The class or function the module defines
+    symbol: str
+    # Generated name, for TypeScript map keys
+    name: str = ""
+
+
+@dataclass
+class RegistryUpdate:
+    """The outcome of registering components in one registry file."""
+
+    path: Path
+    added: list[Registration] = field(default_factory=list)
+    # Components that could not be registered automatically, and why
+    problems: list[str] = field(default_factory=list)
+    created: bool = False
+
+
+def component_symbol(
+    path: Path, kind: str, source: Optional[str] = None
+) -> Optional[str]:
+    """The class or function a generated module registers, if found.
+
+    Python components are the definition decorated @<kind>.defn;
+    TypeScript ones the first exported function. source, when given, is
+    the module's content, so the file is not read.
+    """
+    if source is None:
+        try:
+            source = Path(path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+    if str(path).endswith(".ts"):
+        match = _TS_EXPORT.search(source)
+        return match.group(1) if match else None
+    definitions = parse_python(source).definitions
+    return next((n for n, (k, _) in definitions.items() if k == kind), None)
+
+
+def registry_path(root: Path, lang: Language) -> Path:
+    if lang == Language.TYPESCRIPT:
+        for rel in TS_REGISTRIES:
+            if (root / rel).is_file():
+                return root / rel
+        return root / TS_REGISTRIES[0]
+    return root / PYTHON_REGISTRY
+
+
+def _apply(source: str, insertions: list[tuple[int, str]]) -> str:
+    """Insert texts at distinct offsets, back to front so offsets hold."""
+    for offset, text in sorted(insertions, reverse=True):
+        source = source[:offset] + text + source[offset:]
+    return source
+
+
+def _grouped(insertions: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    """Merge texts inserted at the same offset, in the order given."""
+    merged: dict[int, str] = {}
+    for offset, text in insertions:
+        merged[offset] = merged.get(offset, "") + text
+    return list(merged.items())
+
+
+def _indent_of(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _list_insertion(
+    source: str, opener: int, closer: int, last: Optional[tuple[int, int]], items
+) -> tuple[int, str]:
+    """Where and what to insert to append items to a bracketed list.
+
+    opener and closer are the offsets of the brackets; last is the
+    (start, end) of the final element, if any. A list written one
+    element per line gets one new line per item, in its indentation and
+    trailing-comma style; a one-line list is extended on its line.
+    """
+    if last is None:
+        if "\n" in source[opener:closer]:
+            line_start = source.rfind("\n", 0, opener) + 1
+            indent = _indent_of(source[line_start:opener])
+            inner = indent + ("\t" if indent.startswith("\t") else "    ")
+            body = "".join(f"\n{inner}{item}," for item in items)
+            return opener + 1, body + "\n" + indent
+        return opener + 1, ", ".join(items)
+    start, end = last
+    if "\n" not in source[end:closer]:
+        return end, "".join(f", {item}" for item in items)
+    line_start = source.rfind("\n", 0, start) + 1
+    indent = _indent_of(source[line_start:start])
+    between = source[end:closer]
+    if between.lstrip().startswith(","):
+        return end + between.index(",") + 1, "".join(
+            f"\n{indent}{item}," for item in items
+        )
+    return end, "," + ",".join(f"\n{indent}{item}" for item in items)
+
+
+# -- Python -----------------------------------------------------------------
+
+
+class _PythonSource:
+    """service.py with ast positions converted to string offsets."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tree = ast.parse(source)
+        self._lines = source.splitlines(keepends=True)
+        self._starts = [0]
+        for line in self._lines:
+            self._starts.append(self._starts[-1] + len(line))
+
+    def offset(self, lineno: int, col: int) -> int:
+        # ast columns count UTF-8 bytes
+        line = self._lines[lineno - 1] if lineno <= len(self._lines) else ""
+        chars = len(line.encode("utf-8")[:col].decode("utf-8", "ignore"))
+        return self._starts[lineno - 1] + chars
+
+    def start(self, node: ast.AST) -> int:
+        return self.offset(node.lineno, node.col_offset)
+
+    def end(self, node: ast.AST) -> int:
+        return self.offset(node.end_lineno, node.end_col_offset)
+
+    def line_end(self, lineno: int) -> int:
+        return self._starts[min(lineno, len(self._lines))]
+
+
+def _service_call(tree: ast.Module) -> Optional[ast.Call]:
+    """The start_service(...) call, or else any call with registry keywords."""
+    fallback = None
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else None
+        if isinstance(func, ast.Name):
+            name = func.id
+        if name == "start_service":
+            return node
+        if fallback is None and any(
+            k.arg in ("agents", "workflows", "functions") for k in node.keywords
+        ):
+            fallback = node
+    return fallback
+
+
+def _module_bindings(tree: ast.Module) -> tuple[set[str], dict[str, ast.expr]]:
+    """Names bound at module level, and module-level assignments."""
+    names: set[str] = set()
+    assigns: dict[str, ast.expr] = {}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+                    assigns[target.id] = node.value
+    return names, assigns
+
+
+def register_python(
+    source: str, registrations: list[Registration], update: RegistryUpdate
+) -> str:
+    """source with registrations imported and added to start_service()."""
+    try:
+        parsed = _PythonSource(source)
+    except SyntaxError as e:
+        update.problems.append(f"{update.path.name} does not parse (line {e.lineno})")
+        return source
+    call = _service_call(parsed.tree)
+    if call is None:
+        update.problems.append(f"no start_service(...) call in {update.path.name}")
+        return source
+    bound, assigns = _module_bindings(parsed.tree)
+    keywords = {k.arg: k for k in call.keywords if k.arg}
+    insertions: list[tuple[int, str]] = []
+    added: list[Registration] = []
+
+    for kind in KINDS:
+        todo = [r for r in registrations if r.kind == kind]
+        if not todo:
+            continue
+        keyword = keywords.get(f"{kind}s")
+        if keyword is None:
+            insertions.append(
+                _new_keyword(parsed, call, f"{kind}s", [r.symbol for r in todo])
+            )
+            added.extend(todo)
+            continue
+        value = keyword.value
+        if isinstance(value, ast.Name) and isinstance(assigns.get(value.id), ast.List):
+            value = assigns[value.id]
+        if not isinstance(value, ast.List):
+            update.problems.extend(
+                f"{kind}s= is not a list literal; register {r.symbol} by hand"
+                for r in todo
+            )
+            continue
+        listed = {ast.unparse(elt) for elt in value.elts}
+        todo = [r for r in todo if r.symbol not in listed]
+        if not todo:
+            continue
+        last = value.elts[-1] if value.elts else None
+        insertions.append(
+            _list_insertion(
+                source,
+                parsed.start(value),
+                parsed.end(value) - 1,
+                (parsed.start(last), parsed.end(last)) if last else None,
+                [r.symbol for r in todo],
+            )
+        )
+        added.extend(todo)
+
+    imports = [r for r in added if r.symbol not in bound]
+    if imports:
+        insertions.append(_import_insertion(parsed, imports))
+    update.added.extend(added)
+    return _apply(source, _grouped(insertions))
+
+
+def _new_keyword(
+    parsed: _PythonSource, call: ast.Call, keyword: str, symbols: list[str]
+) -> tuple[int, str]:
+    """Add keyword=[...] after the last registry keyword (or argument)."""
+    source = parsed.source
+    value = f"{keyword}=[{', '.join(symbols)}]"
+    registry = [
+        k for k in call.keywords if k.arg in ("agents", "workflows", "functions")
+    ]
+    anchors = registry or [*call.args, *call.keywords]
+    if not anchors:
+        return parsed.end(call) - 1, value
+    anchor = anchors[-1]
+    node = anchor.value if isinstance(anchor, ast.keyword) else anchor
+    end = parsed.end(node)
+    line_start = source.rfind("\n", 0, parsed.start(anchor)) + 1
+    own_line = not source[line_start : parsed.start(anchor)].strip()
+    after = source[end : parsed.end(call) - 1]
+    if not own_line:
+        return end, f", {value}"
+    indent = _indent_of(source[line_start:])
+    if after.lstrip().startswith(","):
+        return end + after.index(",") + 1, f"\n{indent}{value},"
+    return end, f",\n{indent}{value}"
+
+
+def _import_insertion(
+    parsed: _PythonSource, registrations: list[Registration]
+) -> tuple[int, str]:
+    """Import lines after the last `from src...` import, or the last import."""
+    top_imports = [
+        n for n in parsed.tree.body if isinstance(n, (ast.Import, ast.ImportFrom))
+    ]
+    project = [
+        n
+        for n in top_imports
+        if isinstance(n, ast.ImportFrom) and (n.module or "").startswith("src.")
+    ]
+    anchor = (project or top_imports or [None])[-1]
+    lines = "".join(
+        f"from {os.path.splitext(r.path)[0].replace('/', '.')} import {r.symbol}\n"
+        for r in registrations
+    )
+    if anchor is None:
+        return 0, lines
+    offset = parsed.line_end(anchor.end_lineno)
+    if not parsed.source[:offset].endswith("\n"):
+        return offset, "\n" + lines
+    return offset, lines
+
+
+# -- TypeScript -------------------------------------------------------------
+
+
+def _ts_specifier(registry: str, path: str, extension: bool) -> str:
+    target = os.path.splitext(path)[0] + (".js" if extension else "")
+    relative = os.path.relpath(target, os.path.dirname(registry) or ".")
+    relative = Path(relative).as_posix()
+    return relative if relative.startswith(".") else f"./{relative}"
+
+
+def _ts_key(registration: Registration) -> str:
+    """Map key, as the routes.ts template writes them."""
+    symbol = registration.symbol
+    if registration.kind == "agent":
+        return pascal_case(registration.name or symbol)
+    if registration.kind == "workflow":
+        return symbol[:1].upper() + symbol[1:]
+    return symbol
+
+
+def _ts_export(tokens: list, name: str) -> Optional[tuple[int, int]]:
+    """Token indexes of the brackets of `export const name = {...}` / `[...]`."""
+    for i in range(len(tokens) - 4):
+        if (
+            tokens[i][1] == "export"
+            and tokens[i + 1][1] == "const"
+            and tokens[i + 2][1] == name
+            and tokens[i + 3][1] == "="
+            and tokens[i + 4][1] in ("{", "[")
+        ):
+            depth = 0
+            for j in range(i + 4, len(tokens)):
+                if tokens[j][1] in "{[(":
+                    depth += 1
+                elif tokens[j][1] in "}])":
+                    depth -= 1
+                    if depth == 0:
+                        return i + 4, j
+            return None
+    return None
+
+
+def _ts_last_element(tokens: list, opener: int, closer: int) -> Optional[int]:
+    """Index of the last token of the final element, skipping a trailing comma."""
+    j = closer - 1
+    if j > opener and tokens[j][1] == ",":
+        j -= 1
+    return j if j > opener else None
+
+
+def register_typescript(
+    source: str,
+    registry: str,
+    registrations: list[Registration],
+    update: RegistryUpdate,
+) -> str:
+    """source with registrations imported and added to the exported maps."""
+    facts = parse_typescript(source)
+    tokens = tokenize_typescript(source)
+    # Follow the file's style: quotes, semicolons, `.js` specifiers
+    strings = [t[1] for t in tokens if t[0] == "string"]
+    quote = strings[0][0] if strings and strings[0][0] in "\"'" else '"'
+    specifiers = [m for m, _ in facts.imports.values() if m.startswith(".")]
+    extension = bool(specifiers) and all(m.endswith(".js") for m in specifiers)
+    import_ends = []
+    for i, token in enumerate(tokens):
+        if token[1] == "import" and i + 1 < len(tokens) and tokens[i + 1][1] != "(":
+            j = i + 1
+            while j < len(tokens) and tokens[j][0] != "string":
+                j += 1
+            if j < len(tokens):
+                semicolon = j + 1 < len(tokens) and tokens[j + 1][1] == ";"
+                end_token = tokens[j + 1] if semicolon else tokens[j]
+                import_ends.append((end_token[3] + len(end_token[1]), semicolon))
+    semicolon = import_ends[-1][1] if import_ends else True
+    end = ";" if semicolon else ""
+
+    insertions: list[tuple[int, str]] = []
+    added: list[Registration] = []
+    appended = ""
+    for kind in KINDS:
+        registered = {s for _, s in facts.registrations.get(kind, [])}
+        todo = [
+            r for r in registrations if r.kind == kind and r.symbol not in registered
+        ]
+        if not todo:
+            continue
+        brackets = _ts_export(tokens, f"{kind}s")
+        if brackets is None:
+            entries = "".join(
+                f"  {quote}{_ts_key(r)}{quote}: {r.symbol},\n" for r in todo
+            )
+            appended += f"\nexport const {kind}s = {{\n{entries}}}{end}\n"
+        else:
+            opener, closer = brackets
+            as_object = tokens[opener][1] == "{"
+            last = _ts_last_element(tokens, opener, closer)
+            last_span = None
+            if last is not None:
+                first = last
+                while first > opener + 1 and tokens[first - 1][1] != ",":
+                    first -= 1
+                last_span = (
+                    tokens[first][3],
+                    tokens[last][3] + len(tokens[last][1]),
+                )
+            items = [
+                f"{quote}{_ts_key(r)}{quote}: {r.symbol}" if as_object else r.symbol
+                for r in todo
+            ]
+            insertions.append(
+                _list_insertion(
+                    source, tokens[opener][3], tokens[closer][3], last_span, items
+                )
+            )
+        added.extend(todo)
+
+    imports = [r for r in added if r.symbol not in facts.imports]
+    if imports:
+        lines = "".join(
+            f"\nimport {{ {r.symbol} }} from "
+            f"{quote}{_ts_specifier(registry, r.path, extension)}{quote}{end}"
+            for r in imports
+        )
+        if import_ends:
+            insertions.append((import_ends[-1][0], lines))
+        else:
+            # After any header comment, before the first statement
+            offset = tokens[0][3] if tokens else len(source)
+            insertions.append((offset, lines.lstrip("\n") + "\n\n"))
+    update.added.extend(added)
+    source = _apply(source, _grouped(insertions))
+    if appended:
+        source = source.rstrip("\n") + "\n" + appended
+    return source
+
+
+# -- Entry point ------------------------------------------------------------
+
+
+def register_components(
+    root: Path,
+    lang: Language,
+    registrations: list[Registration],
+    dry_run: bool = False,
+) -> RegistryUpdate:
+    """Register components in the project's registry file.
+
+    A project without service.py is left without one (it registers its
+    components some other way); a missing routes.ts is created. The file
+    is written once, and only if something was added.
+    """
+    root = Path(root)
+    path = registry_path(root, lang)
+    update = RegistryUpdate(path)
+    rel = path.relative_to(root).as_posix()
+    try:
+        source = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        if lang != Language.TYPESCRIPT:
+            return update
+        source, update.created = _TS_HEADER, True
+    except (OSError, UnicodeDecodeError) as e:
+        update.problems.append(f"cannot read {rel}: {e}")
+        return update
+    if lang == Language.TYPESCRIPT:
+        updated = register_typescript(source, rel, registrations, update)
+    else:
+        updated = register_python(source, registrations, update)
+    if update.added and not dry_run:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(path, updated)
+    return update
@@ -0,0 +1,344 @@
+"""Content-addressed cache of rendered templates.
+
+Bulk scaffolding renders the same templates with contexts that only differ
+in variables the template never reads (e.g. ``app_name`` for
+``function.py.j2``), so most outputs are byte-identical. Entries are keyed
+by the template's content hash and a canonical hash of the context
+variables it references, as recorded in the template catalog.
+
+Volatile values (``timestamp``, ``date`` and the ``now()`` global by
+default) are left out of the key. While rendering a cacheable template
+they are replaced by stand-ins that emit placeholders; the cached text
+keeps the placeholders and the real values are substituted on every hit.
+If a template does anything with a volatile value other than print it
+(slice it, compare it, read an attribute), the render is not cached.
+
+Entries live in a bounded in-memory LRU and, when
+``RESTACK_GEN_RENDER_CACHE_DISK`` is set, in ``<user cache dir>/renders``
+so separate processes share them too. Outputs larger than
+``max_entry_size`` are never kept. ``TemplateEngine.render_to`` streams
+templates that are that large, or that turned out not to be cacheable,
+instead of rendering them to a string for the cache.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from ..constants import VERSION
+from ..utils.paths import user_cache_dir
+from .bytecode import DEFAULT_MAX_SIZE, cache_entries, prune_cache_dir
+
+DISABLE_ENV = "RESTACK_GEN_NO_RENDER_CACHE"
+DISK_ENV = "RESTACK_GEN_RENDER_CACHE_DISK"
+DEFAULT_MAX_ENTRIES = 256
+# Largest rendered text (in characters) kept as an entry
+DEFAULT_MAX_ENTRY_SIZE = 64 * 1024
+VOLATILE_KEYS = frozenset({"timestamp", "date", "now"})
+
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+
+
+def render_cache_dir() -> Path:
+    """Return the directory holding cached renders."""
+    return user_cache_dir() / "renders"
+
+
+class _UncacheableRender(Exception):
+    """A volatile value was used in a way placeholders cannot reproduce."""
+
+
+class _Recorder:
+    """Hands out placeholders and remembers what each one stands for."""
+
+    def __init__(self):
+        self.marks: list[list] = []
+        self.tainted = False
+
+    def mark(self, key: str, op: str = "str", arg: Optional[str] = None) -> str:
+        self.marks.append([key, op, arg])
+        return f"\x00{len(self.marks) - 1}\x00"
+
+
+class _Volatile:
+    """Stand-in for a volatile context value during a cacheable render."""
+
+    def __init__(self, recorder: _Recorder, key: str):
+        self._recorder = recorder
+        self._key = key
+
+    def __str__(self) -> str:
+        return self._recorder.mark(self._key)
+
+    def strftime(self, fmt: str) -> str:
+        return self._recorder.mark(self._key, "strftime", fmt)
+
+    def isoformat(self, sep: str = "T") -> str:
+        return self._recorder.mark(self._key, "isoformat", sep)
+
+    def _taint(self, *args, **kwargs):
+        self._recorder.tainted = True
+        raise _UncacheableRender(self._key)
+
+    __bool__ = __len__ = __iter__ = __getitem__ = __contains__ = _taint
+    __eq__ = __lt__ = __le__ = __gt__ = __ge__ = __add__ = __radd__ = _taint
+    __hash__ = object.__hash__
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)  # Protocol probes such as __html__
+        self._taint()
+
+
+def _canonical(value: Any) -> Any:
+    return f"{type(value).__qualname__}:{value!r}"
+
+
+class RenderEntry:
+    """Rendered text with placeholders for volatile values."""
+
+    __slots__ = ("text", "marks")
+
+    def __init__(self, text: str, marks: list[list]):
+        self.text = text
+        self.marks = marks
+
+    def fill(self, context: dict[str, Any]) -> Optional[str]:
+        """Substitute real volatile values, or None if they do not fit."""
+        if not self.marks:
+            return self.text
+        values = []
+        now = None
+        try:
+            for key, op, arg in self.marks:
+                if key == "now" and "now" not in context:
+                    now = now or datetime.datetime.now()
+                    value = now
+                else:
+                    value = context[key]
+                if op == "strftime":
+                    values.append(value.strftime(arg))
+                elif op == "isoformat":
+                    values.append(value.isoformat(arg))
+                else:
+                    values.append(str(value))
+        except Exception:
+            return None
+        return _PLACEHOLDER.sub(lambda m: values[int(m.group(1))], self.text)
+
+
+class RenderCache:
+    """Two-tier (memory LRU + optional disk) cache of rendered templates."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        directory: Optional[Path] = None,
+        volatile_keys=VOLATILE_KEYS,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_entry_size: int = DEFAULT_MAX_ENTRY_SIZE,
+    ):
+        self.max_entries = max_entries
+        self.max_entry_size = max_entry_size
+        self.directory = Path(directory) if directory is not None else None
+        self.volatile_keys = frozenset(volatile_keys)
+        self.max_size = max_size
+        self._entries: OrderedDict[str, RenderEntry] = OrderedDict()
+        # Templates whose output is too large or could not be cached
+        self._bypassed: set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def key_for(self, template_key: str, context: dict[str, Any], variables) -> str:
+        """Hash a template identity and the non-volatile context it reads."""
+        names = context.keys() if variables is None else variables
+        relevant = {
+            name: context[name]
+            for name in names
+            if name in context and name not in self.volatile_keys
+        }
+        payload = json.dumps(
+            [VERSION, template_key, relevant], sort_keys=True, default=_canonical
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def bypasses(self, engine, template_name: str) -> bool:
+        """Whether a template is better rendered without the cache.
+
+        True for templates larger than max_entry_size and for those whose
+        output was too large or could not be cached before.
+        """
+        info = engine.catalog.get(template_name)
+        if info is not None and info.size > self.max_entry_size:
+            return True
+        template_key, _ = engine.render_key(template_name)
+        with self._lock:
+            return template_key in self._bypassed
+
+    def render(self, engine, template_name: str, context: dict[str, Any]) -> str:
+        """Render through the cache using the engine's catalog metadata."""
+        template_key, variables = engine.render_key(template_name)
+        with self._lock:
+            bypassed = template_key in self._bypassed
+            self.uncacheable += bypassed
+        if bypassed:
+            return engine.get_template(template_name).render(context)
+        key = self.key_for(template_key, context, variables)
+        entry = self.get(key)
+        if entry is not None:
+            text = entry.fill(context)
+            if text is not None:
+                with self._lock:
+                    self.hits += 1
+                engine.record_lookup(template_name)
+                return text
+        with self._lock:
+            self.misses += 1
+        template = engine.get_template(template_name)
+        entry = self._capture(template, context)
+        text = entry.fill(context) if entry is not None else None
+        if entry is None or len(entry.text) > self.max_entry_size:
+            with self._lock:
+                self.uncacheable += 1
+                self._bypassed.add(template_key)
+            return text if text is not None else template.render(context)
+        if text is None:
+            return template.render(context)
+        self.put(key, entry)
+        return text
+
+    def _capture(self, template, context: dict[str, Any]) -> Optional[RenderEntry]:
+        """Render with volatile stand-ins; None if the result is not reusable."""
+        recorder = _Recorder()
+        staged = dict(context)
+        for key in self.volatile_keys:
+            if key in context:
+                staged[key] = _Volatile(recorder, key)
+        if "now" in self.volatile_keys and "now" not in context:
+            staged["now"] = lambda: _Volatile(recorder, "now")
+        try:
+            text = template.render(staged)
+        except Exception:
+            return None
+        if recorder.tainted:
+            return None
+        # Every placeholder handed out must land in the output exactly once
+        found = [int(m.group(1)) for m in _PLACEHOLDER.finditer(text)]
+        if sorted(found) != list(range(len(recorder.marks))):
+            return None
+        return RenderEntry(text, recorder.marks)
+
+    def get(self, key: str) -> Optional[RenderEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: RenderEntry) -> None:
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def _remember(self, key: str, entry: RenderEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[RenderEntry]:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = RenderEntry(data["text"], data["marks"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        try:
+            os.utime(path)  # Keep recently used entries on prune
+        except OSError:
+            pass
+        return entry
+
+    def _write_disk(self, key: str, entry: RenderEntry) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        from ..utils.files import write_text
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_text(path, json.dumps({"text": entry.text, "marks": entry.marks}))
+        except OSError:
+            return  # An unwritable cache must never break rendering
+        prune_cache_dir(str(path.parent), ".json", self.max_size)
+
+    def clear(self) -> int:
+        """Drop every entry from both tiers. Returns disk entries removed."""
+        with self._lock:
+            self._entries.clear()
+            self._bypassed.clear()
+        removed = 0
+        if self.directory is not None:
+            for entry in cache_entries(str(self.directory), ".json"):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        """Return memory/disk entry counts and hit/miss counters."""
+        disk_entries = []
+        if self.directory is not None:
+            disk_entries = cache_entries(str(self.directory), ".json")
+        with self._lock:
+            return {
+                "directory": str(self.directory) if self.directory else None,
+                "entries": len(self._entries),
+                "disk_entries": len(disk_entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+            }
+
+
+# Global instances, one per disk directory (None = memory only)
+_caches: dict[Optional[str], RenderCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Get the shared render cache, or None when disabled."""
+    if os.environ.get(DISABLE_ENV):
+        return None
+    directory = str(render_cache_dir()) if os.environ.get(DISK_ENV) else None
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = RenderCache(
+                directory=Path(directory) if directory else None
+            )
+        return cache
@@ -0,0 +1,639 @@
+"""Routes engine: what a project registers, and where it is defined.
+
+The registries are ``service.py`` (the ``agents=``, ``workflows=`` and
+``functions=`` arguments of ``start_service``) and, for TypeScript,
+``routes.ts`` (its exported ``agents``/``workflows``/``functions``
+objects). Python is parsed with ``ast`` and TypeScript with a small
+tokenizer. Registered names are followed through imports into ``src/``
+to the class or function that defines them; Python components count
+only when decorated with ``@agent.defn``, ``@workflow.defn`` or
+``@function.defn``.
+
+Each file is parsed once into ``FileFacts`` (imports, registrations,
+definitions). Facts are cached in ``.restack/routes`` keyed by path,
+mtime and size, and files that are not cached yet are parsed in worker
+processes when there are enough of them to pay for starting the pool.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..utils.files import write_if_changed
+
+CACHE_PATH = Path(".restack") / "routes"
+CACHE_FORMAT = 2
+KINDS = ("agent", "workflow", "function")
+# Registry argument / export name for each kind
+_REGISTRY_NAMES = {f"{kind}s": kind for kind in KINDS}
+REGISTRIES = ("service.py", "src/routes.ts", "routes.ts")
+# Uncached files below this are parsed in-process: a process pool costs
+# more to start than parsing a few hundred files
+PARALLEL_THRESHOLD = 256
+# Import hops followed from a registry to a definition
+_MAX_HOPS = 8
+
+
+@dataclass
+class FileFacts:
+    """What one source file imports, registers and defines."""
+
+    # Local name -> [module or relative path, imported name or None]
+    imports: dict[str, list] = field(default_factory=dict)
+    # Kind -> [[registered name, local symbol], ...]
+    registrations: dict[str, list] = field(default_factory=dict)
+    # Name -> [kind or None, line]; kind is None for undecorated exports
+    definitions: dict[str, list] = field(default_factory=dict)
+    # [caller, symbol, via, line]: via is "step", "child" or "import" (a
+    # name imported under import_functions(), with caller None: every
+    # component in the file)
+    calls: list[list] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class Route:
+    """One registered (or defined but unregistered) component."""
+
+    kind: str
+    name: str
+    source: Optional[str] = None
+    line: Optional[int] = None
+    # Name of the definition in source, when it differs from name
+    definition: Optional[str] = None
+
+    @property
+    def resolved(self) -> bool:
+        return self.source is not None
+
+
+# -- Python -----------------------------------------------------------------
+
+
+def _decorator_kind(node: ast.expr) -> Optional[str]:
+    """'agent' for @agent.defn / @agent.defn(...), and so on."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if (
+        isinstance(node, ast.Attribute)
+        and node.attr == "defn"
+        and isinstance(node.value, ast.Name)
+        and node.value.id in KINDS
+    ):
+        return node.value.id
+    return None
+
+
+def _dotted(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
+def _symbols(node: ast.expr, assigns: dict[str, ast.expr], depth: int = 0) -> list:
+    """Names in a registration list, through variables, `+` and `*`."""
+    if depth > _MAX_HOPS:
+        return []
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        names = []
+        for elt in node.elts:
+            if isinstance(elt, ast.Starred):
+                names.extend(_symbols(elt.value, assigns, depth + 1))
+            else:
+                name = _dotted(elt)
+                if name:
+                    names.append(name)
+        return names
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _symbols(node.left, assigns, depth + 1) + _symbols(
+            node.right, assigns, depth + 1
+        )
+    if isinstance(node, ast.Name) and node.id in assigns:
+        return _symbols(assigns[node.id], assigns, depth + 1)
+    return []
+
+
+# Calls that run another component: x.step(fn, ...), x.child_execute(...)
+_CALL_VIA = {
+    "step": "step",
+    "child_execute": "child",
+    "child_start": "child",
+    "executeChild": "child",
+    "childExecute": "child",
+    "childStart": "child",
+}
+# Keyword arguments naming the component a call runs
+_TARGET_KEYWORDS = ("function", "workflow", "agent")
+
+
+def _call_target(call: ast.Call) -> Optional[str]:
+    for keyword in call.keywords:
+        if keyword.arg in _TARGET_KEYWORDS:
+            return _dotted(keyword.value)
+    return _dotted(call.args[0]) if call.args else None
+
+
+def _python_calls(tree: ast.Module, facts: FileFacts) -> None:
+    """Component calls inside decorated definitions, and import_functions()."""
+    for node in tree.body:
+        if isinstance(node, ast.With) and any(
+            isinstance(item.context_expr, ast.Call)
+            and (_dotted(item.context_expr.func) or "").endswith("import_functions")
+            for item in node.items
+        ):
+            for statement in node.body:
+                if isinstance(statement, ast.ImportFrom):
+                    for alias in statement.names:
+                        local = alias.asname or alias.name
+                        facts.calls.append([None, local, "import", statement.lineno])
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            if facts.definitions.get(node.name, [None])[0] is None:
+                continue
+            for child in ast.walk(node):
+                if not isinstance(child, ast.Call):
+                    continue
+                func = child.func
+                attr = func.attr if isinstance(func, ast.Attribute) else None
+                if isinstance(func, ast.Name):
+                    attr = func.id
+                via = _CALL_VIA.get(attr or "")
+                target = _call_target(child) if via else None
+                if target:
+                    facts.calls.append([node.name, target, via, child.lineno])
+
+
+def parse_python(source: str) -> FileFacts:
+    facts = FileFacts()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        facts.error = f"line {e.lineno}: {e.msg}"
+        return facts
+    assigns: dict[str, ast.expr] = {}
+    calls = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            for alias in node.names:
+                if alias.name != "*":
+                    facts.imports[alias.asname or alias.name] = [module, alias.name]
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    facts.imports[alias.asname] = [alias.name, None]
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                kind = _decorator_kind(decorator)
+                if kind:
+                    facts.definitions[node.name] = [kind, node.lineno]
+                    break
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assigns[target.id] = node.value
+        elif isinstance(node, ast.Call):
+            calls.append(node)
+    for call in calls:
+        for keyword in call.keywords:
+            kind = _REGISTRY_NAMES.get(keyword.arg or "")
+            if kind:
+                names = _symbols(keyword.value, assigns)
+                facts.registrations.setdefault(kind, []).extend(
+                    [name, name] for name in names
+                )
+    _python_calls(tree, facts)
+    return facts
+
+
+# -- TypeScript -------------------------------------------------------------
+
+_TS_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+    | (?P<ident>[A-Za-z_$][\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<punct>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_TS_DECLARATIONS = {"function", "class", "const", "let", "var", "interface", "type"}
+
+
+def tokenize_typescript(source: str) -> list[tuple[str, str, int, int]]:
+    """(kind, text, line, offset) tokens, without whitespace and comments.
+
+    Strings keep their quotes. Good enough for import/export statements
+    and object literals; not a TypeScript parser.
+    """
+    tokens = []
+    line = 1
+    for match in _TS_TOKEN.finditer(source):
+        kind, text = match.lastgroup, match.group()
+        if kind not in ("space", "comment"):
+            tokens.append((kind, text, line, match.start()))
+        line += text.count("\n")
+    return tokens
+
+
+def _ts_import(tokens: list, i: int, facts: FileFacts) -> int:
+    """Parse an import statement starting after `import`; returns next index."""
+    names: list[tuple[str, str]] = []
+    while i < len(tokens) and tokens[i][1] not in ("from", ";"):
+        kind, text = tokens[i][:2]
+        if text == "{":
+            i += 1
+            while i < len(tokens) and tokens[i][1] != "}":
+                if tokens[i][0] == "ident" and tokens[i][1] != "type":
+                    name = local = tokens[i][1]
+                    if i + 2 < len(tokens) and tokens[i + 1][1] == "as":
+                        local = tokens[i + 2][1]
+                        i += 2
+                    names.append((local, name))
+                i += 1
+        elif text == "*" and i + 2 < len(tokens) and tokens[i + 1][1] == "as":
+            names.append((tokens[i + 2][1], "*"))
+            i += 2
+        elif kind == "ident" and text != "type":
+            names.append((text, "default"))
+        i += 1
+    if i + 1 < len(tokens) and tokens[i][1] == "from" and tokens[i + 1][0] == "string":
+        module = tokens[i + 1][1][1:-1]
+        for local, name in names:
+            facts.imports[local] = [module, name]
+        i += 2
+    return i
+
+
+def _ts_dotted(tokens: list, i: int) -> tuple[str, int]:
+    """`a.b.c` starting at identifier i; returns (name, last index)."""
+    name = tokens[i][1]
+    while (
+        i + 2 < len(tokens) and tokens[i + 1][1] == "." and tokens[i + 2][0] == "ident"
+    ):
+        name += "." + tokens[i + 2][1]
+        i += 2
+    return name, i
+
+
+def _ts_registry(tokens: list, i: int, kind: str, facts: FileFacts) -> int:
+    """Parse the `{...}` or `[...]` after `export const agents =`."""
+    opener = tokens[i][1]
+    entries = facts.registrations.setdefault(kind, [])
+    depth = 0
+    expect_key = True
+    key = None
+    while i < len(tokens):
+        text = tokens[i][1]
+        if text in "{[(":
+            depth += 1
+        elif text in "}])":
+            depth -= 1
+            if depth == 0:
+                if key and opener == "{":
+                    entries.append([key, key])  # Trailing shorthand
+                return i + 1
+        elif depth == 1:
+            token_kind = tokens[i][0]
+            if text == ",":
+                if key and opener == "{":
+                    entries.append([key, key])
+                key, expect_key = None, True
+            elif opener == "[" and token_kind == "ident":
+                name, i = _ts_dotted(tokens, i)
+                entries.append([name, name])
+            elif expect_key and token_kind in ("ident", "string"):
+                key = text.strip("\"'`")
+                expect_key = False
+            elif text == ":" and key:
+                if i + 1 < len(tokens) and tokens[i + 1][0] == "ident":
+                    symbol, i = _ts_dotted(tokens, i + 1)
+                    entries.append([key, symbol])
+                key = None
+        i += 1
+    return i
+
+
+def _ts_call(tokens: list, i: int, caller: str, facts: FileFacts) -> None:
+    """Record `step(fn, ...)` / `executeChild({ workflow: wf })` at i."""
+    via = _CALL_VIA[tokens[i][1]]
+    j = i + 2  # Past the name and "("
+    if j < len(tokens) and tokens[j][1] == "{":
+        # Object argument: the function/workflow/agent property
+        while j + 2 < len(tokens) and tokens[j][1] not in (")", ";"):
+            if tokens[j][1] in _TARGET_KEYWORDS and tokens[j + 1][1] == ":":
+                j += 2
+                break
+            j += 1
+        else:
+            return
+    if j < len(tokens) and tokens[j][0] == "ident":
+        facts.calls.append([caller, _ts_dotted(tokens, j)[0], via, tokens[j][2]])
+
+
+def parse_typescript(source: str) -> FileFacts:
+    """Facts of a TypeScript module.
+
+    Calls are attributed to the exported declaration they follow, which
+    is the enclosing one for the usual one-declaration-per-block layout.
+    """
+    facts = FileFacts()
+    tokens = tokenize_typescript(source)
+    caller = None
+    i = 0
+    while i < len(tokens):
+        text = tokens[i][1]
+        if (
+            caller
+            and text in _CALL_VIA
+            and i + 1 < len(tokens)
+            and tokens[i + 1][1] == "("
+            and (i == 0 or tokens[i - 1][1] not in ("function", "async"))
+        ):
+            _ts_call(tokens, i, caller, facts)
+        if text == "import" and (i == 0 or tokens[i - 1][1] in (";", "}")):
+            i = _ts_import(tokens, i + 1, facts)
+            continue
+        if text == "export":
+            j = i + 1
+            while j < len(tokens) and tokens[j][1] in ("default", "async", "declare"):
+                j += 1
+            if j + 1 < len(tokens) and tokens[j][1] in _TS_DECLARATIONS:
+                name_token = tokens[j + 1]
+                if name_token[0] == "ident":
+                    facts.definitions[name_token[1]] = [None, name_token[2]]
+                    caller = name_token[1]
+                    kind = _REGISTRY_NAMES.get(name_token[1])
+                    if (
+                        kind
+                        and tokens[j][1] == "const"
+                        and j + 3 < len(tokens)
+                        and tokens[j + 2][1] == "="
+                        and tokens[j + 3][1] in ("{", "[")
+                    ):
+                        i = _ts_registry(tokens, j + 3, kind, facts)
+                        continue
+            i = j
+            continue
+        i += 1
+    return facts
+
+
+def parse_file(path: str) -> dict:
+    """Facts of one file as a dict; module level so worker processes can run it."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return asdict(FileFacts(error=str(e)))
+    parse = parse_typescript if path.endswith(".ts") else parse_python
+    return asdict(parse(source))
+
+
+# -- Cache and resolution ---------------------------------------------------
+
+
+class RouteTable:
+    """Routes of one project, resolved to their definitions."""
+
+    def __init__(self, root: Path, jobs: Optional[int] = None):
+        self.root = Path(root)
+        self.jobs = jobs
+        self.registries: list[str] = []
+        self.routes: list[Route] = []
+        self.unregistered: list[Route] = []
+        self.errors: dict[str, str] = {}
+        self._facts: dict[str, FileFacts] = {}
+        self._cache: dict[str, dict] = {}
+        self._cache_dirty = False
+        self.parsed = 0
+
+    # Facts, from the cache or parsed (in parallel when there are many)
+
+    def _load_cache(self) -> None:
+        try:
+            with open(self.root / CACHE_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == CACHE_FORMAT:
+                self._cache = data.get("files", {})
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def save_cache(self) -> None:
+        if not self._cache_dirty:
+            return
+        data = {"format": CACHE_FORMAT, "files": self._cache}
+        path = self.root / CACHE_PATH
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(path, json.dumps(data, sort_keys=True) + "\n")
+        except OSError:
+            return  # Read-only tree; parse again next time
+        self._cache_dirty = False
+
+    def _parse_many(self, paths: list[str]) -> list[dict]:
+        if len(paths) < PARALLEL_THRESHOLD:
+            return [parse_file(p) for p in paths]
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        from .workers import default_jobs
+
+        workers = self.jobs or default_jobs("process")
+        chunksize = max(1, len(paths) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                return list(pool.map(parse_file, paths, chunksize=chunksize))
+        except (OSError, BrokenProcessPool):
+            # No worker processes here (sandbox, frozen __main__); parse inline
+            return [parse_file(p) for p in paths]
+
+    def prefetch(self, rels: Iterable[str]) -> None:
+        """Make facts for rels available, parsing uncached files together.
+
+        Cached facts are checked against each file's own stat, never a
+        stat recorded elsewhere (the component index may be older).
+        """
+        todo: dict[str, tuple[int, int]] = {}
+        root = str(self.root)
+        for rel in rels:
+            if rel in self._facts or rel in todo:
+                continue
+            try:
+                st = os.stat(os.path.join(root, rel))
+            except OSError:
+                continue
+            known = (st.st_mtime_ns, st.st_size)
+            cached = self._cache.get(rel)
+            if (
+                cached is not None
+                and cached.get("mtime_ns") == known[0]
+                and cached.get("size") == known[1]
+            ):
+                self._facts[rel] = FileFacts(**cached["facts"])
+            else:
+                todo[rel] = known
+        if not todo:
+            return
+        rels_todo = list(todo)
+        results = self._parse_many([os.path.join(root, rel) for rel in rels_todo])
+        self.parsed += len(results)
+        for rel, facts in zip(rels_todo, results):
+            mtime_ns, size = todo[rel]
+            self._cache[rel] = {"mtime_ns": mtime_ns, "size": size, "facts": facts}
+            self._facts[rel] = FileFacts(**facts)
+        self._cache_dirty = True
+
+    def facts(self, rel: str) -> Optional[FileFacts]:
+        self.prefetch([rel])
+        facts = self._facts.get(rel)
+        if facts is not None and facts.error:
+            self.errors[rel] = facts.error
+        return facts
+
+    # Import resolution
+
+    def _module_file(self, module: str, importer: str) -> Optional[str]:
+        """Project-relative file a module refers to, if it is in the project."""
+        if importer.endswith(".ts"):
+            if not module.startswith("."):
+                return None  # A package, not project code
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), module))
+            candidates = [base + ".ts", base, base + "/index.ts"]
+        else:
+            level = len(module) - len(module.lstrip("."))
+            parts = module.lstrip(".").split(".") if module.strip(".") else []
+            if level:
+                package = Path(importer).parent.parts
+                package = (
+                    package[: len(package) - (level - 1)] if level > 1 else package
+                )
+                parts = [*package, *parts]
+            base = "/".join(parts)
+            candidates = [base + ".py", base + "/__init__.py"]
+        for candidate in candidates:
+            candidate = Path(candidate).as_posix()
+            if not candidate.startswith("..") and (self.root / candidate).is_file():
+                return candidate
+        return None
+
+    def resolve(
+        self, symbol: str, rel: str, trail: Optional[list] = None
+    ) -> Optional[tuple[str, str, int, Optional[str]]]:
+        """(file, name, line, kind) of the definition symbol refers to in rel.
+
+        Files passed through on the way (re-exports) are added to trail.
+        """
+        for _ in range(_MAX_HOPS):
+            facts = self.facts(rel)
+            if facts is None:
+                return None
+            if trail is not None:
+                trail.append(rel)
+            if symbol in facts.definitions:
+                kind, line = facts.definitions[symbol]
+                return rel, symbol, line, kind
+            head, _, rest = symbol.partition(".")
+            imported = facts.imports.get(head)
+            if imported is None:
+                return None
+            module, name = imported
+            target = self._module_file(module, rel)
+            submodule = None
+            if rest and name not in (None, "*") and not rel.endswith(".ts"):
+                # from pkg import module; module.Name
+                joined = module + name if module.endswith(".") else f"{module}.{name}"
+                submodule = self._module_file(joined, rel)
+            if submodule is not None:
+                target, symbol = submodule, rest
+            elif rest and name is None:  # import pkg.mod as alias; alias.Name
+                symbol = rest
+            elif rest and name == "*":  # import * as ns; ns.name
+                symbol = rest
+            elif rest:
+                symbol = f"{name}.{rest}"
+            else:
+                symbol = name
+            if target is None or symbol in (None, "*"):
+                return None
+            rel = target
+        return None
+
+    # Building the table
+
+    def build(self, components: Optional[dict] = None) -> "RouteTable":
+        """Resolve every registration.
+
+        components maps paths to component index entries (anything with
+        a kind); those files are checked for components no registry
+        registers.
+        """
+        self._load_cache()
+        components = components or {}
+        self.registries = [r for r in REGISTRIES if (self.root / r).is_file()]
+        if "src/routes.ts" in self.registries and "routes.ts" in self.registries:
+            self.registries.remove("routes.ts")
+        self.prefetch([*self.registries, *components])
+        registered: set[tuple[str, str]] = set()
+        registered_files: set[str] = set()
+        for registry in self.registries:
+            facts = self.facts(registry)
+            if facts is None:
+                continue
+            for kind in KINDS:
+                for name, symbol in facts.registrations.get(kind, []):
+                    route = Route(kind, name)
+                    trail: list[str] = []
+                    found = self.resolve(symbol, registry, trail)
+                    # A definition decorated as another kind does not count
+                    if found is not None and found[3] in (None, kind):
+                        route.source, route.line = found[0], found[2]
+                        route.definition = found[1]
+                        registered.add((found[0], found[1]))
+                        registered_files.update(trail)
+                    self.routes.append(route)
+        for rel in sorted(components):
+            facts = self._facts.get(rel)
+            if facts is None:
+                continue
+            if facts.error:
+                self.errors[rel] = facts.error
+            decorated = False
+            for name, (def_kind, line) in facts.definitions.items():
+                if def_kind is None:
+                    continue
+                decorated = True
+                if (rel, name) not in registered:
+                    self.unregistered.append(Route(def_kind, name, rel, line))
+            if not decorated and rel not in registered_files:
+                kind = components[rel].kind
+                self.unregistered.append(Route(kind, Path(rel).stem, rel))
+        return self
+
+    def to_dict(self) -> dict:
+        def route(r: Route) -> dict:
+            return {"name": r.name, "source": r.source, "line": r.line}
+
+        return {
+            "root": str(self.root),
+            "registries": self.registries,
+            "routes": {
+                f"{kind}s": [route(r) for r in self.routes if r.kind == kind]
+                for kind in KINDS
+            },
+            "unregistered": [{"kind": r.kind, **route(r)} for r in self.unregistered],
+            "errors": self.errors,
+        }
@@ -0,0 +1,217 @@
+"""Crash-safe staged creation of project directories.
+
+A project is built in a hidden sibling directory on the same filesystem
+(``.<name>.<pid>.<token>.restack-gen-stage``) and published with a single
+``rename``, so the target either appears complete or not at all. A lock
+file (``.<name>.restack-gen.lock``) claims the name for the duration, so a
+second creator racing on the same name fails immediately.
+
+Failed stages are renamed into ``.restack-gen-trash`` (cheap, atomic) and
+deleted by a background thread. Stages and locks left behind by crashed
+processes are reclaimed by the same pass on a later run.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+STAGE_SUFFIX = ".restack-gen-stage"
+LOCK_SUFFIX = ".restack-gen.lock"
+TRASH_DIRNAME = ".restack-gen-trash"
+# Leftovers older than this are reclaimed even if their owner looks alive
+STALE_AFTER_SECONDS = 24 * 60 * 60
+
+
+class StagingConflict(FileExistsError):
+    """Another process is creating, or has created, the same directory."""
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # No cheap, safe probe; rely on STALE_AFTER_SECONDS
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but owned by someone else
+    return True
+
+
+def _owner_pid(name: str) -> Optional[int]:
+    """Extract the owning pid from a stage directory name."""
+    parts = name[: -len(STAGE_SUFFIX)].rsplit(".", 2)
+    if len(parts) != 3:
+        return None
+    try:
+        return int(parts[1])
+    except ValueError:
+        return None
+
+
+def _is_stale(path: str, pid: Optional[int]) -> bool:
+    try:
+        age = time.time() - os.lstat(path).st_mtime
+    except OSError:
+        return False
+    if age > STALE_AFTER_SECONDS:
+        return True
+    return pid is not None and pid != os.getpid() and not _pid_alive(pid)
+
+
+def reclaim(parent: Path) -> int:
+    """Delete trashed stages and leftovers of dead processes under parent.
+
+    Returns the number of entries removed.
+    """
+    removed = 0
+    trash = Path(parent) / TRASH_DIRNAME
+    try:
+        with os.scandir(trash) as it:
+            entries = list(it)
+    except OSError:
+        entries = []
+    for entry in entries:
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed += not os.path.lexists(entry.path)
+    try:
+        trash.rmdir()
+    except OSError:
+        pass  # Not empty (another process is trashing) or already gone
+    try:
+        with os.scandir(parent) as it:
+            leftovers = [e for e in it if e.name.startswith(".")]
+    except OSError:
+        return removed
+    for entry in leftovers:
+        if entry.name.endswith(STAGE_SUFFIX):
+            if _is_stale(entry.path, _owner_pid(entry.name)):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        elif entry.name.endswith(LOCK_SUFFIX) and entry.name != LOCK_SUFFIX:
+            # (a bare .restack-gen.lock is a project's generation lock file)
+            if _is_stale(entry.path, _read_lock_pid(entry.path)):
+                try:
+                    os.unlink(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
+
+
+def reclaim_in_background(parent: Path) -> threading.Thread:
+    """Run reclaim() on a daemon thread; unfinished work is redone later."""
+    thread = threading.Thread(
+        target=reclaim, args=(Path(parent),), name="restack-gen-reclaim", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _read_lock_pid(path: str) -> Optional[int]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0) or None
+    except (OSError, ValueError):
+        return None
+
+
+class StagedDirectory:
+    """Build a directory out of place and publish it atomically.
+
+    Usage::
+
+        with StagedDirectory(target) as stage:
+            ...  # write into stage.path
+            stage.publish()
+
+    Leaving the block without publishing (including via an exception)
+    moves the stage to the trash.
+    """
+
+    def __init__(self, target: Path):
+        self.target = Path(target)
+        self.parent = self.target.parent
+        name = self.target.name
+        token = secrets.token_hex(4)
+        self.path = self.parent / f".{name}.{os.getpid()}.{token}{STAGE_SUFFIX}"
+        self.lock_path = self.parent / f".{name}{LOCK_SUFFIX}"
+        self.published = False
+        self._locked = False
+
+    def __enter__(self) -> "StagedDirectory":
+        self.parent.mkdir(parents=True, exist_ok=True)
+        self._acquire_lock()
+        try:
+            if os.path.lexists(self.target):
+                raise StagingConflict(f"Directory already exists: {self.target}")
+            self.path.mkdir()
+        except BaseException:
+            self._release_lock()
+            raise
+        reclaim_in_background(self.parent)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if not self.published:
+                self.discard()
+        finally:
+            self._release_lock()
+
+    def _acquire_lock(self) -> None:
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                # A crashed creator's lock may be reclaimed once, then retried
+                if _is_stale(str(self.lock_path), _read_lock_pid(str(self.lock_path))):
+                    try:
+                        os.unlink(self.lock_path)
+                    except OSError:
+                        pass
+                    continue
+                raise StagingConflict(
+                    f"{self.target} is already being created by another process"
+                )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            self._locked = True
+            return
+        raise StagingConflict(
+            f"{self.target} is already being created by another process"
+        )
+
+    def _release_lock(self) -> None:
+        if self._locked:
+            try:
+                os.unlink(self.lock_path)
+            except OSError:
+                pass
+            self._locked = False
+
+    def publish(self) -> None:
+        """Atomically move the finished stage to the target path."""
+        if os.path.lexists(self.target):
+            raise StagingConflict(f"Directory already exists: {self.target}")
+        os.rename(self.path, self.target)
+        self.published = True
+
+    def discard(self) -> None:
+        """Move the stage to the trash and reclaim it in the background."""
+        if not self.path.exists():
+            return
+        trash = self.parent / TRASH_DIRNAME
+        try:
+            trash.mkdir(exist_ok=True)
+            os.rename(self.path, trash / self.path.name)
+        except OSError:
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        reclaim_in_background(self.parent)
@@ -0,0 +1,295 @@
+"""Process supervisor behind `restack-gen dev`.
+
+Runs the local engine script and the worker (``service.py``, or
+``src/server.ts`` for TypeScript) as child processes and watches the
+project. A burst of changes restarts the worker, and only the worker,
+when it touches a file in the worker's import closure: the entry
+module and every project module it imports, directly or not. Edits
+elsewhere (tests, unused modules, docs) are ignored. The closure is
+recomputed after each restart, so newly imported modules are picked up.
+
+Each restart records its latency, from the first change seen to the
+new worker being started, in ``.restack/dev.json``.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .routes import tokenize_typescript
+from .watch import OVERFLOW, collect
+
+STATS_PATH = Path(".restack") / "dev.json"
+# Restarts kept in the stats file
+STATS_LIMIT = 100
+# Seconds a stopping process gets before it is killed
+STOP_TIMEOUT = 5.0
+
+
+# -- Import closure ---------------------------------------------------------
+
+
+def _python_file(root: Path, parts: list[str]) -> list[str]:
+    """Project files importing the dotted module parts executes."""
+    files = []
+    for i in range(1, len(parts) + 1):
+        base = "/".join(parts[:i])
+        init = f"{base}/__init__.py"
+        if (root / init).is_file():
+            files.append(init)
+        elif i == len(parts) and (root / f"{base}.py").is_file():
+            files.append(f"{base}.py")
+    return files
+
+
+def _python_imports(root: Path, rel: str, source: str) -> set[str]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+    package = Path(rel).parent.parts
+    found: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                found.update(_python_file(root, alias.name.split(".")))
+        elif isinstance(node, ast.ImportFrom):
+            parts = (node.module or "").split(".") if node.module else []
+            if node.level:
+                base = package[: len(package) - (node.level - 1)]
+                if node.level - 1 > len(package):
+                    continue
+                parts = [*base, *parts]
+            found.update(_python_file(root, parts))
+            for alias in node.names:  # from pkg import module
+                found.update(_python_file(root, [*parts, alias.name])[-1:])
+    return found
+
+
+def _ts_imports(root: Path, rel: str, source: str) -> set[str]:
+    tokens = tokenize_typescript(source)
+    found: set[str] = set()
+    for i, (kind, text, _, _) in enumerate(tokens):
+        if kind != "string" or i == 0:
+            continue
+        before = tokens[i - 1][1]
+        dynamic = before == "(" and i > 1 and tokens[i - 2][1] in ("import", "require")
+        if before not in ("from", "import") and not dynamic:
+            continue
+        spec = text[1:-1]
+        if not spec.startswith("."):
+            continue  # A package
+        base = os.path.normpath(os.path.join(os.path.dirname(rel), spec))
+        stem = base[:-3] if base.endswith(".js") else base
+        for candidate in (base, stem + ".ts", stem + "/index.ts"):
+            candidate = Path(candidate).as_posix()
+            if not candidate.startswith("..") and (root / candidate).is_file():
+                found.add(candidate)
+                break
+    return found
+
+
+def import_closure(root: Path, entry: str) -> set[str]:
+    """Project files (relative to root) the entry module loads."""
+    root = Path(root)
+    closure: set[str] = set()
+    pending = [entry]
+    while pending:
+        rel = pending.pop()
+        if rel in closure:
+            continue
+        try:
+            source = (root / rel).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        closure.add(rel)
+        parse = _ts_imports if rel.endswith(".ts") else _python_imports
+        pending.extend(parse(root, rel, source) - closure)
+    return closure
+
+
+# -- Supervision ------------------------------------------------------------
+
+
+@dataclass
+class Restart:
+    """One worker restart."""
+
+    files: list[str]
+    # First change seen -> new worker started
+    latency_ms: float
+    # Time spent waiting for the burst of changes to end
+    debounce_ms: float
+    # Time the old worker took to stop
+    stop_ms: float
+
+
+class Supervisor:
+    """Run engine and worker; restart the worker when its sources change."""
+
+    def __init__(
+        self,
+        root: Path,
+        worker: list[str],
+        entry: str,
+        watcher,
+        engine: Optional[list[str]] = None,
+        engine_shell: bool = False,
+        debounce: float = 0.15,
+        log: Callable[[str], None] = print,
+    ):
+        self.root = Path(root)
+        self.worker_command = worker
+        self.entry = entry
+        self.watcher = watcher
+        self.engine_command = engine
+        self.engine_shell = engine_shell
+        self.debounce = debounce
+        self.log = log
+        self.engine: Optional[subprocess.Popen] = None
+        self.worker: Optional[subprocess.Popen] = None
+        self.restarts: list[Restart] = []
+        self.closure: set[str] = set()
+        self._reported_exits: set[int] = set()
+
+    def _spawn(self, command: list[str], shell: bool = False) -> subprocess.Popen:
+        # Own process group, so stopping reaches the whole child tree
+        # (`uv run`, `npx tsx` ...) and Ctrl-C reaches only us
+        if sys.platform.startswith("win"):
+            return subprocess.Popen(
+                command,
+                cwd=self.root,
+                shell=shell,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+            )
+        return subprocess.Popen(
+            command, cwd=self.root, shell=shell, start_new_session=True
+        )
+
+    def _stop(self, process: Optional[subprocess.Popen]) -> None:
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if sys.platform.startswith("win"):
+                process.terminate()
+            else:
+                os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            if sys.platform.startswith("win"):
+                process.kill()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+        except ProcessLookupError:
+            pass  # Exited meanwhile
+
+    def _start_worker(self) -> None:
+        self.closure = import_closure(self.root, self.entry)
+        self.worker = self._spawn(self.worker_command)
+
+    def relevant(self, changed: set[str]) -> list[str]:
+        """The changed files the worker loads, relative to root."""
+        if OVERFLOW in changed:
+            return [OVERFLOW]
+        hits = []
+        for path in changed:
+            try:
+                rel = Path(path).relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            if rel in self.closure:
+                hits.append(rel)
+        return sorted(hits)
+
+    def restart(self, files: list[str], first_change: float) -> Restart:
+        collected = time.monotonic()
+        self._stop(self.worker)
+        stopped = time.monotonic()
+        self._start_worker()
+        started = time.monotonic()
+        restart = Restart(
+            files,
+            latency_ms=round((started - first_change) * 1000, 1),
+            debounce_ms=round((collected - first_change) * 1000, 1),
+            stop_ms=round((stopped - collected) * 1000, 1),
+        )
+        self.restarts.append(restart)
+        return restart
+
+    def _check_exits(self) -> None:
+        for name, process in (("Engine", self.engine), ("Worker", self.worker)):
+            if process is None or process.pid in self._reported_exits:
+                continue
+            code = process.poll()
+            if code is None:
+                continue
+            self._reported_exits.add(process.pid)
+            if name == "Worker":
+                self.log(f"Worker exited with code {code}; waiting for changes")
+            elif code != 0:
+                self.log(f"Engine exited with code {code}")
+
+    def run(self, max_restarts: Optional[int] = None, timeout: float = 0.5) -> int:
+        """Supervise until interrupted (or after max_restarts restarts)."""
+        try:
+            if self.engine_command:
+                self.engine = self._spawn(self.engine_command, self.engine_shell)
+            self._start_worker()
+            while max_restarts is None or len(self.restarts) < max_restarts:
+                changed, first = collect(self.watcher, timeout, self.debounce)
+                self._check_exits()
+                if not changed:
+                    continue
+                files = self.relevant(changed)
+                if not files:
+                    continue
+                restart = self.restart(files, first)
+                shown = ", ".join(files[:3]) + (" ..." if len(files) > 3 else "")
+                self.log(f"Restarted worker in {restart.latency_ms:.0f} ms ({shown})")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop(self.worker)
+            self._stop(self.engine)
+            self.watcher.close()
+            self.save_stats()
+        return 0
+
+    def summary(self) -> Optional[str]:
+        if not self.restarts:
+            return None
+        latencies = sorted(r.latency_ms for r in self.restarts)
+        median = latencies[len(latencies) // 2]
+        return (
+            f"{len(latencies)} restart(s): median {median:.0f} ms, "
+            f"max {latencies[-1]:.0f} ms"
+        )
+
+    def save_stats(self) -> None:
+        """Append this session's restarts to .restack/dev.json."""
+        if not self.restarts:
+            return
+        path = self.root / STATS_PATH
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                history = json.load(f).get("restarts", [])
+        except (OSError, ValueError, AttributeError):
+            history = []
+        history = [*history, *(asdict(r) for r in self.restarts)][-STATS_LIMIT:]
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"restarts": history}, f, indent=1)
+                f.write("\n")
+        except OSError:
+            pass  # Stats are a convenience
@@ -1,55 +1,339 @@
 # restack-gen 0.1.0
 # Date: 2025-11-10
 # Timestamp: 2025-11-10T10:38:06.925606
+import hashlib
+import os
+import threading
 from pathlib import Path
 from typing import Any, Optional
 
+# Built-in template packs shipped alongside the package (templates/<lang>/)
+TEMPLATES_ROOT = Path(__file__).parent.parent.parent / "templates"
+
 
 class TemplateEngine:
     """Handles template loading and rendering."""
 
-    def __init__(self, templates_dir: Path):
+    def __init__(
+        self,
+        templates_dir: Path,
+        auto_reload: bool = True,
+        use_compiled: bool = True,
+        fingerprint: Optional[str] = None,
+        render_cache=None,
+    ):
         self.templates_dir = templates_dir
+        self.auto_reload = auto_reload
+        self.use_compiled = use_compiled
+        self.fingerprint = fingerprint
+        self.render_cache = render_cache
         self._env = None
+        self._catalog = None
+        self._compiled: Optional[tuple[Optional[Path], set[str]]] = None
+        self._lock = threading.RLock()
+        self._loaded: set[str] = set()
+        self.hits = 0
+        self.misses = 0
 
     @property
     def env(self):
         """Get Jinja2 environment (lazy loaded)."""
         if self._env is None:
-            try:
-                from jinja2 import Environment, FileSystemLoader
-                import datetime
+            with self._lock:
+                if self._env is None:
+                    self._env = self._create_env()
+        return self._env
 
-                self._env = Environment(
-                    loader=FileSystemLoader(str(self.templates_dir))
-                )
-                # Add 'now' function to the environment
-                self._env.globals["now"] = datetime.datetime.now
-            except ImportError:
-                raise ImportError(
-                    "Jinja2 is required for template rendering. "
-                    "Install with: pip install jinja2"
+    def _create_env(self):
+        """Build the Jinja2 environment for this template directory."""
+        try:
+            from jinja2 import ChoiceLoader, Environment, FileSystemLoader
+            from .bytecode import get_bytecode_cache
+            import datetime
+
+            loader = FileSystemLoader(str(self.templates_dir))
+            compiled_dir, compiled_names = self._compiled_pack()
+            if compiled_names:
+                from .compiled import create_compiled_loader
+
+                # Precompiled modules first; anything else renders from source
+                loader = ChoiceLoader(
+                    [create_compiled_loader(compiled_dir, compiled_names), loader]
                 )
-        return self._env
+            env = Environment(
+                loader=loader,
+                auto_reload=self.auto_reload,
+                bytecode_cache=get_bytecode_cache(),
+            )
+            # Add 'now' function to the environment
+            env.globals["now"] = datetime.datetime.now
+            return env
+        except ImportError:
+            raise ImportError(
+                "Jinja2 is required for template rendering. "
+                "Install with: pip install jinja2"
+            )
+
+    def _compiled_pack(self) -> tuple[Optional[Path], set[str]]:
+        """Locate the verified precompiled pack for a built-in template dir."""
+        if self._compiled is None:
+            compiled_dir, names = None, set()
+            if self.use_compiled:
+                from .compiled import compiled_dir_for, usable_templates
+
+                compiled_dir = compiled_dir_for(self.templates_dir, TEMPLATES_ROOT)
+                if compiled_dir is not None:
+                    names = usable_templates(compiled_dir, self.templates_dir)
+            self._compiled = (compiled_dir, names)
+        return self._compiled
+
+    def get_template(self, template_name: str):
+        """Load a compiled template, recording cache hits and misses."""
+        template = self.env.get_template(template_name)
+        self.record_lookup(template_name)
+        return template
+
+    def record_lookup(self, template_name: str) -> None:
+        """Count a template request (also used for render-cache hits)."""
+        with self._lock:
+            if template_name in self._loaded:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._loaded.add(template_name)
 
     def render(self, template_name: str, context: dict[str, Any]) -> str:
         """Render template with context."""
-        template = self.env.get_template(template_name)
+        if self.render_cache is not None:
+            return self.render_cache.render(self, template_name, context)
+        template = self.get_template(template_name)
         return template.render(context)
 
+    def render_key(self, template_name: str) -> tuple[str, Optional[list[str]]]:
+        """Return the content identity and referenced variables of a template.
+
+        Variables are None when the template includes other templates (or
+        has no catalog entry), meaning the whole context matters.
+        """
+        info = self.catalog.get(template_name)
+        if info is None or not info.sha1:
+            # Precompiled-only templates are fixed for a given release
+            from ..constants import VERSION
+
+            return f"compiled:{VERSION}:{template_name}", None
+        if info.references:
+            return f"{self.fingerprint}:{info.sha1}", None
+        return info.sha1, info.variables
+
+    def render_to(
+        self,
+        target,
+        template_name: str,
+        context: dict[str, Any],
+        skip_unchanged: bool = False,
+    ):
+        """Stream a rendered template into a path or an open file object.
+
+        Paths are written atomically (temp file + rename); with
+        skip_unchanged, one already holding the output is left alone.
+        Returns a WriteResult with the byte count and SHA-256 of the
+        output. Small cacheable templates go through the render cache;
+        large ones, and those the cache could not keep, are streamed.
+        """
+        from ..utils.files import write_chunks
+
+        cache = self.render_cache
+        if cache is not None and not cache.bypasses(self, template_name):
+            chunks = [self.render(template_name, context)]
+        else:
+            chunks = self.get_template(template_name).generate(context)
+        return write_chunks(target, chunks, skip_unchanged=skip_unchanged)
+
+    def preload(self) -> int:
+        """Compile every template in the directory. Returns the count."""
+        names = self.list_templates()
+        for name in names:
+            self.get_template(name)
+        return len(names)
+
+    def stats(self) -> dict[str, int]:
+        """Return compiled-template hit/miss counters."""
+        with self._lock:
+            return {
+                "templates": len(self._loaded),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    @property
+    def catalog(self):
+        """Get the template catalog for this pack (lazy loaded)."""
+        if self._catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    from .catalog import TemplateCatalog
+
+                    if self.templates_dir.is_dir():
+                        self._catalog = TemplateCatalog.load(
+                            self.templates_dir, self.fingerprint, env=self.env
+                        )
+                    else:
+                        self._catalog = TemplateCatalog.from_names(
+                            self._compiled_pack()[1], self.templates_dir.name
+                        )
+        return self._catalog
+
     def template_exists(self, template_name: str) -> bool:
         """Check if template exists."""
-        return (self.templates_dir / template_name).exists()
+        if template_name in self.catalog:
+            return True
+        return template_name in self._compiled_pack()[1]
 
     def list_templates(self) -> list[str]:
         """List all available templates."""
-        if not self.templates_dir.exists():
-            return []
-        return [
-            p.name
-            for p in self.templates_dir.iterdir()
-            if p.is_file() and not p.name.startswith(".")
-        ]
+        names = self.catalog.names()
+        extra = self._compiled_pack()[1].difference(names)
+        return names + sorted(extra)
+
+
+def template_pack_exists(templates_dir: Path) -> bool:
+    """Check whether a template pack is available from source or precompiled."""
+    if templates_dir.exists():
+        return True
+    from .compiled import compiled_dir_for
+
+    return compiled_dir_for(templates_dir, TEMPLATES_ROOT) is not None
+
+
+def template_pack_fingerprint(templates_dir: Path) -> str:
+    """Fingerprint a template directory from file names, sizes and mtimes."""
+    return _fingerprint_pack(templates_dir)[0]
+
+
+def _fingerprint_pack(templates_dir: Path) -> tuple[str, tuple[tuple[str, int], ...]]:
+    """The pack fingerprint, and the mtime of every directory walked."""
+    digest = hashlib.sha1()
+    walked = []
+    for root, dirs, files in os.walk(templates_dir):
+        walked.append((root, _mtime_ns(root)))
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            rel = os.path.relpath(path, templates_dir)
+            digest.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest(), tuple(walked)
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+class TemplateEnginePool:
+    """Thread-safe, process-wide pool of template engines.
+
+    Engines are keyed by resolved template directory and template-pack
+    fingerprint, so every command and worker thread shares one compiled
+    template cache per pack. Editing a pack changes its fingerprint and
+    transparently replaces the pooled engine.
+
+    Fingerprints are computed once and reused while the pack's directory
+    mtimes are unchanged, which catches added, removed and renamed
+    templates. In-place edits only show after ``refresh()``, which the
+    daemon calls before every request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: dict[tuple[str, str], TemplateEngine] = {}
+        # templates_dir -> (resolved dir, fingerprint, walked directories)
+        self._fingerprints: dict[str, tuple[str, str, tuple]] = {}
+
+    def _identify(self, templates_dir: Path) -> tuple[str, str]:
+        """(resolved dir, fingerprint) of a pack, from cache when still valid."""
+        with self._lock:
+            cached = self._fingerprints.get(str(templates_dir))
+        if cached is not None:
+            resolved, fingerprint, walked = cached
+            if all(_mtime_ns(d) == mtime for d, mtime in walked):
+                return resolved, fingerprint
+        resolved = str(templates_dir.resolve())
+        fingerprint, walked = _fingerprint_pack(templates_dir)
+        with self._lock:
+            self._fingerprints[str(templates_dir)] = (resolved, fingerprint, walked)
+        return resolved, fingerprint
+
+    def refresh(self) -> None:
+        """Re-fingerprint every pack on its next use."""
+        with self._lock:
+            self._fingerprints.clear()
+
+    def get(self, templates_dir: Path) -> TemplateEngine:
+        """Return the shared engine for a template directory."""
+        templates_dir = Path(templates_dir)
+        resolved, fingerprint = self._identify(templates_dir)
+        key = (resolved, fingerprint)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                for stale in [k for k in self._engines if k[0] == resolved]:
+                    del self._engines[stale]
+                # The fingerprint already tracks changes, so skip Jinja's
+                # per-lookup uptodate checks
+                from .render_cache import get_render_cache
+
+                engine = TemplateEngine(
+                    templates_dir,
+                    auto_reload=False,
+                    fingerprint=fingerprint,
+                    render_cache=get_render_cache(),
+                )
+                self._engines[key] = engine
+            return engine
+
+    def stats(self) -> dict[str, int]:
+        """Aggregate hit/miss statistics across pooled engines."""
+        with self._lock:
+            engines = list(self._engines.values())
+        totals = {"engines": len(engines), "templates": 0, "hits": 0, "misses": 0}
+        for engine in engines:
+            for key, value in engine.stats().items():
+                totals[key] += value
+        return totals
+
+    def clear(self) -> None:
+        """Drop all pooled engines."""
+        with self._lock:
+            self._engines.clear()
+            self._fingerprints.clear()
+
+
+# Global instance
+_pool: Optional[TemplateEnginePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_engine_pool() -> TemplateEnginePool:
+    """Get the process-wide template engine pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TemplateEnginePool()
+    return _pool
+
+
+def get_engine(templates_dir: Path) -> TemplateEngine:
+    """Get the shared TemplateEngine for a template directory."""
+    return get_engine_pool().get(templates_dir)
 
 
 def build_template_context(
@@ -0,0 +1,225 @@
+"""Watch a project's sources for `restack-gen dev`.
+
+On Linux, inotify (through ctypes, so there is nothing to install)
+reports changes as they happen; elsewhere, or when inotify is
+unavailable or ``RESTACK_GEN_POLL`` is set, the tree is re-stat()ed a
+few times a second. Both report changed ``.py`` and ``.ts`` files as
+absolute paths. ``collect`` groups a burst of changes (an editor's
+save, a ``git checkout``, a batch ``generate``) into one.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+POLL_ENV = "RESTACK_GEN_POLL"
+WATCH_SUFFIXES = (".py", ".ts")
+# Never watched: caches, dependencies, VCS metadata, build output
+_SKIP_DIRS = {
+    "__pycache__",
+    "node_modules",
+    ".git",
+    ".venv",
+    "venv",
+    ".restack",
+    "dist",
+    "build",
+}
+# Reported when changes were lost (inotify queue overflow): assume anything
+OVERFLOW = "*"
+
+
+def _watched(name: str) -> bool:
+    return name.endswith(WATCH_SUFFIXES) and not name.startswith(".")
+
+
+class PollingWatcher:
+    """Detect changes by comparing (mtime, size) snapshots."""
+
+    kind = "polling"
+
+    def __init__(self, root: Path, recursive: list[Path], interval: float = 0.25):
+        self.root = Path(root)
+        self.recursive = [Path(p) for p in recursive]
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        state: dict[str, tuple[int, int]] = {}
+        pending = [(str(self.root), False), *((str(p), True) for p in self.recursive)]
+        while pending:
+            directory, recurse = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recurse and entry.name not in _SKIP_DIRS:
+                            pending.append((entry.path, True))
+                    elif _watched(entry.name):
+                        st = entry.stat()
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+        return state
+
+    def poll(self, timeout: float) -> set[str]:
+        """Changed files, waiting up to timeout seconds for the first."""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {
+                path
+                for path in state.keys() | self._state.keys()
+                if state.get(path) != self._state.get(path)
+            }
+            self._state = state
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify: one watch per directory, added as directories appear."""
+
+    kind = "inotify"
+    _EVENT = struct.Struct("iIII")
+    # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _MASK = 0x08 | 0x40 | 0x80 | 0x100 | 0x200
+    _IN_Q_OVERFLOW = 0x4000
+    _IN_IGNORED = 0x8000
+    _IN_ISDIR = 0x40000000
+    _IN_NONBLOCK_CLOEXEC = 0x800 | 0x80000
+
+    def __init__(self, root: Path, recursive: list[Path]):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._ctypes = ctypes
+        self.fd = libc.inotify_init1(self._IN_NONBLOCK_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, tuple[str, bool]] = {}
+        try:
+            self._watch(str(root), recurse=False)
+            for path in recursive:
+                self._watch(str(path), recurse=True)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, directory: str, recurse: bool) -> None:
+        wd = self._add(self.fd, os.fsencode(directory), self._MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            if not os.path.isdir(directory):
+                return  # Gone already, or never there
+            raise OSError(errno, f"cannot watch {directory}: {os.strerror(errno)}")
+        self._dirs[wd] = (directory, recurse)
+        if recurse:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                return
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name not in _SKIP_DIRS:
+                    self._watch(entry.path, recurse=True)
+
+    def poll(self, timeout: float) -> set[str]:
+        """Changed files, waiting up to timeout seconds for the first."""
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return set()
+        changed: set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + self._EVENT.size <= len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & self._IN_Q_OVERFLOW:
+                    changed.add(OVERFLOW)
+                    continue
+                if mask & self._IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory, recurse = self._dirs.get(wd, (None, False))
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self._IN_ISDIR:
+                    # A new (or moved-in) directory: watch it, and report
+                    # files written into it before the watch existed
+                    if recurse and mask & (0x80 | 0x100) and name not in _SKIP_DIRS:
+                        try:
+                            self._watch(path, recurse=True)
+                        except OSError:
+                            changed.add(OVERFLOW)
+                        for sub, _, files in os.walk(path):
+                            changed.update(
+                                os.path.join(sub, f) for f in files if _watched(f)
+                            )
+                elif _watched(name):
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(root: Path, recursive: list[Path], poll: bool = False):
+    """An inotify watcher where possible, else a polling one."""
+    if not poll and not os.environ.get(POLL_ENV):
+        try:
+            return InotifyWatcher(root, recursive)
+        except (OSError, AttributeError):
+            pass  # Not Linux, no libc inotify, or out of watches
+    return PollingWatcher(root, recursive)
+
+
+def collect(
+    watcher, timeout: float, debounce: float = 0.15, limit: float = 2.0
+) -> tuple[set[str], Optional[float]]:
+    """Wait up to timeout for a change, then gather the rest of its burst.
+
+    Returns the changed files and the monotonic time the first change
+    was seen. The burst ends after debounce seconds without changes, or
+    limit seconds after it began, whichever comes first.
+    """
+    changed = watcher.poll(timeout)
+    if not changed:
+        return set(), None
+    first = time.monotonic()
+    while True:
+        remaining = first + limit - time.monotonic()
+        if remaining <= 0:
+            break
+        more = watcher.poll(min(debounce, remaining))
+        if not more:
+            break
+        changed |= more
+    return changed, first
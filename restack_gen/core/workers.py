@@ -0,0 +1,190 @@
+"""Worker pools for creating many projects at once.
+
+Rendering is pure Python and holds the GIL, so a thread pool stops
+scaling at roughly one core. The process executor runs projects in
+separate interpreters instead; each worker is started once, pre-warmed
+with compiled template engines, and then reused for many projects.
+
+Workers never print. Everything a project writes to stdout is captured
+and returned in its ``ProjectResult``, and the creator prints results
+from the main thread as they arrive. The number of projects in flight
+is tuned at runtime by ``AdaptiveLimit`` unless ``--jobs`` fixes it.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+from ..utils.console import Color, capture_output, print_error
+
+if TYPE_CHECKING:
+    from ..constants import Config
+    from .golden import GoldenProjectCache
+
+EXECUTORS = ("thread", "process")
+
+
+@dataclass
+class ProjectResult:
+    """Outcome of creating one project, sent back to the main thread."""
+
+    name: str
+    exit_code: int
+    seconds: float = 0.0
+    output: str = ""
+
+
+def default_jobs(executor: str) -> int:
+    """Upper bound on workers when --jobs is not given."""
+    cpus = os.cpu_count() or 1
+    if executor == "process":
+        return cpus
+    return min(32, cpus + 4)
+
+
+def warm_engines(config: Config) -> int:
+    """Compile the template pack a batch will use; returns templates loaded."""
+    from ..constants import Language
+    from .templates import TEMPLATES_ROOT, get_engine, template_pack_exists
+
+    lang = config.lang or Language.PYTHON
+    templates_dir = TEMPLATES_ROOT / lang.value
+    if not template_pack_exists(templates_dir):
+        return 0
+    try:
+        return get_engine(templates_dir).preload()
+    except ImportError:
+        return 0  # No Jinja2; commands fall back to minimal output
+
+
+def create_project(
+    config: Config, name: str, golden_cache: Optional[GoldenProjectCache] = None
+) -> ProjectResult:
+    """Run ``new`` for one project, capturing its output."""
+    from ..commands.new import NewCommand
+
+    start = time.perf_counter()
+    buffer = io.StringIO()
+    with capture_output(buffer):
+        try:
+            cmd = NewCommand(config)
+            # Batches share a golden project for name-independent files
+            cmd.golden_cache = golden_cache
+            exit_code = cmd.execute([name])
+        except Exception as e:
+            print_error(f"Exception while creating {name}: {e}")
+            if config.verbose:
+                traceback.print_exc(file=sys.stdout)
+            exit_code = 1
+    return ProjectResult(
+        name, exit_code, time.perf_counter() - start, buffer.getvalue()
+    )
+
+
+# State of a process worker, set once by _init_process_worker
+_worker_config: Optional[Config] = None
+_worker_golden: Optional[GoldenProjectCache] = None
+
+
+def _init_process_worker(config: Config, colors: bool, share_golden: bool) -> None:
+    """Pre-warm a process worker before it receives any project."""
+    global _worker_config, _worker_golden
+    if not colors:
+        Color.disable()
+    _worker_config = config
+    warm_engines(config)
+    if share_golden:
+        from multiprocessing.util import Finalize
+
+        from .golden import GoldenProjectCache
+
+        _worker_golden = GoldenProjectCache(Path(config.cwd or Path.cwd()))
+        # Runs when the pool shuts the worker down
+        Finalize(None, _worker_golden.close, exitpriority=10)
+
+
+def _create_in_process_worker(name: str) -> ProjectResult:
+    return create_project(_worker_config, name, _worker_golden)
+
+
+def create_executor(
+    executor: str, max_workers: int, config: Config, share_golden: bool
+) -> tuple[Executor, Optional[Callable[[str], ProjectResult]]]:
+    """Create a pool for a batch.
+
+    For processes, also returns the function to submit for each project
+    name; thread pools call back into the creator instead (None).
+    """
+    if executor == "process":
+        # Spawn rather than fork: the progress bar runs a thread, and
+        # forking a multi-threaded process can deadlock the child
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+            initargs=(config, bool(Color.RESET), share_golden),
+        )
+        return pool, _create_in_process_worker
+    if executor != "thread":
+        raise ValueError(f"Unknown executor: {executor}")
+    warm_engines(config)
+    return ThreadPoolExecutor(max_workers=max_workers), None
+
+
+class AdaptiveLimit:
+    """Number of projects to keep in flight, tuned by measured latency.
+
+    With ``limit`` projects in flight and a mean latency of ``t`` seconds,
+    throughput is about ``limit / t``. After each window of ``limit``
+    completions the limit moves one step in its current direction while
+    throughput improves, turns around when it drops, and holds while it
+    is flat (more workers only added contention).
+    """
+
+    def __init__(
+        self, maximum: int, initial: Optional[int] = None, adaptive: bool = True
+    ):
+        self.maximum = max(1, maximum)
+        if initial is None:
+            initial = self.maximum if not adaptive else os.cpu_count() or 1
+        self.limit = max(1, min(self.maximum, initial))
+        self.adaptive = adaptive
+        self._direction = 1
+        self._throughput: Optional[float] = None
+        self._window: list[float] = []
+        self.completed = 0
+        self.total_seconds = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_seconds / self.completed if self.completed else 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one completed project's latency."""
+        self.completed += 1
+        self.total_seconds += seconds
+        if not self.adaptive:
+            return
+        self._window.append(max(seconds, 1e-6))
+        if len(self._window) < self.limit:
+            return
+        throughput = self.limit * len(self._window) / sum(self._window)
+        self._window.clear()
+        previous = self._throughput
+        self._throughput = throughput
+        if previous is not None:
+            if throughput < previous * 0.95:
+                self._direction = -self._direction
+            elif throughput <= previous * 1.05:
+                return
+        step = max(1, self.limit // 4)
+        self.limit = max(1, min(self.maximum, self.limit + self._direction * step))
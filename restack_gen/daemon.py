@@ -0,0 +1,362 @@
+"""Warm background daemon for restack-gen.
+
+``restack-gen serve`` keeps an interpreter alive with the command modules,
+Jinja2 and any process-wide caches already loaded, and executes CLI
+invocations sent to it over a Unix domain socket. The ``__main__``
+dispatcher forwards eligible invocations to a running daemon and falls
+back to in-process execution whenever no daemon is reachable.
+
+The protocol is one JSON object per line in each direction::
+
+    -> {"op": "run", "argv": [...], "cwd": "/path", "tty": false, "version": "...",
+        "env": {"RESTACK_GEN_...": "..."}}
+    <- {"exit_code": 0, "stdout": "...", "stderr": "..."}
+
+Requests are handled one at a time because commands print to the
+process-wide stdout and resolve paths relative to the working directory.
+The daemon has no stdin: a command that would prompt fails instead, and
+the client runs commands that may prompt in-process when it has a
+terminal and neither ``--yes`` nor ``--force`` is given. Most
+``RESTACK_GEN_*`` settings are read once per process, so a client whose
+settings differ from the daemon's runs in-process too.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from .constants import VERSION
+from .core.project import ROOT_ENV
+
+SOCKET_ENV = "RESTACK_GEN_DAEMON_SOCKET"
+DISABLE_ENV = "RESTACK_GEN_NO_DAEMON"
+CONNECT_TIMEOUT = 0.5
+
+# Commands that are safe to run inside the daemon: they neither stream
+# subprocess output nor need an interactive terminal.
+FORWARDABLE_COMMANDS = {
+    "new",
+    "g",
+    "generate",
+    "routes",
+    "list-templates",
+    "ls-templates",
+    "version",
+}
+
+# Commands that may ask for confirmation (e.g. before overwriting a file)
+PROMPTING_COMMANDS = {"g", "generate"}
+_ANSWER_OPTIONS = {"-y", "--yes", "--force"}
+# Client-side settings that must not make a request fall back
+_CLIENT_ENV = {SOCKET_ENV, DISABLE_ENV}
+ENV_PREFIX = "RESTACK_GEN_"
+
+# Global options that consume the following argument
+_VALUE_OPTIONS = {
+    "--lang",
+    "--pm",
+    "--cwd",
+    "--jobs",
+    "--executor",
+    "--from-manifest",
+    "--workspace",
+    "--from-file",
+}
+
+
+def socket_path() -> Path:
+    """Return the daemon socket path."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override)
+    from .utils.paths import user_cache_dir
+
+    return user_cache_dir() / "daemon.sock"
+
+
+def command_from_argv(argv: Sequence[str]) -> Optional[str]:
+    """Return the command name in argv, skipping global options."""
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in _VALUE_OPTIONS:
+            skip_next = True
+            continue
+        if arg.startswith("-"):
+            if arg == "--concurrent-new":
+                return None
+            continue
+        return arg
+    return None
+
+
+def should_forward(argv: Sequence[str]) -> bool:
+    """Decide whether an invocation may be forwarded to a daemon."""
+    if os.environ.get(DISABLE_ENV) or not hasattr(socket, "AF_UNIX"):
+        return False
+    if any(arg in ("-h", "--help", "-i", "--interactive") for arg in argv):
+        return False
+    command = command_from_argv(argv)
+    if command not in FORWARDABLE_COMMANDS:
+        return False
+    if command in PROMPTING_COMMANDS and not _ANSWER_OPTIONS.intersection(argv):
+        # The user could answer a prompt here, but not inside the daemon
+        try:
+            return not sys.stdin.isatty()
+        except (AttributeError, ValueError):
+            return True
+    return True
+
+
+def settings_env() -> dict[str, str]:
+    """The RESTACK_GEN_* settings that affect how commands run."""
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key.startswith(ENV_PREFIX) and key not in _CLIENT_ENV
+    }
+
+
+def _send(path: Path, payload: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Send one request to the daemon. Returns None if it is unreachable."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+        sock.settimeout(None)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def try_forward(argv: Sequence[str]) -> Optional[int]:
+    """Run argv in a warm daemon if one is running.
+
+    Returns the exit code, or None when the caller should execute the
+    command in-process instead.
+    """
+    if not should_forward(argv):
+        return None
+    path = socket_path()
+    if not path.exists():
+        return None
+    response = _send(
+        path,
+        {
+            "op": "run",
+            "argv": list(argv),
+            "cwd": os.getcwd(),
+            "tty": sys.stdout.isatty(),
+            "version": VERSION,
+            # The daemon's environment is its own; carry the root override
+            "project_root": os.environ.get(ROOT_ENV),
+            "env": settings_env(),
+        },
+    )
+    if not response or "exit_code" not in response:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stderr.flush()
+    return int(response["exit_code"])
+
+
+def ping(path: Optional[Path] = None) -> Optional[dict[str, Any]]:
+    """Return daemon status, or None if no daemon answers."""
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    return _send(path, {"op": "ping"})
+
+
+def request_shutdown(path: Optional[Path] = None) -> bool:
+    """Ask a running daemon to exit. Returns True if it acknowledged."""
+    path = path or socket_path()
+    if not path.exists():
+        return False
+    return _send(path, {"op": "shutdown"}) is not None
+
+
+class _CapturedStream(io.StringIO):
+    """StringIO that reports the client's terminal state from isatty()."""
+
+    def __init__(self, tty: bool):
+        super().__init__()
+        self._tty = tty
+
+    def isatty(self) -> bool:
+        return self._tty
+
+
+class _NoInput(io.StringIO):
+    """stdin of a forwarded command: prompting fails instead of guessing."""
+
+    def _refuse(self, *args):
+        raise RuntimeError(
+            "cannot prompt inside the restack-gen daemon; pass --yes or "
+            f"--force, or set {DISABLE_ENV}=1"
+        )
+
+    read = readline = readlines = _refuse
+
+
+class DaemonServer:
+    """Unix socket server executing CLI invocations in a warm interpreter."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or socket_path()
+        self.requests_served = 0
+        self._server = None
+        self._colors: dict[str, str] = {}
+
+    def warm(self) -> None:
+        """Import the modules and build the caches every request needs."""
+        from . import cli  # noqa: F401
+        from .commands import BUILTIN_COMMANDS, load_command_class
+        from .core.templates import TEMPLATES_ROOT, get_engine
+        from .utils.console import Color
+
+        for spec in set(BUILTIN_COMMANDS.values()):
+            load_command_class(spec)
+        # Compile the built-in packs once so requests start with warm engines
+        for lang_dir in sorted(TEMPLATES_ROOT.glob("*")):
+            if lang_dir.is_dir():
+                try:
+                    get_engine(lang_dir).preload()
+                except ImportError:
+                    break
+        self._colors = {
+            attr: getattr(Color, attr) for attr in dir(Color) if attr.isupper()
+        }
+
+    def serve_forever(self) -> None:
+        """Bind the socket and handle requests until shut down."""
+        import socketserver
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    return
+                response = daemon.handle_request(request)
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+        self.warm()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if ping(self.path) is not None:
+                raise RuntimeError(f"A daemon is already running at {self.path}")
+            self.path.unlink()
+        old_umask = os.umask(0o077)
+        try:
+            self._server = socketserver.UnixStreamServer(str(self.path), Handler)
+        finally:
+            os.umask(old_umask)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def shutdown(self) -> None:
+        """Stop serve_forever from another thread."""
+        if self._server is not None:
+            import threading
+
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Dispatch a single decoded request."""
+        op = request.get("op")
+        if op == "ping":
+            from .core.templates import get_engine_pool
+
+            return {
+                "pid": os.getpid(),
+                "version": VERSION,
+                "requests_served": self.requests_served,
+                "templates": get_engine_pool().stats(),
+            }
+        if op == "shutdown":
+            self.shutdown()
+            return {"ok": True}
+        if op == "run":
+            if request.get("version") != VERSION:
+                # Client and daemon disagree; let the client run in-process
+                return {"error": "version mismatch"}
+            if "env" in request and request["env"] != settings_env():
+                return {"error": "environment mismatch"}
+            return self._run(
+                list(request.get("argv", [])),
+                request.get("cwd") or os.getcwd(),
+                bool(request.get("tty")),
+                request.get("project_root"),
+            )
+        return {"error": f"unknown op: {op}"}
+
+    def _run(
+        self, argv: list[str], cwd: str, tty: bool, project_root: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Execute argv through the standard CLI, capturing its output."""
+        from .cli import main as cli_main
+        from .core.templates import get_engine_pool
+        from .utils.console import Color
+
+        # Pick up template edits made since the previous request
+        get_engine_pool().refresh()
+
+        # Color.disable() is sticky; restore the palette for every request
+        for attr, value in self._colors.items():
+            setattr(Color, attr, value)
+        out, err = _CapturedStream(tty), _CapturedStream(tty)
+        previous_cwd = os.getcwd()
+        previous_stdin = sys.stdin
+        previous_root = os.environ.pop(ROOT_ENV, None)
+        try:
+            if project_root:
+                os.environ[ROOT_ENV] = project_root
+            os.chdir(cwd)
+            sys.stdin = _NoInput()
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    exit_code = cli_main(argv)
+                except SystemExit as e:
+                    exit_code = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(f"Fatal error: {e}", file=sys.stderr)
+                    exit_code = 1
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+            os.environ.pop(ROOT_ENV, None)
+            if previous_root is not None:
+                os.environ[ROOT_ENV] = previous_root
+        self.requests_served += 1
+        return {
+            "exit_code": int(exit_code or 0),
+            "stdout": out.getvalue(),
+            "stderr": err.getvalue(),
+        }
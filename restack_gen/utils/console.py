@@ -3,12 +3,29 @@
 # Timestamp: 2025-11-10T10:38:06.925606
 import sys
 import locale
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from typing import Optional, TextIO
 
+# The shared rich Console is created on first access (see __getattr__) so
+# that plain commands do not pay for importing rich.
+_console = None
 
-from rich.console import Console
 
-console = Console()
+def get_console():
+    """Return the shared rich Console instance."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def __getattr__(name: str):
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Color:
@@ -79,5 +96,65 @@ def print_info(message: str):
 def confirm(message: str, default: bool = False) -> bool:
     """Prompt user for confirmation."""
     suffix = " [Y/n]: " if default else " [y/N]: "
-    response = input(message + suffix).strip().lower()
+    try:
+        response = input(message + suffix).strip().lower()
+    except EOFError:
+        return default
     return response in ("y", "yes") if response else default
+
+
+class _ThreadRoutedStream:
+    """stdout proxy that sends writes from capturing threads to their buffer."""
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self) -> TextIO:
+        buffer = getattr(self._local, "buffer", None)
+        return self._stream if buffer is None else buffer
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target() is self._stream and self._stream.isatty()
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+
+_capture_lock = threading.Lock()
+_capture_proxy: Optional[_ThreadRoutedStream] = None
+_capture_users = 0
+
+
+@contextmanager
+def capture_output(buffer: TextIO):
+    """Collect everything the current thread prints into buffer.
+
+    Other threads keep writing to the real stdout, so worker threads can
+    capture their output and hand it back to the main thread to print.
+    """
+    global _capture_proxy, _capture_users
+    with _capture_lock:
+        if _capture_users == 0:
+            _capture_proxy = _ThreadRoutedStream(sys.stdout)
+            sys.stdout = _capture_proxy
+        _capture_users += 1
+        proxy = _capture_proxy
+    previous = getattr(proxy._local, "buffer", None)
+    proxy._local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        proxy._local.buffer = previous
+        with _capture_lock:
+            _capture_users -= 1
+            if _capture_users == 0:
+                if sys.stdout is proxy:
+                    sys.stdout = proxy._stream
+                _capture_proxy = None
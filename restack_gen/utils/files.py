@@ -0,0 +1,214 @@
+"""File writing helpers shared by the generators."""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import os
+import shutil
+import stat
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+WRITE_BUFFER_SIZE = 64 * 1024
+# ioctl request for FICLONE (linux/fs.h)
+_FICLONE = 0x40049409
+_temp_counter = itertools.count()
+
+
+@dataclass
+class WriteResult:
+    """Outcome of writing a generated file."""
+
+    path: Optional[Path]
+    bytes_written: int
+    sha256: str
+    # True when the file already had this content and was left untouched
+    skipped: bool = False
+
+
+def _temp_path(path: Path) -> Path:
+    """Unique sibling temp path, safe across threads and processes."""
+    suffix = f"{os.getpid()}.{threading.get_ident()}.{next(_temp_counter)}"
+    return path.with_name(f".{path.name}.{suffix}.tmp")
+
+
+class _Unchanged(Exception):
+    """Raised inside atomic_writer to drop a write that changes nothing."""
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """Open a buffered binary writer that replaces ``path`` atomically.
+
+    Data goes to a temp file in the same directory, which is renamed over
+    ``path`` only if the block completes; on error the temp file is
+    removed and ``path`` is left untouched. An existing file keeps its
+    permission bits, and a symlink is written through to its target.
+    """
+    path = Path(path)
+    if os.path.islink(path):
+        path = Path(os.path.realpath(path))
+    try:
+        mode: Optional[int] = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = None  # New file: 0o666 less the umask
+    tmp_path = _temp_path(path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            if mode is not None:
+                if hasattr(os, "fchmod"):
+                    os.fchmod(fd, mode)
+                else:
+                    os.chmod(tmp_path, mode)
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_chunks(
+    target,
+    chunks: Iterable[str],
+    encoding: str = "utf-8",
+    skip_unchanged: bool = False,
+) -> WriteResult:
+    """Stream text chunks to a path (atomically) or an open file object.
+
+    Returns the number of bytes written and their SHA-256 digest. With
+    skip_unchanged, a path that already holds exactly the streamed
+    content is left untouched, as with ``write_if_changed``.
+    """
+    digest = hashlib.sha256()
+    total = 0
+    if isinstance(target, (str, os.PathLike)):
+        path = Path(target)
+        try:
+            with atomic_writer(path) as f:
+                for chunk in chunks:
+                    data = chunk.encode(encoding)
+                    f.write(data)
+                    digest.update(data)
+                    total += len(data)
+                if skip_unchanged and _holds(path, total, digest.hexdigest()):
+                    raise _Unchanged()  # Discards the temp file
+        except _Unchanged:
+            return WriteResult(path, 0, digest.hexdigest(), skipped=True)
+        return WriteResult(path, total, digest.hexdigest())
+    # File object: text streams get str, binary streams get bytes
+    text_mode = hasattr(target, "encoding")
+    for chunk in chunks:
+        data = chunk.encode(encoding)
+        target.write(chunk if text_mode else data)
+        digest.update(data)
+        total += len(data)
+    return WriteResult(None, total, digest.hexdigest())
+
+
+def write_text(path: Path, content: str, encoding: str = "utf-8") -> WriteResult:
+    """Write a complete string to ``path`` atomically."""
+    return write_chunks(path, [content], encoding=encoding)
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """SHA-256 of a file's content, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(WRITE_BUFFER_SIZE), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _holds(path: Path, size: int, sha256: str) -> bool:
+    """Whether path is a regular file of this size and SHA-256."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISREG(st.st_mode) and st.st_size == size and file_sha256(path) == sha256
+    )
+
+
+def write_if_changed(path: Path, content: str, encoding: str = "utf-8") -> WriteResult:
+    """Write ``path`` atomically unless it already holds exactly ``content``.
+
+    The size is compared first, so only same-sized files are read back
+    and hashed. Skipping keeps mtimes stable, so file watchers, test
+    runners and dev servers do not react to no-op regenerations.
+    """
+    path = Path(path)
+    data = content.encode(encoding)
+    sha256 = hashlib.sha256(data).hexdigest()
+    if _holds(path, len(data), sha256):
+        return WriteResult(path, 0, sha256, skipped=True)
+    with atomic_writer(path) as f:
+        f.write(data)
+    return WriteResult(path, len(data), sha256)
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    """Share src's blocks with dst (copy-on-write) where supported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy in the kernel with copy_file_range where available."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        if copied:
+            raise
+        return False
+    return copied == size
+
+
+def clone_file(src: Path, dst: Path, hardlink: bool = False) -> int:
+    """Clone src to dst as cheaply as the filesystem allows.
+
+    Tries a reflink (FICLONE), then ``os.copy_file_range``, then a plain
+    copy; the result is published atomically like any other write.
+    Hardlinks are only used when asked for, since they make later in-place
+    edits show up in every clone. Returns the number of bytes cloned.
+    """
+    src, dst = Path(src), Path(dst)
+    size = os.stat(src).st_size
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return size
+        except OSError:
+            pass  # Cross-device, unsupported or existing target: copy instead
+    with open(src, "rb") as fsrc, atomic_writer(dst) as fdst:
+        fdst.flush()
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if not (_reflink(src_fd, dst_fd) or _copy_range(src_fd, dst_fd, size)):
+            shutil.copyfileobj(fsrc, fdst, WRITE_BUFFER_SIZE)
+    return size
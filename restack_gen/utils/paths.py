@@ -0,0 +1,28 @@
+"""Well-known filesystem locations used by restack-gen.
+
+Keeps the cache/config directory conventions in one place so that the
+plugin manifest, template caches and other on-disk state agree on where
+they live.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+CACHE_DIR_ENV = "RESTACK_GEN_CACHE_DIR"
+
+
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory for restack-gen.
+
+    Honours ``RESTACK_GEN_CACHE_DIR`` first, then ``XDG_CACHE_HOME``, and
+    finally falls back to ``~/.cache/restack-gen``. The directory is not
+    created here; callers create it lazily when they first write to it.
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "restack-gen"
@@ -1,15 +1,9 @@
 # ui_components.py
 from functools import wraps
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    BarColumn,
-    TextColumn,
-    TimeRemainingColumn,
-)
 
-# Import the shared console instance
-from .console import console
+# rich is imported inside the wrappers so decorating a function at import
+# time stays cheap; the shared console comes from get_console().
+from .console import get_console
 
 
 def with_spinner(text: str):
@@ -23,7 +17,7 @@ def with_spinner(text: str):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with console.status(f"[bold green]{text}", spinner="dots"):
+            with get_console().status(f"[bold green]{text}", spinner="dots"):
                 result = func(*args, **kwargs)
             return result
 
@@ -46,13 +40,21 @@ def with_progress_bar(description: str):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            from rich.progress import (
+                Progress,
+                SpinnerColumn,
+                BarColumn,
+                TextColumn,
+                TimeRemainingColumn,
+            )
+
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 BarColumn(),
                 TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
                 TimeRemainingColumn(),
-                console=console,
+                console=get_console(),
                 transient=True,
             ) as progress:
                 kwargs["progress"] = progress
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep on-disk caches (plugins, bytecode) out of the real home directory."""
+    monkeypatch.setenv(
+        "RESTACK_GEN_CACHE_DIR", str(tmp_path_factory.mktemp("restack-gen-cache"))
+    )
+    # A developer's project root override would redirect every command
+    monkeypatch.delenv("RESTACK_PROJECT_ROOT", raising=False)
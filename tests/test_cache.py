@@ -0,0 +1,70 @@
+from restack_gen.commands.cache import CacheCommand
+from restack_gen.constants import Config
+from restack_gen.core.bytecode import TemplateBytecodeCache, get_bytecode_cache
+from restack_gen.core.templates import TemplateEngine
+
+
+def _make_templates(tmp_path, count=1):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    for i in range(count):
+        (templates_dir / f"t{i}.txt").write_text(f"{i}: {{{{ name }}}} " * 50)
+    return templates_dir
+
+
+def test_bytecode_cache_persists_across_engines(tmp_path):
+    templates_dir = _make_templates(tmp_path)
+    TemplateEngine(templates_dir).render("t0.txt", {"name": "a"})
+    cache = get_bytecode_cache()
+    assert cache.stats()["entries"] == 1
+    hits_before = cache.hits
+    # A fresh engine (as in a new process) loads the cached bytecode
+    assert "0: b" in TemplateEngine(templates_dir).render("t0.txt", {"name": "b"})
+    assert cache.hits == hits_before + 1
+
+
+def test_bytecode_cache_invalidated_by_template_change(tmp_path):
+    templates_dir = _make_templates(tmp_path)
+    TemplateEngine(templates_dir).render("t0.txt", {"name": "a"})
+    (templates_dir / "t0.txt").write_text("changed {{ name }}")
+    assert TemplateEngine(templates_dir).render("t0.txt", {"name": "a"}) == (
+        "changed a"
+    )
+    assert get_bytecode_cache().stats()["entries"] == 2
+
+
+def test_bytecode_cache_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESTACK_GEN_NO_BYTECODE_CACHE", "1")
+    assert get_bytecode_cache() is None
+    templates_dir = _make_templates(tmp_path)
+    assert TemplateEngine(templates_dir).env.bytecode_cache is None
+
+
+def test_bytecode_cache_prunes_oldest(tmp_path):
+    templates_dir = _make_templates(tmp_path, count=4)
+    cache = TemplateBytecodeCache(tmp_path / "bc", max_size=10**9)
+    engine = TemplateEngine(templates_dir)
+    engine.env.bytecode_cache = cache
+    for i in range(4):
+        engine.render(f"t{i}.txt", {"name": "x"})
+    stats = cache.stats()
+    assert stats["entries"] == 4
+    removed = cache.prune(max_size=stats["size"] // 2)
+    assert removed >= 2
+    assert cache.stats()["size"] <= stats["size"] // 2
+
+
+def test_cache_command_stats_and_clear(tmp_path, capsys):
+    templates_dir = _make_templates(tmp_path)
+    TemplateEngine(templates_dir).render("t0.txt", {"name": "a"})
+    cmd = CacheCommand(Config())
+    assert cmd.execute(["stats"]) == 0
+    assert "Entries:   1" in capsys.readouterr().out
+    assert cmd.execute(["clear"]) == 0
+    assert "Cleared 1" in capsys.readouterr().out
+    assert get_bytecode_cache().stats()["entries"] == 0
+
+
+def test_cache_command_unknown_subcommand(capsys):
+    assert CacheCommand(Config()).execute(["bogus"]) == 1
+    assert "Unknown cache subcommand" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+from restack_gen.commands.info import ListTemplatesCommand
+from restack_gen.constants import Config, Language
+from restack_gen.core.catalog import (
+    TemplateCatalog,
+    catalog_path,
+    infer_kind,
+    infer_language,
+)
+from restack_gen.core.templates import TemplateEngine, template_pack_fingerprint
+
+
+def _pack(tmp_path):
+    pack = tmp_path / "py"
+    pack.mkdir()
+    (pack / "agent_rag.py.j2").write_text("class {{ pascal_name }}: {{ now() }}")
+    (pack / "README.md.j2").write_text("# {{ project_name }}")
+    (pack / ".hidden.j2").write_text("")
+    return pack
+
+
+def test_infer_kind_and_language():
+    assert infer_kind("agent.py.j2") == "agent"
+    assert infer_kind("workflow_rag_search.py.j2") == "workflow"
+    assert infer_kind("function_stream.py.j2") == "function"
+    assert infer_kind("test_sample.ts.j2") == "test"
+    assert infer_kind("tsconfig.json.j2") == "config"
+    assert infer_language("agent.py.j2", "custom") == "py"
+    assert infer_language("README.md.j2", "ts") == "ts"
+    assert infer_language("README.md.j2", "custom") is None
+
+
+def test_catalog_build_records_metadata(tmp_path):
+    pack = _pack(tmp_path)
+    engine = TemplateEngine(pack)
+    catalog = engine.catalog
+    assert sorted(catalog.names()) == ["README.md.j2", "agent_rag.py.j2"]
+    info = catalog.get("agent_rag.py.j2")
+    assert info.kind == "agent"
+    assert info.language == "py"
+    # Environment globals such as now() are not required context
+    assert info.variables == ["pascal_name"]
+    assert len(info.sha1) == 40
+    assert [i.name for i in catalog.by_kind("config")] == ["README.md.j2"]
+
+
+def test_catalog_persisted_and_reused(tmp_path, monkeypatch):
+    pack = _pack(tmp_path)
+    fingerprint = template_pack_fingerprint(pack)
+    TemplateCatalog.load(pack, fingerprint)
+    assert catalog_path(pack).exists()
+
+    def fail_build(*args, **kwargs):
+        raise AssertionError("catalog should come from disk")
+
+    monkeypatch.setattr(TemplateCatalog, "build", classmethod(fail_build))
+    assert "README.md.j2" in TemplateCatalog.load(pack, fingerprint)
+
+
+def test_catalog_rebuilt_when_pack_changes(tmp_path):
+    pack = _pack(tmp_path)
+    TemplateCatalog.load(pack)
+    (pack / "function.py.j2").write_text("def {{ snake_name }}(): pass")
+    catalog = TemplateCatalog.load(pack)
+    assert catalog.get("function.py.j2").variables == ["snake_name"]
+
+
+def test_template_exists_uses_catalog(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    pack = _pack(tmp_path)
+    engine = TemplateEngine(pack)
+    engine.catalog
+    monkeypatch.setattr(
+        Path, "exists", lambda self: (_ for _ in ()).throw(AssertionError("stat"))
+    )
+    assert engine.template_exists("README.md.j2")
+    assert not engine.template_exists("missing.j2")
+
+
+def test_list_templates_verbose_shows_kind(tmp_path, capsys):
+    templates_root = tmp_path / "templates"
+    templates_root.mkdir()
+    _pack(templates_root)
+    config = Config(lang=Language.PYTHON, verbose=True)
+    assert ListTemplatesCommand(config, templates_root=templates_root).execute([]) == 0
+    out = capsys.readouterr().out
+    assert "agent_rag.py.j2 [agent] vars: pascal_name" in out
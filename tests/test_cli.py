@@ -1,5 +1,6 @@
 import sys
 from restack_gen import cli
+from restack_gen.core.workers import ProjectResult
 
 
 def test_create_parser_and_build_config():
@@ -226,7 +227,7 @@ def test_concurrent_project_creator_success(monkeypatch, capsys):
 
     # Mock successful project creation
     def mock_create_single(name):
-        return (name, 0)
+        return ProjectResult(name, 0)
 
     monkeypatch.setattr(creator, "_create_single_project", mock_create_single)
     result = creator.create_projects(["proj1", "proj2"])
@@ -242,7 +243,7 @@ def test_concurrent_project_creator_failure(monkeypatch, capsys):
 
     # Mock failed project creation
     def mock_create_single(name):
-        return (name, 1)
+        return ProjectResult(name, 1)
 
     monkeypatch.setattr(creator, "_create_single_project", mock_create_single)
     result = creator.create_projects(["proj1"])
@@ -258,9 +259,9 @@ def test_concurrent_project_creator_mixed_results(monkeypatch, capsys):
     # Mock mixed results
     def mock_create_single(name):
         if name == "proj1":
-            return (name, 0)
+            return ProjectResult(name, 0)
         else:
-            return (name, 1)
+            return ProjectResult(name, 1)
 
     monkeypatch.setattr(creator, "_create_single_project", mock_create_single)
     result = creator.create_projects(["proj1", "proj2"])
@@ -292,7 +293,7 @@ def test_concurrent_project_creator_quiet_mode(monkeypatch, capsys):
     creator = cli.ConcurrentProjectCreator(config)
 
     def mock_create_single(name):
-        return (name, 0)
+        return ProjectResult(name, 0)
 
     monkeypatch.setattr(creator, "_create_single_project", mock_create_single)
     result = creator.create_projects(["proj1"])
@@ -315,7 +316,7 @@ def test_create_single_project_success(monkeypatch):
 
     monkeypatch.setattr("restack_gen.commands.new.NewCommand", DummyCommand)
     result = creator._create_single_project("testproj")
-    assert result == ("testproj", 0)
+    assert (result.name, result.exit_code) == ("testproj", 0)
 
 
 def test_create_single_project_failure(monkeypatch):
@@ -331,7 +332,7 @@ def test_create_single_project_failure(monkeypatch):
 
     monkeypatch.setattr("restack_gen.commands.new.NewCommand", DummyCommand)
     result = creator._create_single_project("testproj")
-    assert result == ("testproj", 1)
+    assert (result.name, result.exit_code) == ("testproj", 1)
 
 
 def test_create_single_project_exception(monkeypatch):
@@ -347,30 +348,7 @@ def test_create_single_project_exception(monkeypatch):
 
     monkeypatch.setattr("restack_gen.commands.new.NewCommand", DummyCommand)
     result = creator._create_single_project("testproj")
-    assert result == ("testproj", 1)
-
-
-def test_cleanup_failed_project(monkeypatch, tmp_path):
-    config = cli.Config()
-    creator = cli.ConcurrentProjectCreator(config)
-
-    class DummyCommand:
-        def __init__(self, config):
-            pass
-
-        def _get_app_directory(self, name):
-            return tmp_path / name
-
-    # Create a directory to be cleaned up
-    test_dir = tmp_path / "testproj"
-    test_dir.mkdir()
-    (test_dir / "file.txt").write_text("test")
-
-    cmd = DummyCommand(config)
-    monkeypatch.setattr(cmd, "_get_app_directory", lambda name: test_dir)
-
-    creator._cleanup_failed_project(cmd, "testproj")
-    assert not test_dir.exists()
+    assert (result.name, result.exit_code) == ("testproj", 1)
 
 
 def test_report_results_all_success(monkeypatch, capsys):
@@ -454,42 +432,11 @@ def test_create_single_project_exception_verbose(monkeypatch, capsys):
 
     monkeypatch.setattr("restack_gen.commands.new.NewCommand", DummyCommand)
     result = creator._create_single_project("testproj")
-    assert result == ("testproj", 1)
-    captured = capsys.readouterr()
-    assert "Exception while creating testproj" in captured.out
-
-
-def test_cleanup_failed_project_verbose(monkeypatch, capsys, tmp_path):
-    config = cli.Config()
-    config.verbose = True
-    creator = cli.ConcurrentProjectCreator(config)
-
-    class DummyCommand:
-        def __init__(self, config):
-            pass
-
-        def _get_app_directory(self, name):
-            return tmp_path / name
-
-    # Create a directory
-    test_dir = tmp_path / "testproj"
-    test_dir.mkdir()
-
-    cmd = DummyCommand(config)
-    # Mock shutil.rmtree to raise an exception
-    import shutil
-
-    # Keep a reference to original rmtree if needed
-    _ = shutil.rmtree
-
-    def mock_rmtree(path, ignore_errors=False):
-        raise Exception("Mock cleanup error")
-
-    monkeypatch.setattr(shutil, "rmtree", mock_rmtree)
-
-    creator._cleanup_failed_project(cmd, "testproj")
-    captured = capsys.readouterr()
-    assert "Failed to cleanup testproj" in captured.out
+    assert (result.name, result.exit_code) == ("testproj", 1)
+    # Workers capture their output and return it instead of printing
+    assert "Exception while creating testproj" in result.output
+    assert "Traceback" in result.output
+    assert "Exception while creating" not in capsys.readouterr().out
 
 
 def test_main_script_execution():
@@ -75,28 +75,31 @@ def test_handle_concurrent_new_empty():
     assert rc == ExitCode.ERROR
 
 
-def test_create_projects_cleanup_on_failure(monkeypatch, tmp_path, capsys):
+def test_create_projects_failure_leaves_no_output(monkeypatch, tmp_path, capsys):
     cfg = Config()
     cfg.cwd = tmp_path
     creator = ConcurrentProjectCreator(cfg)
 
-    # Make sure the command returns error and also creates a dir that will be cleaned
-    class FakeCmd:
-        def __init__(self, cfg):
-            self.cfg = cfg
+    # Fail after the files are staged but before the project is published
+    def failing_execute(self, max_in_flight=None):
+        raise OSError("disk full")
 
-        def execute(self, args):
-            # Create a directory to simulate partial output
-            app_dir = self.cfg.cwd / args[0]
-            app_dir.mkdir(parents=True, exist_ok=True)
-            return ExitCode.ERROR
-
-        def _get_app_directory(self, name):
-            return self.cfg.cwd / name
-
-    monkeypatch.setattr("restack_gen.commands.new.NewCommand", FakeCmd)
+    monkeypatch.setattr("restack_gen.core.plan.GenerationPlan.execute", failing_execute)
 
     rc = creator.create_projects(["p1"])  # decorator will supply progress
     assert rc == ExitCode.ERROR
-    # Ensure cleanup removed the directory
     assert not (cfg.cwd / "p1").exists()
+    leftovers = [p.name for p in tmp_path.iterdir() if p.name.startswith(".p1")]
+    assert leftovers == []
+
+
+def test_create_projects_keeps_existing_directory(tmp_path, capsys):
+    cfg = Config()
+    cfg.cwd = tmp_path
+    creator = ConcurrentProjectCreator(cfg)
+    (tmp_path / "p1").mkdir()
+    (tmp_path / "p1" / "keep.txt").write_text("mine")
+
+    rc = creator.create_projects(["p1"])
+    assert rc == ExitCode.ERROR
+    assert (tmp_path / "p1" / "keep.txt").read_text() == "mine"
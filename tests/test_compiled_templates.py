@@ -0,0 +1,62 @@
+import pytest
+
+from restack_gen.core import compiled
+from restack_gen.core import templates as templates_mod
+from restack_gen.core.templates import TemplateEngine, template_pack_exists
+
+
+@pytest.fixture
+def compiled_pack(tmp_path, monkeypatch):
+    templates_root = tmp_path / "templates"
+    source_dir = templates_root / "py"
+    source_dir.mkdir(parents=True)
+    (source_dir / "hello.py.j2").write_text("Hello {{ name }}!")
+    (source_dir / "bye.py.j2").write_text("Bye {{ name }}!")
+    compiled_root = tmp_path / "compiled"
+    assert compiled.compile_all(templates_root, compiled_root) == {"py": 2}
+    monkeypatch.setattr(templates_mod, "TEMPLATES_ROOT", templates_root)
+    monkeypatch.setattr(compiled, "COMPILED_ROOT", compiled_root)
+    return source_dir, compiled_root / "py"
+
+
+def test_engine_renders_from_compiled_modules(compiled_pack):
+    source_dir, compiled_dir = compiled_pack
+    engine = TemplateEngine(source_dir)
+    assert engine.render("hello.py.j2", {"name": "World"}) == "Hello World!"
+    template = engine.env.get_template("hello.py.j2")
+    assert template.filename.startswith(str(compiled_dir))
+
+
+def test_edited_template_falls_back_to_source(compiled_pack):
+    source_dir, compiled_dir = compiled_pack
+    (source_dir / "hello.py.j2").write_text("Hi {{ name }}!")
+    engine = TemplateEngine(source_dir)
+    assert engine.render("hello.py.j2", {"name": "World"}) == "Hi World!"
+    assert engine.env.get_template("bye.py.j2").filename.startswith(str(compiled_dir))
+
+
+def test_version_mismatch_ignores_compiled_pack(compiled_pack, monkeypatch):
+    source_dir, compiled_dir = compiled_pack
+    monkeypatch.setattr(compiled, "VERSION", "0.0.0-other")
+    assert compiled.usable_templates(compiled_dir, source_dir) == set()
+
+
+def test_compiled_only_pack(compiled_pack):
+    import shutil
+
+    source_dir, _ = compiled_pack
+    shutil.rmtree(source_dir)
+    assert template_pack_exists(source_dir)
+    engine = TemplateEngine(source_dir)
+    assert engine.template_exists("bye.py.j2")
+    assert sorted(engine.list_templates()) == ["bye.py.j2", "hello.py.j2"]
+    assert engine.render("bye.py.j2", {"name": "X"}) == "Bye X!"
+
+
+def test_user_template_dirs_do_not_use_compiled(tmp_path, compiled_pack):
+    user_dir = tmp_path / "custom"
+    user_dir.mkdir()
+    (user_dir / "hello.py.j2").write_text("Custom {{ name }}")
+    engine = TemplateEngine(user_dir)
+    assert engine.render("hello.py.j2", {"name": "A"}) == "Custom A"
+    assert engine._compiled_pack() == (None, set())
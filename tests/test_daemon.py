@@ -0,0 +1,105 @@
+import io
+import threading
+
+import pytest
+
+from restack_gen import daemon
+from restack_gen.__main__ import main as dispatcher_main
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(daemon.socket, "AF_UNIX"), reason="requires Unix sockets"
+)
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    path = tmp_path / "d.sock"
+    monkeypatch.setenv("RESTACK_GEN_DAEMON_SOCKET", str(path))
+    monkeypatch.setenv("RESTACK_GEN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("RESTACK_GEN_NO_DAEMON", raising=False)
+    server = daemon.DaemonServer(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if daemon.ping(path) is not None:
+            break
+        threading.Event().wait(0.01)
+    yield server
+    daemon.request_shutdown(path)
+    thread.join(timeout=5)
+
+
+def test_command_from_argv_skips_options():
+    assert daemon.command_from_argv(["--lang", "py", "new", "app"]) == "new"
+    assert daemon.command_from_argv(["--cwd", "new", "routes"]) == "routes"
+    assert daemon.command_from_argv(["-q"]) is None
+    assert daemon.command_from_argv(["--concurrent-new", "a", "b"]) is None
+
+
+def test_should_forward(monkeypatch):
+    monkeypatch.delenv("RESTACK_GEN_NO_DAEMON", raising=False)
+    assert daemon.should_forward(["version"])
+    assert not daemon.should_forward(["dev"])
+    assert not daemon.should_forward(["new", "-i"])
+    monkeypatch.setenv("RESTACK_GEN_NO_DAEMON", "1")
+    assert not daemon.should_forward(["version"])
+
+
+def test_try_forward_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESTACK_GEN_DAEMON_SOCKET", str(tmp_path / "none.sock"))
+    monkeypatch.delenv("RESTACK_GEN_NO_DAEMON", raising=False)
+    assert daemon.try_forward(["version"]) is None
+
+
+def test_dispatcher_forwards_to_daemon(running_daemon, capsys):
+    assert dispatcher_main(["version"]) == 0
+    assert "restack-gen version" in capsys.readouterr().out
+    assert running_daemon.requests_served == 1
+
+
+def test_daemon_runs_in_client_cwd(running_daemon, tmp_path, monkeypatch, capsys):
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    assert daemon.try_forward(["new", "demo-app", "-q"]) == 0
+    assert (workdir / "demo-app" / "service.py").exists()
+
+
+def test_daemon_rejects_version_mismatch(running_daemon):
+    response = running_daemon.handle_request(
+        {"op": "run", "argv": ["version"], "version": "0.0.0"}
+    )
+    assert "error" in response
+
+
+def test_prompting_commands_stay_local_on_a_terminal(monkeypatch):
+    class Terminal:
+        def isatty(self):
+            return True
+
+    monkeypatch.delenv("RESTACK_GEN_NO_DAEMON", raising=False)
+    monkeypatch.setattr(daemon.sys, "stdin", Terminal())
+    assert not daemon.should_forward(["g", "agent", "Foo"])
+    assert daemon.should_forward(["g", "agent", "Foo", "--force"])
+    assert daemon.should_forward(["-y", "generate", "agent", "Foo"])
+    assert daemon.should_forward(["new", "app"])
+
+
+def test_daemon_prompt_fails_loudly(running_daemon, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(daemon.sys, "stdin", io.StringIO("y\n"))
+    monkeypatch.chdir(tmp_path)
+    assert daemon.try_forward(["new", "demo-app", "-q"]) == 0
+    monkeypatch.chdir(tmp_path / "demo-app")
+    assert daemon.try_forward(["g", "agent", "Billing", "-q"]) == 0
+    capsys.readouterr()
+    assert daemon.try_forward(["g", "agent", "Billing"]) == 1
+    assert "cannot prompt inside the restack-gen daemon" in capsys.readouterr().out
+
+
+def test_daemon_rejects_other_settings(running_daemon, monkeypatch):
+    request = {"op": "run", "argv": ["version"], "version": daemon.VERSION}
+    response = running_daemon.handle_request({**request, "env": {}})
+    assert response == {"error": "environment mismatch"}
+    env = daemon.settings_env()
+    assert "RESTACK_GEN_DAEMON_SOCKET" not in env
+    assert running_daemon.handle_request({**request, "env": env})["exit_code"] == 0
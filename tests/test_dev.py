@@ -247,3 +247,127 @@ def test_dev_command_falls_back_to_sh_on_windows(tmp_path, monkeypatch):
     # Should have called bash with the .sh script
     assert "/usr/bin/bash" in called_with
     assert str(sh_script) in called_with
+
+
+# --- Hot-reload supervisor ---
+def _worker_project(root):
+    (root / "src" / "agents").mkdir(parents=True)
+    (root / "src" / "other").mkdir()
+    (root / "src" / "__init__.py").write_text("")
+    (root / "src" / "agents" / "__init__.py").write_text("")
+    (root / "src" / "agents" / "billing.py").write_text("from ..util import helper\n")
+    (root / "src" / "util.py").write_text("helper = 1\n")
+    (root / "src" / "other" / "unused.py").write_text("x = 1\n")
+    (root / "service.py").write_text(
+        "import time\nfrom src.agents import billing\ntime.sleep(30)\n"
+    )
+
+
+def test_import_closure_follows_project_imports(tmp_path):
+    from restack_gen.core.supervisor import import_closure
+
+    _worker_project(tmp_path)
+    assert import_closure(tmp_path, "service.py") == {
+        "service.py",
+        "src/__init__.py",
+        "src/agents/__init__.py",
+        "src/agents/billing.py",
+        "src/util.py",
+    }
+
+
+def test_import_closure_typescript(tmp_path):
+    from restack_gen.core.supervisor import import_closure
+
+    (tmp_path / "src" / "agents").mkdir(parents=True)
+    (tmp_path / "src" / "server.ts").write_text(
+        'import { agents } from "./routes.js";\nimport express from "express";\n'
+    )
+    (tmp_path / "src" / "routes.ts").write_text("export { billing } from './agents';\n")
+    (tmp_path / "src" / "agents" / "index.ts").write_text("export const billing = 1;\n")
+    assert import_closure(tmp_path, "src/server.ts") == {
+        "src/server.ts",
+        "src/routes.ts",
+        "src/agents/index.ts",
+    }
+
+
+def test_collect_debounces_a_burst(tmp_path):
+    from restack_gen.core.watch import PollingWatcher, collect
+
+    (tmp_path / "src").mkdir()
+    watcher = PollingWatcher(tmp_path, [tmp_path / "src"], interval=0.02)
+    assert collect(watcher, timeout=0.05) == (set(), None)
+    (tmp_path / "src" / "a.py").write_text("a = 1\n")
+    (tmp_path / "src" / "b.ts").write_text("export {}\n")
+    (tmp_path / "src" / "notes.txt").write_text("ignored\n")
+    changed, first = collect(watcher, timeout=1, debounce=0.1)
+    assert changed == {str(tmp_path / "src" / "a.py"), str(tmp_path / "src" / "b.ts")}
+    assert first is not None
+
+
+def test_inotify_watcher_sees_new_directories(tmp_path):
+    from restack_gen.core.watch import InotifyWatcher
+
+    (tmp_path / "src").mkdir()
+    try:
+        watcher = InotifyWatcher(tmp_path, [tmp_path / "src"])
+    except (OSError, AttributeError):
+        pytest.skip("inotify is not available")
+    try:
+        (tmp_path / "src" / "new").mkdir()
+        (tmp_path / "src" / "new" / "a.py").write_text("a = 1\n")
+        assert str(tmp_path / "src" / "new" / "a.py") in watcher.poll(1)
+        (tmp_path / "src" / "new" / "a.py").write_text("a = 2\n")
+        assert watcher.poll(1) == {str(tmp_path / "src" / "new" / "a.py")}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="POSIX process groups")
+def test_supervisor_restarts_worker_on_imported_changes_only(tmp_path):
+    import threading
+    import time
+
+    from restack_gen.core.supervisor import STATS_PATH, Supervisor
+    from restack_gen.core.watch import PollingWatcher
+
+    _worker_project(tmp_path)
+    watcher = PollingWatcher(tmp_path, [tmp_path / "src"], interval=0.02)
+    supervisor = Supervisor(
+        tmp_path,
+        [sys.executable, "service.py"],
+        "service.py",
+        watcher,
+        debounce=0.05,
+        log=lambda message: None,
+    )
+    thread = threading.Thread(
+        target=supervisor.run, kwargs={"max_restarts": 1, "timeout": 0.05}
+    )
+    thread.start()
+    try:
+        time.sleep(0.3)
+        first_worker = supervisor.worker
+        (tmp_path / "src" / "other" / "unused.py").write_text("x = 2\n")
+        time.sleep(0.3)
+        assert supervisor.restarts == []
+        (tmp_path / "src" / "util.py").write_text("helper = 2\n")
+        thread.join(10)
+    finally:
+        if thread.is_alive():
+            supervisor.restarts.append(None)  # Let run() finish
+            thread.join(10)
+    assert [r.files for r in supervisor.restarts] == [["src/util.py"]]
+    assert supervisor.restarts[0].latency_ms >= supervisor.restarts[0].debounce_ms
+    assert first_worker.returncode is not None
+    assert supervisor.worker.poll() is not None  # Stopped on exit
+    assert "restarts" in (tmp_path / STATS_PATH).read_text()
+
+
+def test_dev_command_supervises_service_dry_run(tmp_path, capsys):
+    _worker_project(tmp_path)
+    cmd = DevCommand(Config(cwd=tmp_path, dry_run=True))
+    assert cmd.execute([]) == 0
+    out = capsys.readouterr().out
+    assert "service.py, restarting it when a module it imports changes" in out
@@ -1,5 +1,8 @@
+import os
+import unittest.mock
 from restack_gen.commands.generate import GenerateCommand
 from restack_gen.constants import Config, GenerationType, Language
+from restack_gen.core.lockfile import GenerationLock
 import pytest
 from pathlib import Path
 
@@ -241,3 +244,56 @@ def test_generate_typescript_flow(tmp_path):
     assert func_file.exists()
     content = func_file.read_text()
     assert "TestFunction" in content
+
+
+def test_generate_force_skips_identical_write(tmp_path, capsys):
+    cmd = GenerateCommand(Config(cwd=tmp_path, force=True))
+    assert cmd.execute(["agent", "Twice"]) == 0
+    agent_file = tmp_path / "src" / "agents" / "twice.py"
+    os.utime(agent_file, ns=(1, 1))
+    capsys.readouterr()
+    assert cmd.execute(["agent", "Twice"]) == 0
+    assert "write skipped" in capsys.readouterr().out
+    assert agent_file.stat().st_mtime_ns == 1
+
+
+def test_generate_batch_in_one_invocation(tmp_path, capsys):
+    cmd = GenerateCommand(Config(cwd=tmp_path))
+    args = ["agent", "Billing", "Support", "function", "send_email", "workflow", "W"]
+    with unittest.mock.patch.object(
+        cmd, "_setup_engine", wraps=cmd._setup_engine
+    ) as setup:
+        assert cmd.execute(args) == 0
+    assert setup.call_count == 1
+    src = tmp_path / "src"
+    for rel in [
+        "agents/billing.py",
+        "agents/support.py",
+        "functions/send_email.py",
+        "workflows/w.py",
+    ]:
+        assert (src / rel).is_file()
+    assert "Generated 4 of 4 component(s)" in capsys.readouterr().out
+    lock = GenerationLock.load(tmp_path)
+    assert lock.files["src/agents/support.py"].component == "Support"
+    assert lock.files["src/functions/send_email.py"].component == "send_email"
+
+
+def test_generate_batch_rejects_type_without_names(tmp_path):
+    cmd = GenerateCommand(Config(cwd=tmp_path))
+    assert cmd.execute(["agent", "A", "function"]) == 1
+    assert cmd.execute(["agent", "function", "x"]) == 1
+    assert not (tmp_path / "src").exists()
+
+
+def test_generate_from_file(tmp_path):
+    components = tmp_path / "components.toml"
+    components.write_text('agents = ["Billing"]\nfunction = "send_email"\n')
+    cmd = GenerateCommand(Config(cwd=tmp_path, from_file=components))
+    assert cmd.execute([]) == 0
+    assert (tmp_path / "src/agents/billing.py").is_file()
+    assert (tmp_path / "src/functions/send_email.py").is_file()
+
+    components.write_text('gizmos = ["X"]\n')
+    assert cmd.execute([]) == 1
+    assert cmd.execute(["agent", "A"]) == 1
@@ -0,0 +1,67 @@
+import os
+
+from restack_gen.commands.new import NewCommand
+from restack_gen.constants import Config
+from restack_gen.core.golden import GOLDEN_PROBE, GoldenProject, GoldenProjectCache
+from restack_gen.core.pipeline import FileJob
+from restack_gen.core.plan import GenerationPlan
+from restack_gen.utils.files import clone_file
+
+
+def _plan(root, name):
+    return GenerationPlan(
+        root,
+        jobs=[
+            FileJob(root / "shared.txt", content="same for everyone"),
+            FileJob(root / "named.txt", content=f"hello {name}"),
+            FileJob(root / f"{name}.py", content="x = 1"),
+        ],
+    )
+
+
+def test_golden_project_keeps_only_name_independent_files(tmp_path):
+    golden = GoldenProject.build(_plan(tmp_path / "golden", GOLDEN_PROBE))
+    assert [str(p) for p in golden.files] == ["shared.txt"]
+    assert (tmp_path / "golden" / "shared.txt").exists()
+    assert not (tmp_path / "golden" / "named.txt").exists()
+
+
+def test_substituted_plan_clones_shared_files(tmp_path):
+    golden = GoldenProject.build(_plan(tmp_path / "golden", GOLDEN_PROBE))
+    plan = _plan(tmp_path / "app", "app")
+    assert golden.substitute(plan) == 1
+    plan.execute()
+    assert (tmp_path / "app" / "shared.txt").read_text() == "same for everyone"
+    assert (tmp_path / "app" / "named.txt").read_text() == "hello app"
+    assert (tmp_path / "app" / "app.py").exists()
+
+
+def test_clone_file_copies_or_links(tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_text("data")
+    assert clone_file(src, tmp_path / "copy.txt") == 4
+    assert (tmp_path / "copy.txt").read_text() == "data"
+    assert os.stat(tmp_path / "copy.txt").st_ino != os.stat(src).st_ino
+    clone_file(src, tmp_path / "link.txt", hardlink=True)
+    assert os.stat(tmp_path / "link.txt").st_ino == os.stat(src).st_ino
+
+
+def test_new_with_golden_cache_matches_plain_render(tmp_path):
+    config = Config()
+    config.cwd = tmp_path
+    cache = GoldenProjectCache(tmp_path)
+    for name in ("one", "two"):
+        cmd = NewCommand(config)
+        cmd.golden_cache = cache
+        assert cmd.execute([name]) == 0
+    cache.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["one", "two"]
+    plain = NewCommand(config)
+    assert plain.execute(["three"]) == 0
+    script = os.path.join("scripts", "run_engine.sh")
+    assert (tmp_path / "two" / script).read_text() == (
+        (tmp_path / "three" / script).read_text()
+    )
+    assert os.access(tmp_path / "two" / script, os.X_OK)
+    assert "two" in (tmp_path / "two" / "service.py").read_text().lower()
+    assert not [p for p in tmp_path.iterdir() if ".golden." in p.name]
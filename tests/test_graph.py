@@ -0,0 +1,185 @@
+import json
+
+from restack_gen.commands.routes import RoutesCommand
+from restack_gen.constants import Config
+from restack_gen.core.graph import build_graph
+from restack_gen.core.index import ComponentIndex
+from restack_gen.core.routes import RouteTable, parse_python, parse_typescript
+from restack_gen.core.templates import (
+    TEMPLATES_ROOT,
+    TemplateEngine,
+    build_template_context,
+)
+
+RAG = {
+    "service.py": (
+        "from src.agents.rag import Rag\n"
+        "from src.workflows.rag_search import RagSearch\n"
+        "from src.functions.search import search_index\n"
+        "from src.functions.llm_chat import llm_chat\n"
+        "client.start_service(agents=[Rag], workflows=[RagSearch],\n"
+        "                     functions=[search_index, llm_chat])\n"
+    ),
+    "src/agents/rag.py": (
+        "with import_functions():\n"
+        "    from src.workflows.rag_search import RagSearch\n"
+        "@agent.defn()\n"
+        "class Rag:\n"
+        "    @agent.run\n"
+        "    async def run(self, agent_input):\n"
+        "        return await agent.child_execute(\n"
+        "            workflow=RagSearch, workflow_id='x'\n"
+        "        )\n"
+    ),
+    "src/workflows/rag_search.py": (
+        "with import_functions():\n"
+        "    from src.functions.search import search_index, SearchInput\n"
+        "    from src.functions.llm_chat import llm_chat, LlmChatInput\n"
+        "@workflow.defn()\n"
+        "class RagSearch:\n"
+        "    @workflow.run\n"
+        "    async def run(self, workflow_input):\n"
+        "        passages = await workflow.step(search_index, SearchInput())\n"
+        "        await workflow.step(missing_fn, None)\n"
+        "        return passages\n"
+    ),
+    "src/functions/search.py": (
+        "class SearchInput:\n    pass\n"
+        "@function.defn()\nasync def search_index(search_input):\n    pass\n"
+    ),
+    "src/functions/llm_chat.py": (
+        "class LlmChatInput:\n    pass\n"
+        "@function.defn()\nasync def llm_chat(chat_input):\n    pass\n"
+    ),
+}
+
+
+def _write(root, files):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def _graph(root):
+    return build_graph(RouteTable(root).build(ComponentIndex.load(root).entries))
+
+
+def test_parse_python_calls():
+    facts = parse_python(RAG["src/workflows/rag_search.py"])
+    assert ["RagSearch", "search_index", "step", 8] in facts.calls
+    assert ["RagSearch", "missing_fn", "step", 9] in facts.calls
+    assert [None, "llm_chat", "import", 3] in facts.calls
+
+
+def test_parse_typescript_calls():
+    facts = parse_typescript(
+        "import { notify } from '../functions/notify';\n"
+        "export async function onboarding(ctx) {\n"
+        "  await step(notify, {});\n"
+        "  await executeChild({ workflow: flows.billing, args: [] });\n"
+        "}\n"
+    )
+    assert facts.calls == [
+        ["onboarding", "notify", "step", 3],
+        ["onboarding", "flows.billing", "child", 4],
+    ]
+
+
+def test_graph_edges_and_metrics(tmp_path):
+    _write(tmp_path, RAG)
+    graph = _graph(tmp_path)
+    edges = {
+        (e.source.split(":")[1], e.target.split(":")[1], e.via) for e in graph.edges
+    }
+    assert edges == {
+        ("Rag", "RagSearch", "child"),
+        ("RagSearch", "search_index", "step"),
+        ("RagSearch", "llm_chat", "import"),
+    }
+    nodes = {n.name: n for n in graph.nodes.values()}
+    assert (nodes["Rag"].fan_out, nodes["Rag"].reach, nodes["Rag"].depth) == (1, 3, 2)
+    assert (nodes["RagSearch"].fan_out, nodes["RagSearch"].fan_in) == (2, 1)
+    assert nodes["llm_chat"].fan_in == 1 and nodes["llm_chat"].depth == 0
+    assert graph.unresolved == [
+        {
+            "from": "src/workflows/rag_search.py:RagSearch",
+            "symbol": "missing_fn",
+            "via": "step",
+            "line": 9,
+        }
+    ]
+    assert graph.cycles == []
+
+
+def test_graph_detects_cycles(tmp_path):
+    files = dict(RAG)
+    files["src/functions/llm_chat.py"] = (
+        "from src.agents.rag import Rag\n"
+        "@function.defn()\nasync def llm_chat(chat_input):\n"
+        "    await function.child_execute(Rag)\n"
+    )
+    _write(tmp_path, files)
+    graph = _graph(tmp_path)
+    assert graph.cycles == [
+        [
+            "src/agents/rag.py:Rag",
+            "src/functions/llm_chat.py:llm_chat",
+            "src/workflows/rag_search.py:RagSearch",
+        ]
+    ]
+    nodes = {n.name: n for n in graph.nodes.values()}
+    # The cycle counts as one step: Rag -> {cycle} -> search_index
+    assert (nodes["Rag"].depth, nodes["Rag"].reach) == (1, 3)
+    assert "// cycle: src/agents/rag.py:Rag -> " in graph.to_dot()
+
+
+def test_routes_graph_reuses_cache(tmp_path, capsys):
+    _write(tmp_path, RAG)
+    config = Config(cwd=tmp_path, graph=True, json_output=True)
+    assert RoutesCommand(config).execute([]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert len(data["nodes"]) == 4 and len(data["edges"]) == 3
+
+    table = RouteTable(tmp_path).build(ComponentIndex.load(tmp_path).entries)
+    build_graph(table)
+    assert table.parsed == 0
+
+
+def test_routes_graph_dot(tmp_path, capsys):
+    _write(tmp_path, RAG)
+    assert RoutesCommand(Config(cwd=tmp_path, graph=True)).execute([]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("digraph routes {")
+    assert (
+        '"src/agents/rag.py:Rag" -> "src/workflows/rag_search.py:RagSearch" '
+        '[label="child"];' in out
+    )
+    assert 'label="missing_fn\\n(not found)"' in out
+
+
+def test_graph_from_rendered_templates(tmp_path):
+    engine = TemplateEngine(TEMPLATES_ROOT / "py", auto_reload=False)
+    for template, rel, name in [
+        ("agent_rag.py.j2", "src/agents/support_bot.py", "SupportBot"),
+        (
+            "workflow_rag_search.py.j2",
+            "src/workflows/support_bot_rag_search.py",
+            "SupportBot",
+        ),
+        ("function_search.py.j2", "src/functions/search.py", "search"),
+        ("function_llm_chat.py.j2", "src/functions/llm_chat.py", "llm_chat"),
+    ]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(engine.render(template, build_template_context(name)))
+    graph = _graph(tmp_path)
+    edges = {
+        (e.source.split(":")[1], e.target.split(":")[1], e.via) for e in graph.edges
+    }
+    assert edges == {
+        ("SupportBotRag", "SupportBotRagSearch", "child"),
+        ("SupportBotRagSearch", "search_index", "step"),
+        ("SupportBotRagSearch", "llm_chat", "step"),
+    }
+    assert graph.unresolved == []
@@ -0,0 +1,129 @@
+import os
+
+from restack_gen.commands.generate import GenerateCommand
+from restack_gen.commands.routes import RoutesCommand
+from restack_gen.constants import Config
+from restack_gen.core import index as index_module
+from restack_gen.core.index import INDEX_PATH, ComponentIndex
+
+
+def _tree(root):
+    for rel in [
+        "src/agents/billing.py",
+        "src/agents/__init__.py",
+        "src/agents/__pycache__/billing.cpython-311.pyc",
+        "src/workflows/onboarding.ts",
+        "src/functions/nested/send_email.py",
+        "src/other/ignored.py",
+    ]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {rel}\n")
+
+
+def test_index_lists_components(tmp_path):
+    _tree(tmp_path)
+    index = ComponentIndex.load(tmp_path)
+    assert sorted(index.entries) == [
+        "src/agents/billing.py",
+        "src/functions/nested/send_email.py",
+        "src/workflows/onboarding.ts",
+    ]
+    assert [e.name for e in index.components("agent")] == ["billing"]
+    assert index.entries["src/workflows/onboarding.ts"].lang == "ts"
+    assert index.language() == "py"
+    assert (tmp_path / INDEX_PATH).is_file()
+
+
+def test_refresh_rehashes_only_changed_files(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    ComponentIndex.load(tmp_path)
+    hashed = []
+    sha = index_module.file_sha256
+    monkeypatch.setattr(
+        index_module, "file_sha256", lambda p: hashed.append(p) or sha(p)
+    )
+
+    index = ComponentIndex.load(tmp_path)
+    assert hashed == [] and not index.dirty
+
+    billing = tmp_path / "src/agents/billing.py"
+    billing.write_text("# changed, and longer\n")
+    (tmp_path / "src/workflows/onboarding.ts").unlink()
+    index = ComponentIndex.load(tmp_path)
+    assert hashed == [billing]
+    assert "src/workflows/onboarding.ts" not in index.entries
+    assert ComponentIndex.load(tmp_path, refresh=False).entries.keys() == (
+        index.entries.keys()
+    )
+
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / INDEX_PATH).parent.mkdir()
+    (tmp_path / INDEX_PATH).write_text("{not json")
+    assert len(ComponentIndex.load(tmp_path, refresh=False).entries) == 3
+
+
+def test_update_indexes_written_files(tmp_path):
+    index = ComponentIndex.load(tmp_path)
+    path = tmp_path / "src/agents/new_agent.py"
+    path.parent.mkdir(parents=True)
+    path.write_text("x")
+    index.update([path, tmp_path / "README.md"])
+    assert list(index.entries) == ["src/agents/new_agent.py"]
+    os.unlink(path)
+    index.update([path])
+    assert index.entries == {}
+
+
+def test_generate_updates_index_and_warns_on_collisions(tmp_path, capsys):
+    cmd = GenerateCommand(Config(cwd=tmp_path))
+    assert cmd.execute(["agent", "Billing"]) == 0
+    assert (
+        "src/agents/billing.py" in ComponentIndex.load(tmp_path, refresh=False).entries
+    )
+    assert cmd.execute(["workflow", "billing"]) == 0
+    assert "already used by src/agents/billing.py" in capsys.readouterr().out
+
+
+def test_routes_lists_unregistered_components(tmp_path, capsys):
+    _tree(tmp_path)
+    (tmp_path / "src/agents/billing.py").write_text(
+        "@agent.defn()\nclass Billing:\n    pass\n"
+    )
+    (tmp_path / "service.py").write_text(
+        "from src.agents.billing import Billing\n"
+        "client.start_service(agents=[Billing], functions=[])\n"
+    )
+    assert RoutesCommand(Config(cwd=tmp_path)).execute([]) == 0
+    out = capsys.readouterr().out
+    assert "send_email (function)" in out and "onboarding (workflow)" in out
+    assert "billing (agent)" not in out
+
+
+def test_refresh_skips_unchanged_directories(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    ComponentIndex.load(tmp_path)
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(
+        index_module.os, "scandir", lambda p: listed.append(p) or scandir(p)
+    )
+
+    index = ComponentIndex.load(tmp_path)
+    assert listed == [] and len(index.entries) == 3
+
+    (tmp_path / "src/functions/nested/charge.py").write_text("x")
+    index = ComponentIndex.load(tmp_path)
+    assert listed == [os.path.join(tmp_path, "src/functions/nested")]
+    assert "src/functions/nested/charge.py" in index.entries
+    assert "src/agents/billing.py" in index.entries
+
+    # An in-place edit leaves the directory alone but not the file's stat
+    listed.clear()
+    billing = tmp_path / "src/agents/billing.py"
+    billing.write_text("# edited in place\n")
+    index = ComponentIndex.load(tmp_path)
+    assert listed == []
+    assert index.entries["src/agents/billing.py"].size == billing.stat().st_size
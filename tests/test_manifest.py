@@ -0,0 +1,211 @@
+import json
+import threading
+
+import pytest
+
+from restack_gen import cli
+from restack_gen.cli import ExitCode, ManifestProjectCreator, main
+from restack_gen.commands.new import NewCommand
+from restack_gen.constants import Config, Language
+from restack_gen.core.manifest import (
+    Journal,
+    LineRanges,
+    ManifestError,
+    iter_manifest,
+    parse_entry,
+)
+
+
+def _manifest(path, *entries):
+    lines = [e if isinstance(e, str) else json.dumps(e) for e in entries]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_parse_entry_reads_overrides():
+    entry = parse_entry(
+        3, '{"name": "a", "lang": "ts", "pm": "npm", "cwd": "x", "toml": {"k": 1}}'
+    )
+    assert entry.line == 3 and entry.name == "a"
+    assert entry.lang is Language.TYPESCRIPT
+    assert entry.package_manager == "npm"
+    assert str(entry.cwd) == "x" and entry.toml == {"k": 1}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "not json",
+        "[1]",
+        '{"lang": "py"}',
+        '{"name": "a", "lang": "go"}',
+        '{"name": "a", "pm": "yarn"}',
+        '{"name": "a", "toml": 1}',
+    ],
+)
+def test_parse_entry_rejects_invalid_lines(text):
+    with pytest.raises(ManifestError, match="line 7"):
+        parse_entry(7, text)
+
+
+def test_iter_manifest_skips_blank_and_comment_lines(tmp_path):
+    path = _manifest(tmp_path / "m.jsonl", "# header", "", {"name": "a"})
+    assert [n for n, _ in iter_manifest(path)] == [3]
+
+
+def test_line_ranges_merge():
+    done = LineRanges()
+    for line in (1, 2, 5, 4, 3, 9):
+        done.add(line)
+    assert done.ranges == 2 and len(done) == 6
+    assert 3 in done and 9 in done and 6 not in done and 0 not in done
+
+
+def test_journal_survives_torn_line(tmp_path):
+    journal = Journal(tmp_path / "m.jsonl")
+    journal.path.write_text('{"line": 1, "name": "a", "status": "ok"}\n{"line": 2')
+    journal.record(3, "c", "ok")
+    journal.record(4, "d", "failed", "boom")
+    journal.close()
+    done = journal.load()
+    assert 1 in done and 3 in done
+    assert 2 not in done and 4 not in done
+
+
+def test_journal_matches_line_and_name(tmp_path):
+    journal = Journal(tmp_path / "m.jsonl")
+    journal.record(1, "a", "ok")
+    journal.record(2, "b", "ok")
+    journal.close()
+    done = journal.load()
+    assert done.matches(1, "a") and done.matches(2, "b")
+    assert not done.matches(1, "b") and not done.matches(3, "a")
+
+
+def test_manifest_edited_between_runs_does_not_skip_wrong_entry(
+    tmp_path, monkeypatch, capsys
+):
+    path = _manifest(tmp_path / "projects.jsonl", {"name": "one"}, {"name": "two"})
+    config = Config(cwd=tmp_path, quiet=True)
+    assert ManifestProjectCreator(config).create_from_manifest(path) == (
+        ExitCode.SUCCESS
+    )
+    # "one" is removed and "zero" takes its line
+    _manifest(path, {"name": "zero"}, {"name": "two"})
+    created = []
+    original = ManifestProjectCreator._create_entry
+
+    def tracking(self, entry):
+        created.append(entry.name)
+        return original(self, entry)
+
+    monkeypatch.setattr(ManifestProjectCreator, "_create_entry", tracking)
+    capsys.readouterr()
+    assert ManifestProjectCreator(config).create_from_manifest(path) == (
+        ExitCode.SUCCESS
+    )
+    assert created == ["zero"]
+    assert (tmp_path / "zero").is_dir()
+    assert "line 1 is now 'zero'" in capsys.readouterr().out
+
+
+def test_new_applies_toml_overrides(tmp_path):
+    cmd = NewCommand(Config())
+    cmd.toml_overrides = {"timeouts": {"start_to_close": 60}}
+    values = cmd._load_toml_config(tmp_path / "templates", "app", tmp_path / "app")
+    assert values["timeouts_start_to_close_seconds"] == 60
+
+
+def test_manifest_creates_projects_and_resumes(tmp_path, monkeypatch):
+    path = _manifest(
+        tmp_path / "projects.jsonl",
+        {"name": "one"},
+        {"name": "two", "cwd": "nested"},
+        "broken",
+        {"name": "three"},
+    )
+    config = Config(cwd=tmp_path, quiet=True)
+
+    original = ManifestProjectCreator._create_entry
+
+    def interrupted(self, entry):
+        if entry.name == "three":
+            raise OSError("disk full")
+        return original(self, entry)
+
+    monkeypatch.setattr(ManifestProjectCreator, "_create_entry", interrupted)
+    assert ManifestProjectCreator(config, jobs=2).create_from_manifest(path) == (
+        ExitCode.ERROR
+    )
+    assert (tmp_path / "one").is_dir()
+    assert (tmp_path / "nested" / "two").is_dir()
+    assert not (tmp_path / "three").exists()
+
+    monkeypatch.setattr(ManifestProjectCreator, "_create_entry", original)
+    created = []
+
+    def tracking(self, entry):
+        created.append(entry.name)
+        return original(self, entry)
+
+    monkeypatch.setattr(ManifestProjectCreator, "_create_entry", tracking)
+    path.write_text(path.read_text().replace("broken", '{"name": "four"}'))
+    assert ManifestProjectCreator(config).create_from_manifest(path) == (
+        ExitCode.SUCCESS
+    )
+    assert sorted(created) == ["four", "three"]
+    assert (tmp_path / "three").is_dir() and (tmp_path / "four").is_dir()
+    leftovers = [p.name for p in tmp_path.iterdir() if p.name.startswith(".")]
+    assert not any(name.endswith(".restack-gen-stage") for name in leftovers)
+
+
+def test_manifest_interrupt_journals_running_entries(tmp_path, monkeypatch):
+    path = _manifest(
+        tmp_path / "projects.jsonl", *({"name": f"app{i}"} for i in range(4))
+    )
+    config = Config(cwd=tmp_path, quiet=True)
+    original = ManifestProjectCreator._create_entry
+    running = threading.Barrier(3)
+
+    def slow(self, entry):
+        running.wait()
+        return original(self, entry)
+
+    def interrupt(*args, **kwargs):
+        running.wait()  # Both workers are inside an entry
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(ManifestProjectCreator, "_create_entry", slow)
+    monkeypatch.setattr(cli, "wait", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        ManifestProjectCreator(config, jobs=2).create_from_manifest(path)
+    assert (tmp_path / "app0").is_dir() and (tmp_path / "app1").is_dir()
+    assert not (tmp_path / "app2").exists()
+    done = Journal(path).load()
+    assert done.matches(1, "app0") and done.matches(2, "app1")
+
+    monkeypatch.undo()
+    assert ManifestProjectCreator(config).create_from_manifest(path) == (
+        ExitCode.SUCCESS
+    )
+    assert (tmp_path / "app3").is_dir()
+
+
+def test_manifest_dry_run_writes_nothing(tmp_path, capsys):
+    path = _manifest(tmp_path / "m.jsonl", {"name": "one"})
+    rc = main(
+        ["new", "--from-manifest", str(path), "--cwd", str(tmp_path), "--dry-run"]
+    )
+    assert rc == ExitCode.SUCCESS
+    assert "Would create" in capsys.readouterr().out
+    assert not (tmp_path / "one").exists()
+    assert not (tmp_path / "m.jsonl.journal").exists()
+
+
+def test_manifest_rejects_project_names(tmp_path, capsys):
+    path = _manifest(tmp_path / "m.jsonl", {"name": "one"})
+    assert main(["new", "extra", "--from-manifest", str(path)]) == ExitCode.ERROR
+
+
+def test_manifest_missing_file(tmp_path, capsys):
+    assert main(["new", "--from-manifest", str(tmp_path / "nope")]) == ExitCode.ERROR
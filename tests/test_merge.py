@@ -0,0 +1,38 @@
+from restack_gen.core.merge import merge3
+
+BASE = "header\none\ntwo\nthree\nfooter\n"
+
+
+def test_changes_on_separate_lines_merge_cleanly():
+    ours = "header\none\ntwo (mine)\nthree\nfooter\n"
+    theirs = "header v2\none\ntwo\nthree\nfooter\n"
+    result = merge3(BASE, ours, theirs)
+    assert result.clean
+    assert result.text == "header v2\none\ntwo (mine)\nthree\nfooter\n"
+
+
+def test_identical_changes_are_taken_once():
+    both = "header\none\n2\nthree\nfooter\n"
+    result = merge3(BASE, both, both)
+    assert result.clean and result.text == both
+
+
+def test_unchanged_side_takes_the_other():
+    theirs = "header\nthree\nfooter\nappended\n"
+    assert merge3(BASE, BASE, theirs).text == theirs
+    assert merge3(BASE, theirs, BASE).text == theirs
+
+
+def test_overlapping_changes_conflict_with_diff3_markers():
+    ours = "header\none\nmine\nthree\nfooter\n"
+    theirs = "header\none\ntheirs\nthree\nfooter\n"
+    result = merge3(BASE, ours, theirs)
+    assert result.conflicts == 1
+    assert result.text == (
+        "header\none\n"
+        "<<<<<<< current\nmine\n"
+        "||||||| base\ntwo\n"
+        "=======\ntheirs\n"
+        ">>>>>>> new template\n"
+        "three\nfooter\n"
+    )
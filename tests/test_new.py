@@ -1,6 +1,31 @@
+from restack_gen.commands.generate import GenerateCommand
 from restack_gen.commands.new import NewCommand
 from restack_gen.constants import Config, Language
+from restack_gen.core.plan import GenerationPlan
+from restack_gen.core.project import ProjectStructure
+from restack_gen.core.templates import TEMPLATES_ROOT, TemplateEngine
 from pathlib import Path
+from unittest.mock import patch
+
+
+def _apply_planned(cmd, app_dir, keep, lang=Language.PYTHON):
+    """Write the files of the app's plan that keep(job) selects."""
+    engine = TemplateEngine(TEMPLATES_ROOT / lang.value)
+    plan = cmd._plan_app(engine, app_dir.name, app_dir, lang, {})
+    jobs = [p.job for p in plan.files if keep(p.job)]
+    cmd._apply_plan(GenerationPlan(app_dir, plan.directories, jobs))
+
+
+def _is_sample(job):
+    return job.label.startswith("sample ") and job.label != "sample test"
+
+
+def _fail_rendering(monkeypatch):
+    def fail(*args, **kwargs):
+        raise Exception("render error")
+
+    monkeypatch.setattr(TemplateEngine, "render", fail)
+    monkeypatch.setattr(TemplateEngine, "render_to", fail)
 
 
 def test_new_command_valid(monkeypatch, tmp_path):
@@ -158,8 +183,7 @@ def test_create_readme(tmp_path):
     config = Config()
     cmd = NewCommand(config)
     app_dir = tmp_path / "testapp"
-    app_dir.mkdir()
-    cmd._create_readme(app_dir, "testapp")
+    _apply_planned(cmd, app_dir, lambda job: job.path.name == "README.md")
     readme_path = app_dir / "README.md"
     assert readme_path.exists()
 
@@ -167,54 +191,29 @@ def test_create_readme(tmp_path):
 def test_generate_samples(tmp_path):
     config = Config()
     cmd = NewCommand(config)
-    from restack_gen.core.project import ProjectStructure
-    from restack_gen.core.templates import TemplateEngine
-
-    project = ProjectStructure(tmp_path / "testapp")
-    project.ensure_structure()
-    templates_root = Path(__file__).parent.parent / "templates"
-    template_dir = templates_root / "py"
-    engine = TemplateEngine(template_dir)
-    toml_values = {}
-    cmd._generate_samples(engine, project, "testapp", Language.PYTHON, toml_values)
-    # Check if files were created
-    agents_dir = project.get_subdir("agents")
-    functions_dir = project.get_subdir("functions")
-    workflows_dir = project.get_subdir("workflows")
-    assert (agents_dir / "testapp.py").exists() or not engine.template_exists(
-        "agent.py.j2"
-    )
-    assert (functions_dir / "llm_chat.py").exists() or not engine.template_exists(
-        "function.py.j2"
-    )
-    assert (
-        workflows_dir / "automated_workflow.py"
-    ).exists() or not engine.template_exists("workflow.py.j2")
+    app_dir = tmp_path / "testapp"
+    _apply_planned(cmd, app_dir, _is_sample)
+    project = ProjectStructure(app_dir, discover=False)
+    assert (project.get_subdir("agents") / "testapp.py").exists()
+    assert (project.get_subdir("functions") / "llm_chat.py").exists()
+    assert (project.get_subdir("workflows") / "automated_workflow.py").exists()
+    assert not (app_dir / "service.py").exists()
 
 
 def test_generate_test_sample(tmp_path):
     config = Config()
     cmd = NewCommand(config)
-    from restack_gen.core.project import ProjectStructure
-    from restack_gen.core.templates import TemplateEngine
-
-    project = ProjectStructure(tmp_path / "testapp")
-    project.ensure_structure()
-    templates_root = Path(__file__).parent.parent / "templates"
-    template_dir = templates_root / "py"
-    engine = TemplateEngine(template_dir)
-    toml_values = {}
-    cmd._generate_test_sample(engine, project, "testapp", Language.PYTHON, toml_values)
-    test_file = project.tests_dir / "test_sample.py"
-    assert test_file.exists() or not engine.template_exists("test_sample.py.j2")
+    app_dir = tmp_path / "testapp"
+    _apply_planned(cmd, app_dir, lambda job: job.label == "sample test")
+    test_file = ProjectStructure(app_dir, discover=False).tests_dir / "test_sample.py"
+    assert test_file.exists()
 
 
 def test_create_service(tmp_path):
     config = Config()
     cmd = NewCommand(config)
     app_dir = tmp_path / "testapp"
-    app_dir.mkdir()
-    cmd._create_service(app_dir, "testapp")
+    _apply_planned(cmd, app_dir, lambda job: job.path.name == "service.py")
     service_file = app_dir / "service.py"
     assert service_file.exists()
     content = service_file.read_text()
@@ -224,10 +223,9 @@ def test_create_service(tmp_path):
 def test_create_run_script(tmp_path):
     config = Config()
     cmd = NewCommand(config)
-    scripts_dir = tmp_path / "scripts"
-    scripts_dir.mkdir()
-    cmd._create_run_script(scripts_dir)
-    script_file = scripts_dir / "run_engine.sh"
+    app_dir = tmp_path / "testapp"
+    _apply_planned(cmd, app_dir, lambda job: job.path.name == "run_engine.sh")
+    script_file = app_dir / "scripts" / "run_engine.sh"
     assert script_file.exists()
     content = script_file.read_text()
     assert "Starting Restack engine" in content
@@ -311,12 +309,9 @@ def test_create_readme_fallback(tmp_path, monkeypatch):
     config = Config()
     cmd = NewCommand(config)
     app_dir = tmp_path / "testapp"
-    app_dir.mkdir()
     # Mock engine.template_exists to return False
-    from restack_gen.core.templates import TemplateEngine
-
     monkeypatch.setattr(TemplateEngine, "template_exists", lambda self, name: False)
-    cmd._create_readme(app_dir, "testapp")
+    _apply_planned(cmd, app_dir, lambda job: job.path.name == "README.md")
     readme_path = app_dir / "README.md"
     assert readme_path.exists()
     content = readme_path.read_text()
@@ -324,59 +319,28 @@ def test_create_readme_fallback(tmp_path, monkeypatch):
     assert "Generated by restack-gen" in content
 
 
-def test_generate_samples_exception_handling(tmp_path, monkeypatch):
+def test_generate_samples_exception_handling(tmp_path, monkeypatch, capsys):
     config = Config()
     cmd = NewCommand(config)
-    from restack_gen.core.project import ProjectStructure
-    from restack_gen.core.templates import TemplateEngine
-
-    project = ProjectStructure(tmp_path / "testapp")
-    project.ensure_structure()
-    templates_root = Path(__file__).parent.parent / "templates"
-    template_dir = templates_root / "py"
-    engine = TemplateEngine(template_dir)
-    toml_values = {}
-    # Mock engine.render to raise exception
-    monkeypatch.setattr(
-        TemplateEngine,
-        "render",
-        lambda self, template, context: (_ for _ in ()).throw(
-            Exception("render error")
-        ),
-    )
+    _fail_rendering(monkeypatch)
     # Should not raise, just log warning
-    cmd._generate_samples(engine, project, "testapp", Language.PYTHON, toml_values)
+    _apply_planned(cmd, tmp_path / "testapp", _is_sample)
+    assert "Could not generate sample agent: render error" in capsys.readouterr().out
 
 
-def test_generate_test_sample_exception_handling(tmp_path, monkeypatch):
+def test_generate_test_sample_exception_handling(tmp_path, monkeypatch, capsys):
     config = Config()
     cmd = NewCommand(config)
-    from restack_gen.core.project import ProjectStructure
-    from restack_gen.core.templates import TemplateEngine
-
-    project = ProjectStructure(tmp_path / "testapp")
-    project.ensure_structure()
-    templates_root = Path(__file__).parent.parent / "templates"
-    template_dir = templates_root / "py"
-    engine = TemplateEngine(template_dir)
-    toml_values = {}
-    # Mock engine.render to raise exception
-    monkeypatch.setattr(
-        TemplateEngine,
-        "render",
-        lambda self, template, context: (_ for _ in ()).throw(
-            Exception("render error")
-        ),
-    )
+    _fail_rendering(monkeypatch)
     # Should not raise, just log warning
-    cmd._generate_test_sample(engine, project, "testapp", Language.PYTHON, toml_values)
+    _apply_planned(cmd, tmp_path / "testapp", lambda job: job.label == "sample test")
+    assert "Could not generate sample test: render error" in capsys.readouterr().out
 
 
 def test_create_run_script_chmod_exception(tmp_path, monkeypatch):
     config = Config()
     cmd = NewCommand(config)
-    scripts_dir = tmp_path / "scripts"
-    scripts_dir.mkdir()
+    app_dir = tmp_path / "testapp"
     # Mock chmod to raise exception
     monkeypatch.setattr(
         Path,
@@ -384,8 +348,8 @@ def test_create_run_script_chmod_exception(tmp_path, monkeypatch):
         lambda self, mode: (_ for _ in ()).throw(Exception("chmod error")),
     )
     # Should not raise
-    cmd._create_run_script(scripts_dir)
-    script_file = scripts_dir / "run_engine.sh"
+    _apply_planned(cmd, app_dir, lambda job: job.path.name == "run_engine.sh")
+    script_file = app_dir / "scripts" / "run_engine.sh"
     assert script_file.exists()
 
 
@@ -406,3 +370,19 @@ def test_execute_cleanup_on_error(monkeypatch, tmp_path):
     # Check that directory was cleaned up
     app_dir = tmp_path / "myapp"
     assert not app_dir.exists()
+
+
+def test_new_records_language_for_generate(tmp_path):
+    cmd = NewCommand(Config(cwd=tmp_path, lang=Language.TYPESCRIPT, quiet=True))
+    assert cmd.execute(["tsapp"]) == 0
+    root = tmp_path / "tsapp"
+    assert 'lang = "ts"' in (root / "restack.toml").read_text()
+    # Only [project] in restack.toml: no render settings are derived from it
+    assert cmd._extract_toml_values({"project": {"lang": "ts"}}) == {}
+
+    gen = GenerateCommand(Config(cwd=root / "src", quiet=True))
+    with patch("restack_gen.commands.generate.scan_language") as scan:
+        assert gen._detect_language(ProjectStructure(root / "src")) == (
+            Language.TYPESCRIPT
+        )
+    scan.assert_not_called()
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+from restack_gen.core import pipeline as pipeline_mod
+from restack_gen.core.pipeline import FileJob, GenerationPipeline
+from restack_gen.core.templates import TemplateEngine
+
+
+def _engine(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "hello.txt").write_text("Hello {{ name }}")
+    (templates_dir / "bad.txt").write_text("{{ 1 // 0 }}")
+    return TemplateEngine(templates_dir)
+
+
+def test_pipeline_renders_and_writes_in_order(tmp_path):
+    engine = _engine(tmp_path)
+    out = tmp_path / "out"
+    jobs = [
+        FileJob(out / "a" / "one.txt", "hello.txt", {"name": "a"}, engine=engine),
+        FileJob(out / "two.txt", content="literal"),
+        FileJob(out / "run.sh", content="#!/bin/sh\n", mode=0o755),
+    ]
+    timings = GenerationPipeline(max_in_flight=2).run(jobs)
+    assert [t.job for t in timings] == jobs
+    assert all(t.ok for t in timings)
+    assert (out / "a" / "one.txt").read_text() == "Hello a"
+    assert (out / "two.txt").read_text() == "literal"
+    assert timings[0].bytes_written == len("Hello a")
+    assert timings[0].render_seconds >= 0 and timings[0].write_seconds >= 0
+    assert os.access(out / "run.sh", os.X_OK)
+
+
+def test_pipeline_records_errors_per_file(tmp_path):
+    engine = _engine(tmp_path)
+    jobs = [
+        FileJob(tmp_path / "bad.txt", "bad.txt", engine=engine),
+        FileJob(tmp_path / "good.txt", content="ok"),
+    ]
+    bad, good = GenerationPipeline().run(jobs)
+    assert isinstance(bad.error, ZeroDivisionError)
+    assert not (tmp_path / "bad.txt").exists()
+    assert good.ok and (tmp_path / "good.txt").read_text() == "ok"
+
+
+def test_pipeline_overlaps_writes(tmp_path, monkeypatch):
+    original = pipeline_mod._write
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_write(job, content, create_dirs):
+        with lock:
+            active.append(job)
+            peak.append(len(active))
+        time.sleep(0.05)
+        try:
+            return original(job, content, create_dirs)
+        finally:
+            with lock:
+                active.remove(job)
+
+    monkeypatch.setattr(pipeline_mod, "_write", slow_write)
+    jobs = [FileJob(tmp_path / f"{i}.txt", content=str(i)) for i in range(6)]
+    timings = GenerationPipeline(max_in_flight=3).run(jobs)
+    assert all(t.ok for t in timings)
+    assert 1 < max(peak) <= 3
+
+
+def test_pipeline_reports_skipped_writes(tmp_path):
+    jobs = [FileJob(tmp_path / "same.txt", content="x")]
+    assert not GenerationPipeline().run(jobs)[0].skipped
+    (timing,) = GenerationPipeline().run(jobs)
+    assert timing.ok and timing.skipped and timing.bytes_written == 0
+
+
+def test_pipeline_streams_templates_to_disk(tmp_path):
+    import hashlib
+
+    engine = _engine(tmp_path)
+
+    def no_whole_render(*args):
+        raise AssertionError("rendered to a string")
+
+    engine.render = no_whole_render
+    job = FileJob(tmp_path / "out" / "a.txt", "hello.txt", {"name": "a"}, engine=engine)
+    (timing,) = GenerationPipeline().run([job])
+    assert timing.ok and (tmp_path / "out" / "a.txt").read_text() == "Hello a"
+    assert timing.sha256 == hashlib.sha256(b"Hello a").hexdigest()
+    (again,) = GenerationPipeline().run([job])
+    assert again.skipped and again.sha256 == timing.sha256
+    assert [p.name for p in (tmp_path / "out").iterdir()] == ["a.txt"]
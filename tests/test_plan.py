@@ -0,0 +1,98 @@
+import hashlib
+
+import pytest
+
+from restack_gen.commands.new import NewCommand
+from restack_gen.constants import Config
+from restack_gen.core.pipeline import FileJob
+from restack_gen.core.plan import GenerationPlan
+from restack_gen.core.templates import TemplateEngine
+
+
+def _engine(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "hello.txt").write_text("Hello {{ name }}")
+    (templates_dir / "bad.txt").write_text("{{ 1 // 0 }}")
+    return TemplateEngine(templates_dir)
+
+
+def test_plan_renders_size_and_hash_without_touching_disk(tmp_path):
+    engine = _engine(tmp_path)
+    root = tmp_path / "app"
+    plan = GenerationPlan(
+        root,
+        [root / "src"],
+        [FileJob(root / "a" / "x.txt", "hello.txt", {"name": "a"}, engine=engine)],
+    ).render()
+    (planned,) = plan.files
+    assert planned.size == len("Hello a")
+    assert planned.sha256 == hashlib.sha256(b"Hello a").hexdigest()
+    assert plan.directories == [root, root / "a", root / "src"]
+    lines = plan.describe()
+    assert "Would create directory: src/" in lines
+    assert any(line.startswith("Would write a/x.txt (7 B") for line in lines)
+    assert not root.exists()
+
+
+def test_plan_execute_writes_batch(tmp_path):
+    engine = _engine(tmp_path)
+    root = tmp_path / "app"
+    plan = GenerationPlan(root, [root / "empty"])
+    plan.add(FileJob(root / "b" / "2.txt", content="two"))
+    plan.add(FileJob(root / "a" / "1.txt", "hello.txt", {"name": "1"}, engine=engine))
+    plan.add(FileJob(root / "c.txt", "bad.txt", engine=engine, optional=True))
+    timings = plan.execute()
+    assert [t.job.path.name for t in timings] == ["2.txt", "1.txt", "c.txt"]
+    assert (root / "a" / "1.txt").read_text() == "Hello 1"
+    assert (root / "empty").is_dir()
+    assert isinstance(timings[2].error, ZeroDivisionError)
+    assert not (root / "c.txt").exists()
+
+
+def test_plan_validation_fails_before_writing(tmp_path):
+    engine = _engine(tmp_path)
+    root = tmp_path / "app"
+    plan = GenerationPlan(root)
+    plan.add(FileJob(root / "ok.txt", content="ok"))
+    plan.add(FileJob(root / "ok.txt", content="again"))
+    plan.add(FileJob(tmp_path / "outside.txt", content="x"))
+    plan.add(FileJob(root / "gone.txt", "missing.txt", engine=engine))
+    problems = plan.validate()
+    assert len(problems) == 3
+    assert problems[-1] == "Template not found for gone.txt: missing.txt"
+    with pytest.raises(ValueError):
+        plan.execute()
+    assert not root.exists()
+
+
+def test_plan_execute_streams_without_rendering_ahead(tmp_path):
+    engine = _engine(tmp_path)
+
+    def no_whole_render(*args):
+        raise AssertionError("rendered to a string")
+
+    engine.render = no_whole_render
+    root = tmp_path / "app"
+    plan = GenerationPlan(root)
+    plan.add(FileJob(root / "x.txt", "hello.txt", {"name": "x"}, engine=engine))
+    plan.add(FileJob(root / "bad.txt", "bad.txt", engine=engine))
+    assert plan.validate() == []
+    good, bad = plan.execute()
+    assert good.ok and (root / "x.txt").read_text() == "Hello x"
+    assert plan.files[0].content is None
+    assert plan.files[0].sha256 == hashlib.sha256(b"Hello x").hexdigest()
+    assert isinstance(bad.error, ZeroDivisionError)
+    assert plan.files[1].error is bad.error and not (root / "bad.txt").exists()
+
+
+def test_new_dry_run_prints_real_plan(tmp_path, capsys):
+    config = Config()
+    config.dry_run = True
+    cmd = NewCommand(config)
+    cmd._show_dry_run(tmp_path / "myapp")
+    out = capsys.readouterr().out
+    assert "Would write myapp/README.md" in out
+    assert "Would write myapp/service.py" in out
+    assert "sha256" in out
+    assert not (tmp_path / "myapp").exists()
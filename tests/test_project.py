@@ -1,4 +1,13 @@
-from restack_gen.core.project import ProjectStructure
+from restack_gen.constants import Language
+from restack_gen.core.lockfile import LOCKFILE_NAME
+from restack_gen.core import project as project_module
+from restack_gen.core.project import (
+    ProjectStructure,
+    find_project_root,
+    project_table,
+    recorded_language,
+    scan_language,
+)
 from pathlib import Path
 
 
@@ -47,3 +56,69 @@ def test_project_structure_ensure_structure(tmp_path):
     assert (tmp_path / "src" / "workflows").exists()
     assert (tmp_path / "tests").exists()
     assert (tmp_path / "scripts").exists()
+
+
+def test_recorded_language_prefers_restack_toml(tmp_path):
+    assert recorded_language(tmp_path) is None
+    (tmp_path / LOCKFILE_NAME).write_text('{"lang": "ts"}')
+    assert recorded_language(tmp_path) == Language.TYPESCRIPT
+    (tmp_path / "restack.toml").write_text(project_table(Language.PYTHON))
+    assert recorded_language(tmp_path) == Language.PYTHON
+    (tmp_path / "restack.toml").write_text('[project]\nlang = "cobol"\n')
+    assert recorded_language(tmp_path) is None
+
+
+def test_scan_language_skips_vendored_trees(tmp_path):
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "index.ts").write_text("")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "site.py").write_text("")
+    assert scan_language(tmp_path) is None
+    (tmp_path / "agents").mkdir()
+    (tmp_path / "agents" / "a.py").write_text("")
+    assert scan_language(tmp_path) == Language.PYTHON
+
+
+def test_scan_language_is_bounded(tmp_path):
+    for i in range(20):
+        (tmp_path / f"note{i}.md").write_text("")
+    (tmp_path / "zz").mkdir()
+    (tmp_path / "zz" / "a.ts").write_text("")
+    assert scan_language(tmp_path, limit=10) is None
+    assert scan_language(tmp_path) == Language.TYPESCRIPT
+
+
+def test_find_project_root_is_cached_until_a_directory_changes(tmp_path, monkeypatch):
+    (tmp_path / "restack.toml").write_text("")
+    start = tmp_path / "src" / "agents"
+    start.mkdir(parents=True)
+    walks = []
+    walk = project_module._walk_to_root
+    monkeypatch.setattr(
+        project_module, "_walk_to_root", lambda s: walks.append(s) or walk(s)
+    )
+    assert find_project_root(start) == tmp_path
+    assert find_project_root(start) == tmp_path
+    assert len(walks) == 1
+    (start / "restack.toml").write_text("")
+    assert find_project_root(start) == start
+    assert len(walks) == 2
+
+
+def test_find_project_root_stops_at_repository_boundary(tmp_path):
+    (tmp_path / "restack.toml").write_text("")
+    repo = tmp_path / "repo"
+    (repo / ".git").mkdir(parents=True)
+    start = repo / "pkg"
+    start.mkdir()
+    assert find_project_root(start) == start
+    (repo / "restack.toml").write_text("")
+    assert find_project_root(start) == repo
+
+
+def test_find_project_root_override(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESTACK_PROJECT_ROOT", str(tmp_path / "elsewhere"))
+    assert find_project_root(tmp_path) == tmp_path / "elsewhere"
+    assert ProjectStructure(tmp_path).root == tmp_path / "elsewhere"
+    # An explicit, undiscovered root ignores it
+    assert ProjectStructure(tmp_path, discover=False).root == tmp_path
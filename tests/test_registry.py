@@ -0,0 +1,144 @@
+from restack_gen.commands.generate import GenerateCommand
+from restack_gen.constants import Config, Language
+from restack_gen.core.registry import (
+    Registration,
+    component_symbol,
+    register_components,
+)
+
+SERVICE = """from restack_ai import Restack
+from src.agents.demo import Demo  # main agent
+
+client = Restack()
+
+async def main():
+    await client.start_service(
+        agents=[
+            Demo,
+        ],
+        workflows=[],
+        task_queue="restack",
+    )
+"""
+
+
+def _registrations():
+    return [
+        Registration("agent", "src/agents/billing.py", "Billing"),
+        Registration("workflow", "src/workflows/onboarding.py", "OnboardingWorkflow"),
+        Registration("function", "src/functions/send_email.py", "send_email_function"),
+    ]
+
+
+def test_register_python_preserves_layout(tmp_path):
+    (tmp_path / "service.py").write_text(SERVICE)
+    update = register_components(tmp_path, Language.PYTHON, _registrations())
+    assert len(update.added) == 3 and not update.problems
+    assert (tmp_path / "service.py").read_text() == (
+        "from restack_ai import Restack\n"
+        "from src.agents.demo import Demo  # main agent\n"
+        "from src.agents.billing import Billing\n"
+        "from src.workflows.onboarding import OnboardingWorkflow\n"
+        "from src.functions.send_email import send_email_function\n"
+        "\n"
+        "client = Restack()\n"
+        "\n"
+        "async def main():\n"
+        "    await client.start_service(\n"
+        "        agents=[\n"
+        "            Demo,\n"
+        "            Billing,\n"
+        "        ],\n"
+        "        workflows=[OnboardingWorkflow],\n"
+        "        functions=[send_email_function],\n"
+        '        task_queue="restack",\n'
+        "    )\n"
+    )
+
+
+def test_register_python_is_idempotent(tmp_path):
+    (tmp_path / "service.py").write_text(SERVICE)
+    register_components(tmp_path, Language.PYTHON, _registrations())
+    once = (tmp_path / "service.py").read_text()
+    update = register_components(tmp_path, Language.PYTHON, _registrations())
+    assert update.added == []
+    assert (tmp_path / "service.py").read_text() == once
+
+
+def test_register_python_follows_list_variables(tmp_path):
+    (tmp_path / "service.py").write_text(
+        "AGENTS = [Demo]\n"
+        "client.start_service(agents=AGENTS, functions=load_functions())\n"
+    )
+    update = register_components(tmp_path, Language.PYTHON, _registrations()[::2])
+    assert update.problems == [
+        "functions= is not a list literal; register send_email_function by hand"
+    ]
+    assert (tmp_path / "service.py").read_text() == (
+        "from src.agents.billing import Billing\n"
+        "AGENTS = [Demo, Billing]\n"
+        "client.start_service(agents=AGENTS, functions=load_functions())\n"
+    )
+
+
+def test_register_python_without_service_is_a_no_op(tmp_path):
+    update = register_components(tmp_path, Language.PYTHON, _registrations())
+    assert update.added == [] and update.problems == []
+    assert not (tmp_path / "service.py").exists()
+
+
+def test_register_typescript_creates_and_extends_routes(tmp_path):
+    first = [Registration("agent", "src/agents/billing.ts", "createBilling", "billing")]
+    update = register_components(tmp_path, Language.TYPESCRIPT, first)
+    assert update.created
+    routes = tmp_path / "src" / "routes.ts"
+    routes.write_text(routes.read_text().replace('"', "'").replace(";", ""))
+    register_components(
+        tmp_path,
+        Language.TYPESCRIPT,
+        [
+            Registration("agent", "src/agents/sales.ts", "createSales", "sales"),
+            Registration("function", "src/functions/notify.ts", "notify", "notify"),
+        ],
+    )
+    assert routes.read_text() == (
+        "/* Registry listing for `restack-gen routes` */\n"
+        "import { createBilling } from './agents/billing'\n"
+        "import { createSales } from './agents/sales'\n"
+        "import { notify } from './functions/notify'\n"
+        "\n"
+        "export const agents = {\n"
+        "  'Billing': createBilling,\n"
+        "  'Sales': createSales,\n"
+        "}\n"
+        "\n"
+        "export const functions = {\n"
+        "  'notify': notify,\n"
+        "}\n"
+    )
+
+
+def test_component_symbol():
+    source = "class Input:\n    pass\n@workflow.defn()\nclass FlowWorkflow:\n    pass\n"
+    assert component_symbol("x.py", "workflow", source) == "FlowWorkflow"
+    assert component_symbol("x.py", "agent", source) is None
+    ts = "export interface In {}\nexport async function runFlow() {}\n"
+    assert component_symbol("x.ts", "workflow", ts) == "runFlow"
+
+
+def test_generate_registers_batch_in_service(tmp_path, capsys):
+    (tmp_path / "service.py").write_text(SERVICE)
+    cmd = GenerateCommand(Config(cwd=tmp_path, lang=Language.PYTHON))
+    assert cmd.execute(["agent", "Billing", "Sales", "function", "send_email"]) == 0
+    assert "Registered Billing, Sales, send_email_function" in capsys.readouterr().out
+    service = (tmp_path / "service.py").read_text()
+    assert "from src.agents.sales import Sales\n" in service
+    assert "functions=[send_email_function]" in service
+
+
+def test_generate_dry_run_leaves_service_alone(tmp_path, capsys):
+    (tmp_path / "service.py").write_text(SERVICE)
+    cmd = GenerateCommand(Config(cwd=tmp_path, lang=Language.PYTHON, dry_run=True))
+    assert cmd.execute(["workflow", "Onboarding"]) == 0
+    assert "Would register OnboardingWorkflow in service.py" in capsys.readouterr().out
+    assert (tmp_path / "service.py").read_text() == SERVICE
@@ -0,0 +1,125 @@
+import datetime
+
+from restack_gen.core.render_cache import RenderCache
+from restack_gen.core.templates import TemplateEngine
+
+
+def _engine(tmp_path, templates, cache=None):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    for name, source in templates.items():
+        (templates_dir / name).write_text(source)
+    return TemplateEngine(
+        templates_dir, auto_reload=False, render_cache=cache or RenderCache()
+    )
+
+
+def test_unreferenced_context_does_not_defeat_cache(tmp_path):
+    engine = _engine(tmp_path, {"f.txt": "def {{ snake_name }}(): pass"})
+    cache = engine.render_cache
+    assert engine.render("f.txt", {"snake_name": "x", "app_name": "a"}) == (
+        "def x(): pass"
+    )
+    assert engine.render("f.txt", {"snake_name": "x", "app_name": "b"}) == (
+        "def x(): pass"
+    )
+    assert engine.render("f.txt", {"snake_name": "y", "app_name": "b"}) == (
+        "def y(): pass"
+    )
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_volatile_values_are_filled_in_on_hit(tmp_path):
+    engine = _engine(
+        tmp_path,
+        {"r.md": "# {{ name }} ({{ timestamp }}) {{ now().strftime('%Y') }}"},
+    )
+    cache = engine.render_cache
+    engine.render("r.md", {"name": "a", "timestamp": "T1"})
+    result = engine.render("r.md", {"name": "a", "timestamp": "T2"})
+    assert result == f"# a (T2) {datetime.datetime.now():%Y}"
+    assert cache.hits == 1
+
+
+def test_transformed_volatile_value_is_not_cached(tmp_path):
+    engine = _engine(tmp_path, {"r.md": "{{ timestamp[:2] }}"})
+    cache = engine.render_cache
+    assert engine.render("r.md", {"timestamp": "abcd"}) == "ab"
+    assert engine.render("r.md", {"timestamp": "wxyz"}) == "wx"
+    assert cache.hits == 0
+    assert cache.uncacheable == 2
+
+
+def test_template_edit_changes_key(tmp_path):
+    engine = _engine(tmp_path, {"f.txt": "v1 {{ name }}"})
+    cache = engine.render_cache
+    engine.render("f.txt", {"name": "a"})
+    (tmp_path / "templates" / "f.txt").write_text("v2 {{ name }}")
+    fresh = TemplateEngine(
+        tmp_path / "templates", auto_reload=False, render_cache=cache
+    )
+    assert fresh.render("f.txt", {"name": "a"}) == "v2 a"
+    assert cache.hits == 0
+
+
+def test_lru_eviction(tmp_path):
+    engine = _engine(tmp_path, {"f.txt": "{{ name }}"}, RenderCache(max_entries=2))
+    for name in ("a", "b", "c"):
+        engine.render("f.txt", {"name": name})
+    assert engine.render_cache.stats()["entries"] == 2
+    engine.render("f.txt", {"name": "a"})
+    assert engine.render_cache.hits == 0
+
+
+def test_disk_tier_shared_between_caches(tmp_path):
+    directory = tmp_path / "renders"
+    engine = _engine(tmp_path, {"f.txt": "{{ name }} {{ date }}"})
+    engine.render_cache = RenderCache(directory=directory)
+    engine.render("f.txt", {"name": "a", "date": "d1"})
+    other = RenderCache(directory=directory)
+    engine.render_cache = other
+    assert engine.render("f.txt", {"name": "a", "date": "d2"}) == "a d2"
+    assert other.hits == 1
+    assert other.clear() == 1
+    assert other.stats()["disk_entries"] == 0
+
+
+def test_render_to_uses_cache(tmp_path):
+    engine = _engine(tmp_path, {"f.txt": "{{ name }}"})
+    engine.render_to(tmp_path / "a.txt", "f.txt", {"name": "x"})
+    result = engine.render_to(tmp_path / "b.txt", "f.txt", {"name": "x"})
+    assert (tmp_path / "b.txt").read_text() == "x"
+    assert result.bytes_written == 1
+    assert engine.render_cache.hits == 1
+
+
+def test_render_to_streams_large_and_uncacheable_templates(tmp_path, monkeypatch):
+    engine = _engine(
+        tmp_path,
+        {"big.txt": "{{ name }}" + "x" * 64, "r.md": "{{ timestamp[:2] }}"},
+        RenderCache(max_entry_size=32),
+    )
+    rendered = []
+    monkeypatch.setattr(
+        engine.render_cache, "render", lambda *a: rendered.append(a) or ""
+    )
+    engine.render_to(tmp_path / "big", "big.txt", {"name": "a"})
+    assert (tmp_path / "big").read_text() == "a" + "x" * 64
+    assert rendered == []
+    monkeypatch.undo()
+
+    engine.render_to(tmp_path / "r1", "r.md", {"timestamp": "abcd"})
+    assert engine.render_cache.bypasses(engine, "r.md")
+    engine.render_to(tmp_path / "r2", "r.md", {"timestamp": "wxyz"})
+    assert (tmp_path / "r2").read_text() == "wx"
+    assert engine.render_cache.uncacheable == 1
+
+
+def test_large_outputs_are_not_kept(tmp_path):
+    engine = _engine(
+        tmp_path, {"loop.txt": "{% for i in range(n) %}.{% endfor %}"}, RenderCache()
+    )
+    engine.render_cache.max_entry_size = 10
+    assert engine.render("loop.txt", {"n": 20}) == "." * 20
+    assert engine.render_cache.stats()["entries"] == 0
+    assert engine.render_cache.bypasses(engine, "loop.txt")
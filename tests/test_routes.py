@@ -1,5 +1,10 @@
+import json
+
 from restack_gen.commands.routes import RoutesCommand
 from restack_gen.constants import Config
+from restack_gen.core import routes
+from restack_gen.core.index import ComponentIndex
+from restack_gen.core.routes import RouteTable
 
 
 def test_routes_command_empty(tmp_path, capsys):
@@ -9,3 +14,133 @@ def test_routes_command_empty(tmp_path, capsys):
     cmd.execute([])
     out = capsys.readouterr().out
     assert "No routes found" in out
+
+
+def _write(root, files):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+PY_PROJECT = {
+    "service.py": (
+        "from src.agents.billing import Billing\n"
+        "from src.workflows import onboarding as flows\n"
+        "from src.functions.email import send_email\n"
+        "AGENTS = [Billing]\n"
+        "async def main():\n"
+        "    await client.start_service(\n"
+        "        agents=AGENTS,\n"
+        "        workflows=[flows.Onboarding],\n"
+        "        functions=[send_email, *EXTRA] + [missing],\n"
+        "    )\n"
+    ),
+    "src/agents/billing.py": "\n@agent.defn()\nclass Billing:\n    pass\n",
+    "src/workflows/onboarding.py": "@workflow.defn()\nclass Onboarding:\n    pass\n",
+    "src/functions/__init__.py": "from .impl import send_email\n",
+    "src/functions/email.py": "from .impl import send_email\n",
+    "src/functions/impl.py": (
+        "@function.defn()\nasync def send_email():\n    pass\n\n"
+        "@function.defn()\nasync def unused():\n    pass\n"
+    ),
+}
+
+
+def test_parse_python_registrations_through_assigns():
+    facts = routes.parse_python(PY_PROJECT["service.py"])
+    assert facts.registrations["agent"] == [["Billing", "Billing"]]
+    assert facts.registrations["workflow"] == [["flows.Onboarding", "flows.Onboarding"]]
+    assert [n for n, _ in facts.registrations["function"]] == ["send_email", "missing"]
+    assert facts.imports["flows"] == ["src.workflows", "onboarding"]
+
+
+def test_parse_python_syntax_error():
+    assert routes.parse_python("def (:\n").error.startswith("line 1")
+
+
+def test_parse_typescript_registry():
+    facts = routes.parse_typescript(
+        "import { billingAgent as billing } from './agents/billing';\n"
+        "import * as flows from './workflows';\n"
+        "// export const agents = { ignored };\n"
+        "export const agents = { billing, 'other': billing };\n"
+        "export const workflows = [flows.onboarding];\n"
+    )
+    assert facts.imports["billing"] == ["./agents/billing", "billingAgent"]
+    assert facts.imports["flows"] == ["./workflows", "*"]
+    assert facts.registrations["agent"] == [
+        ["billing", "billing"],
+        ["other", "billing"],
+    ]
+    assert facts.registrations["workflow"] == [["flows.onboarding"] * 2]
+
+
+def test_route_table_resolves_python_definitions(tmp_path):
+    _write(tmp_path, PY_PROJECT)
+    table = RouteTable(tmp_path).build(ComponentIndex.load(tmp_path).entries)
+    found = {r.name: (r.source, r.line) for r in table.routes}
+    assert found["Billing"] == ("src/agents/billing.py", 3)
+    assert found["send_email"] == ("src/functions/impl.py", 2)
+    assert found["missing"] == (None, None)
+    assert [(r.name, r.source) for r in table.unregistered] == [
+        ("unused", "src/functions/impl.py")
+    ]
+
+
+def test_route_table_resolves_typescript_definitions(tmp_path):
+    _write(
+        tmp_path,
+        {
+            "src/routes.ts": (
+                "import { billingAgent } from './agents/billing';\n"
+                "export const agents = { billing: billingAgent };\n"
+            ),
+            "src/agents/billing.ts": "\nexport async function billingAgent() {}\n",
+        },
+    )
+    table = RouteTable(tmp_path).build()
+    assert table.registries == ["src/routes.ts"]
+    assert [(r.name, r.source, r.line) for r in table.routes] == [
+        ("billing", "src/agents/billing.ts", 2)
+    ]
+
+
+def test_route_table_caches_parsed_files(tmp_path):
+    _write(tmp_path, PY_PROJECT)
+    first = RouteTable(tmp_path).build()
+    first.save_cache()
+    assert first.parsed == 5
+    assert RouteTable(tmp_path).build().parsed == 0
+    impl = tmp_path / "src/functions/impl.py"
+    impl.write_text(impl.read_text() + "\n")
+    assert RouteTable(tmp_path).build().parsed == 1
+
+
+def test_route_table_ignores_stale_index_stats(tmp_path):
+    _write(tmp_path, PY_PROJECT)
+    RouteTable(tmp_path).build(ComponentIndex.load(tmp_path).entries).save_cache()
+    billing = tmp_path / "src/agents/billing.py"
+    billing.write_text("\n\n\n" + PY_PROJECT["src/agents/billing.py"])
+    stale = ComponentIndex.load(tmp_path, refresh=False).entries
+    table = RouteTable(tmp_path).build(stale)
+    assert table.parsed == 1
+    assert [r.line for r in table.routes if r.name == "Billing"] == [6]
+
+
+def test_routes_command_json(tmp_path, capsys):
+    _write(tmp_path, PY_PROJECT)
+    assert RoutesCommand(Config(cwd=tmp_path, json_output=True)).execute([]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["registries"] == ["service.py"]
+    assert data["routes"]["agents"] == [
+        {"name": "Billing", "source": "src/agents/billing.py", "line": 3}
+    ]
+    assert data["unregistered"][0]["name"] == "unused"
+
+
+def test_routes_command_dry_run_writes_nothing(tmp_path, capsys):
+    _write(tmp_path, PY_PROJECT)
+    assert RoutesCommand(Config(cwd=tmp_path, dry_run=True)).execute([]) == 0
+    assert "(definition not found)" in capsys.readouterr().out
+    assert not (tmp_path / routes.CACHE_PATH).exists()
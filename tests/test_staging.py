@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from restack_gen.core import staging
+from restack_gen.core.staging import (
+    STAGE_SUFFIX,
+    TRASH_DIRNAME,
+    StagedDirectory,
+    StagingConflict,
+    reclaim,
+)
+
+
+def test_publish_moves_stage_into_place(tmp_path):
+    target = tmp_path / "app"
+    with StagedDirectory(target) as stage:
+        (stage.path / "file.txt").write_text("x")
+        assert not target.exists()
+        stage.publish()
+    assert (target / "file.txt").read_text() == "x"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name != TRASH_DIRNAME) == [
+        "app"
+    ]
+
+
+def test_failure_moves_stage_to_trash(tmp_path):
+    target = tmp_path / "app"
+    with pytest.raises(RuntimeError):
+        with StagedDirectory(target) as stage:
+            (stage.path / "file.txt").write_text("x")
+            raise RuntimeError("boom")
+    assert not target.exists()
+    assert not stage.path.exists()
+    reclaim(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_creator_fails_fast(tmp_path):
+    target = tmp_path / "app"
+    with StagedDirectory(target):
+        with pytest.raises(StagingConflict):
+            with StagedDirectory(target):
+                pass
+    # Lock is released afterwards
+    with StagedDirectory(target) as stage:
+        stage.publish()
+
+
+def test_existing_target_is_rejected(tmp_path):
+    (tmp_path / "app").mkdir()
+    with pytest.raises(StagingConflict):
+        with StagedDirectory(tmp_path / "app"):
+            pass
+
+
+def test_reclaim_removes_leftovers_of_dead_processes(tmp_path, monkeypatch):
+    dead = tmp_path / f".app.999999.abcd{STAGE_SUFFIX}"
+    dead.mkdir()
+    (dead / "half.txt").write_text("x")
+    lock = tmp_path / f".app{staging.LOCK_SUFFIX}"
+    lock.write_text("999999")
+    live = tmp_path / f".other.{os.getpid()}.abcd{STAGE_SUFFIX}"
+    live.mkdir()
+    monkeypatch.setattr(staging, "_pid_alive", lambda pid: pid == os.getpid())
+    assert reclaim(tmp_path) == 2
+    assert not dead.exists() and not lock.exists()
+    assert live.exists()
+    # A stale lock does not block a new creator
+    lock.write_text("999999")
+    with StagedDirectory(tmp_path / "app") as stage:
+        stage.publish()
@@ -101,3 +101,51 @@ def test_validator_empty_name():
     valid, msg = Validator.validate_name("")
     assert not valid
     assert "empty" in msg.lower()
+
+
+# --- CommandRegistry: lazy loading and plugins ---
+def test_command_registry_imports_lazily(tmp_path, monkeypatch):
+    import sys
+
+    monkeypatch.setenv("RESTACK_GEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.delitem(sys.modules, "restack_gen.commands.doctor", raising=False)
+    registry = CommandRegistry(Config())
+    registry.get("version")
+    assert "restack_gen.commands.doctor" not in sys.modules
+    assert registry.get("doctor") is not None
+    assert "restack_gen.commands.doctor" in sys.modules
+
+
+def test_command_registry_loads_plugin_from_manifest(tmp_path, monkeypatch):
+    from restack_gen.commands import plugins
+
+    monkeypatch.setenv("RESTACK_GEN_CACHE_DIR", str(tmp_path))
+    scans = []
+
+    def fake_scan():
+        scans.append(1)
+        return {
+            "hello": "restack_gen.commands.info:VersionCommand",
+            "new": "some_plugin:Shadow",
+        }
+
+    monkeypatch.setattr(plugins, "scan_entry_points", fake_scan)
+    registry = CommandRegistry(Config())
+    assert "hello" in registry._commands
+    assert registry._commands["new"] == "restack_gen.commands.new:NewCommand"
+    assert (tmp_path / "plugins.json").exists()
+    # Second start reads the manifest instead of rescanning
+    CommandRegistry(Config())
+    assert len(scans) == 1
+
+
+def test_command_registry_stale_plugin_returns_none(tmp_path, monkeypatch):
+    from restack_gen.commands import plugins
+
+    monkeypatch.setenv("RESTACK_GEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        plugins, "scan_entry_points", lambda: {"gone": "missing_plugin_mod:Cmd"}
+    )
+    registry = CommandRegistry(Config())
+    assert registry.get("gone") is None
+    assert not (tmp_path / "plugins.json").exists()
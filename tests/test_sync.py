@@ -0,0 +1,134 @@
+import json
+
+from restack_gen.commands.generate import GenerateCommand
+from restack_gen.commands.new import NewCommand
+from restack_gen.commands.sync import SyncCommand
+from restack_gen.constants import Config, GenerationType
+from restack_gen.core.lockfile import LOCKFILE_NAME, GenerationLock
+from restack_gen.core.staging import reclaim
+from restack_gen.utils.files import file_sha256
+
+
+def _new_app(tmp_path, name="app"):
+    assert NewCommand(Config(cwd=tmp_path, quiet=True)).execute([name]) == 0
+    return tmp_path / name
+
+
+def _sync(root, **options):
+    return SyncCommand(Config(cwd=root, **options)).execute([])
+
+
+def test_new_writes_lock_for_rendered_files(tmp_path):
+    root = _new_app(tmp_path)
+    lock = GenerationLock.load(root)
+    assert lock.app_name == "app" and lock.lang == "py"
+    assert "src/agents/app.py" in lock.files
+    assert "README.md" in lock.files
+    # Literal files are not template-driven
+    assert "service.py" not in lock.files
+    entry = lock.files["src/agents/app.py"]
+    assert entry.template == "agent.py.j2"
+    assert entry.output_sha256 == file_sha256(root / "src/agents/app.py")
+
+
+def test_sync_without_changes_touches_nothing(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    before = (root / LOCKFILE_NAME).stat().st_mtime_ns
+    assert _sync(root) == 0
+    assert "0 updated" in capsys.readouterr().out
+    assert (root / LOCKFILE_NAME).stat().st_mtime_ns == before
+
+
+def test_sync_rerenders_on_toml_change_and_skips_edits(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    function = root / "src/functions/llm_chat.py"
+    function.write_text("# mine\n")
+    readme = (root / "README.md").read_text()
+    agent_hash = GenerationLock.load(root).files["src/agents/app.py"].context_hash
+    (root / "restack.toml").write_text("[timeouts]\nstart_to_close = 90\n")
+
+    assert _sync(root) == 0
+    out = capsys.readouterr().out
+    assert "Skipped src/functions/llm_chat.py" in out
+    # Agent, workflow and test sample re-render; their output is unchanged
+    assert "3 updated (3 identical, write skipped)" in out
+    assert function.read_text() == "# mine\n"
+    assert (root / "README.md").read_text() == readme
+    lock = GenerationLock.load(root)
+    assert lock.toml_values["timeouts_start_to_close_seconds"] == 90
+    assert lock.files["src/agents/app.py"].context_hash != agent_hash
+    assert lock.files["src/agents/app.py"].output_sha256 == file_sha256(
+        root / "src/agents/app.py"
+    )
+
+    assert _sync(root, force=True) == 0
+    assert function.read_text() != "# mine\n"
+
+
+def test_sync_rerenders_changed_templates_only(tmp_path):
+    root = _new_app(tmp_path)
+    generated = root / "src/workflows/automated_workflow.py"
+    original = generated.read_text()
+    generated_mtime = generated.stat().st_mtime_ns
+    data = json.loads((root / LOCKFILE_NAME).read_text())
+    data["files"]["README.md"]["template_hash"] = "stale"
+    (root / LOCKFILE_NAME).write_text(json.dumps(data))
+    (root / "README.md").unlink()
+    # Deleted by the user: respected
+    assert _sync(root) == 0
+    assert not (root / "README.md").exists()
+
+    data["files"]["src/workflows/automated_workflow.py"]["template_hash"] = "stale"
+    (root / LOCKFILE_NAME).write_text(json.dumps(data))
+    assert _sync(root, dry_run=True) == 0
+    assert generated.stat().st_mtime_ns == generated_mtime
+    assert _sync(root) == 0
+    assert generated.read_text() == original
+    assert (
+        GenerationLock.load(root)
+        .files["src/workflows/automated_workflow.py"]
+        .template_hash
+        != "stale"
+    )
+
+
+def test_generate_records_component_and_sync_restores_it(tmp_path):
+    root = _new_app(tmp_path)
+    cmd = GenerateCommand(Config(cwd=root, quiet=True))
+    assert cmd._generate(GenerationType.AGENT, "Billing") == 0
+    lock = GenerationLock.load(root)
+    assert lock.files["src/agents/billing.py"].component == "Billing"
+
+    data = json.loads((root / LOCKFILE_NAME).read_text())
+    data["files"]["src/agents/billing.py"]["context_hash"] = "stale"
+    (root / LOCKFILE_NAME).write_text(json.dumps(data))
+    content = (root / "src/agents/billing.py").read_text()
+    assert _sync(root) == 0
+    assert (root / "src/agents/billing.py").read_text() == content
+    assert GenerationLock.load(root).files["src/agents/billing.py"].component == (
+        "Billing"
+    )
+
+
+def test_generate_from_subdirectory_matches_sync(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    cmd = GenerateCommand(Config(cwd=root / "src", quiet=True))
+    assert cmd._generate(GenerationType.AGENT, "Billing") == 0
+    assert cmd._generate(GenerationType.FUNCTION, "lookup") == 0
+    lock = GenerationLock.load(root)
+    assert lock.files["src/agents/billing.py"].app_name == "app"
+    capsys.readouterr()
+    assert _sync(root) == 0
+    assert "0 updated" in capsys.readouterr().out
+
+
+def test_sync_requires_lock(tmp_path, capsys):
+    assert _sync(tmp_path) == 1
+    assert LOCKFILE_NAME in capsys.readouterr().out
+
+
+def test_reclaim_keeps_generation_lock(tmp_path):
+    lock = tmp_path / LOCKFILE_NAME
+    lock.write_text("{}")
+    reclaim(tmp_path)
+    assert lock.exists()
@@ -107,3 +107,174 @@ def test_python_identifier_generation(tmp_path):
     assert f"from {context['snake_app_name']}.module import" in rendered
     # Check that class name is valid
     assert re.search(rf"class {context['pascal_name']}", rendered)
+
+
+def test_template_engine_hit_miss_stats(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.txt").write_text("A {{ x }}")
+    engine = TemplateEngine(templates_dir)
+    engine.render("a.txt", {"x": 1})
+    engine.render("a.txt", {"x": 2})
+    assert engine.stats() == {"templates": 1, "hits": 1, "misses": 1}
+
+
+def test_engine_pool_shares_engines(tmp_path):
+    from restack_gen.core.templates import TemplateEnginePool
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.txt").write_text("A")
+    pool = TemplateEnginePool()
+    engine = pool.get(templates_dir)
+    assert pool.get(templates_dir) is engine
+    engine.render("a.txt", {})
+    engine.render("a.txt", {})
+    stats = pool.stats()
+    assert stats["engines"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_engine_pool_replaces_engine_when_pack_changes(tmp_path):
+    from restack_gen.core.templates import TemplateEnginePool
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.txt").write_text("old")
+    pool = TemplateEnginePool()
+    engine = pool.get(templates_dir)
+    assert engine.render("a.txt", {}) == "old"
+    (templates_dir / "a.txt").write_text("new content")
+    # An in-place edit is seen once the pool is refreshed
+    assert pool.get(templates_dir) is engine
+    pool.refresh()
+    fresh = pool.get(templates_dir)
+    assert fresh is not engine
+    assert fresh.render("a.txt", {}) == "new content"
+    assert pool.stats()["engines"] == 1
+
+
+def test_engine_pool_reuses_fingerprint_until_pack_directory_changes(
+    tmp_path, monkeypatch
+):
+    from restack_gen.core import templates as templates_mod
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.txt").write_text("A")
+    walks = []
+    original = templates_mod._fingerprint_pack
+    monkeypatch.setattr(
+        templates_mod,
+        "_fingerprint_pack",
+        lambda d: walks.append(d) or original(d),
+    )
+    pool = templates_mod.TemplateEnginePool()
+    engine = pool.get(templates_dir)
+    assert pool.get(templates_dir) is engine
+    assert len(walks) == 1
+    (templates_dir / "b.txt").write_text("B")
+    assert pool.get(templates_dir) is not engine
+    assert len(walks) == 2
+
+
+def test_engine_pool_is_thread_safe(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from restack_gen.core.templates import TemplateEnginePool
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.txt").write_text("{{ n }}")
+    pool = TemplateEnginePool()
+
+    def work(n):
+        return pool.get(templates_dir).render("a.txt", {"n": n})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(work, range(64)))
+    assert results == [str(n) for n in range(64)]
+    stats = pool.stats()
+    assert stats["engines"] == 1
+    assert stats["hits"] + stats["misses"] == 64
+
+
+def test_render_to_path_streams_atomically(tmp_path):
+    import hashlib
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "hello.txt").write_text("Hello {{ name }}!")
+    engine = TemplateEngine(templates_dir)
+    out = tmp_path / "out.txt"
+    result = engine.render_to(out, "hello.txt", {"name": "World"})
+    assert out.read_text() == "Hello World!"
+    assert result.path == out
+    assert result.bytes_written == len(b"Hello World!")
+    assert result.sha256 == hashlib.sha256(b"Hello World!").hexdigest()
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_render_to_file_object(tmp_path):
+    import io
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "hello.txt").write_text("Hi {{ name }}")
+    engine = TemplateEngine(templates_dir)
+    text, binary = io.StringIO(), io.BytesIO()
+    assert engine.render_to(text, "hello.txt", {"name": "a"}).path is None
+    engine.render_to(binary, "hello.txt", {"name": "a"})
+    assert text.getvalue() == "Hi a"
+    assert binary.getvalue() == b"Hi a"
+
+
+def test_render_to_leaves_target_untouched_on_error(tmp_path):
+    import pytest
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "bad.txt").write_text("start {{ 1 // 0 }}")
+    engine = TemplateEngine(templates_dir)
+    out = tmp_path / "out.txt"
+    out.write_text("original")
+    with pytest.raises(ZeroDivisionError):
+        engine.render_to(out, "bad.txt", {})
+    assert out.read_text() == "original"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.txt", "templates"]
+
+
+def test_write_if_changed_skips_identical_content(tmp_path):
+    import os
+
+    from restack_gen.utils.files import write_if_changed
+
+    out = tmp_path / "out.txt"
+    assert not write_if_changed(out, "same").skipped
+    os.utime(out, ns=(1, 1))
+    result = write_if_changed(out, "same")
+    assert result.skipped and result.bytes_written == 0
+    assert out.stat().st_mtime_ns == 1
+    # Same size, different content is still written
+    assert not write_if_changed(out, "diff").skipped
+    assert out.read_text() == "diff"
+
+
+def test_atomic_writes_keep_mode_and_follow_symlinks(tmp_path):
+    import os
+    import stat
+
+    from restack_gen.utils.files import write_if_changed
+
+    target = tmp_path / "run.sh"
+    target.write_text("old")
+    target.chmod(0o750)
+    assert not write_if_changed(target, "new").skipped
+    assert stat.S_IMODE(target.stat().st_mode) == 0o750
+
+    link = tmp_path / "link.sh"
+    os.symlink(target.name, link)
+    assert not write_if_changed(link, "via link").skipped
+    assert link.is_symlink()
+    assert target.read_text() == "via link"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o750
@@ -0,0 +1,115 @@
+import hashlib
+
+from restack_gen.commands.new import NewCommand
+from restack_gen.commands.upgrade import UpgradeCommand, find_projects
+from restack_gen.constants import Config
+from restack_gen.core.lockfile import LOCKFILE_NAME, GenerationLock
+from restack_gen.utils.files import file_sha256
+
+WORKFLOW = "src/workflows/automated_workflow.py"
+
+
+def _new_app(tmp_path, name="app"):
+    assert NewCommand(Config(cwd=tmp_path, quiet=True)).execute([name]) == 0
+    return tmp_path / name
+
+
+def _age(root, old_first_line, user_content):
+    """Pretend WORKFLOW came from an older template, then was edited."""
+    path = root / WORKFLOW
+    current = path.read_text()
+    old = old_first_line + current.split("\n", 1)[1]
+    lock = GenerationLock.load(root)
+    data = old.encode()
+    sha = hashlib.sha256(data).hexdigest()
+    lock.store_pristine(sha, data)
+    lock.files[WORKFLOW].output_sha256 = sha
+    lock.files[WORKFLOW].template_hash = "stale"
+    lock.save()
+    path.write_text(user_content(old))
+    return current
+
+
+def _upgrade(**options):
+    return UpgradeCommand(Config(**options)).execute([])
+
+
+def test_find_projects_skips_nested_and_hidden(tmp_path):
+    for rel in ["a", "group/b", "a/nested", ".hidden/c", "node_modules/d"]:
+        (tmp_path / rel).mkdir(parents=True)
+        (tmp_path / rel / LOCKFILE_NAME).write_text("{}")
+    (tmp_path / "e").mkdir()
+    (tmp_path / "e" / "restack.toml").write_text("")
+    assert find_projects(tmp_path) == [
+        tmp_path / "a",
+        tmp_path / "e",
+        tmp_path / "group/b",
+    ]
+
+
+def test_upgrade_merges_template_change_into_edited_file(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    new_render = _age(root, "# old header\n", lambda old: old + "# mine\n")
+
+    assert _upgrade(cwd=root) == 0
+    assert "1 merged" in capsys.readouterr().out
+    assert (root / WORKFLOW).read_text() == new_render + "# mine\n"
+    # The new render, not the merged file, is the next merge base
+    entry = GenerationLock.load(root).files[WORKFLOW]
+    assert entry.output_sha256 == hashlib.sha256(new_render.encode()).hexdigest()
+    assert GenerationLock.load(root).read_pristine(entry.output_sha256) == new_render
+
+
+def test_upgrade_reports_conflicts(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    _age(
+        root,
+        "# old header\n",
+        lambda old: "# my header\n" + old.split("\n", 1)[1],
+    )
+    before = (root / WORKFLOW).read_text()
+
+    assert _upgrade(cwd=root, dry_run=True) == 1
+    assert (root / WORKFLOW).read_text() == before
+    assert _upgrade(cwd=root) == 1
+    out = capsys.readouterr().out
+    assert f"CONFLICT  {WORKFLOW}" in out
+    text = (root / WORKFLOW).read_text()
+    assert "<<<<<<< current\n# my header\n" in text
+    assert "||||||| base\n# old header\n" in text
+
+
+def test_upgrade_without_merge_base_skips_edits(tmp_path, capsys):
+    root = _new_app(tmp_path)
+    _age(root, "# old header\n", lambda old: old + "# mine\n")
+    lock = GenerationLock.load(root)
+    (lock.pristine_dir / lock.files[WORKFLOW].output_sha256[:2]).rename(
+        tmp_path / "gone"
+    )
+
+    assert _upgrade(cwd=root) == 0
+    assert "no merge base" in capsys.readouterr().out
+    assert (root / WORKFLOW).read_text().endswith("# mine\n")
+
+
+def test_upgrade_workspace_in_parallel(tmp_path, capsys):
+    one = _new_app(tmp_path, "one")
+    two = _new_app(tmp_path, "two")
+    (tmp_path / "legacy").mkdir()
+    (tmp_path / "legacy" / "restack.toml").write_text("")
+    rendered = _age(one, "# old\n", lambda old: old)
+
+    assert _upgrade(workspace=tmp_path, jobs=2) == 0
+    out = capsys.readouterr().out
+    assert "legacy: skipped, no .restack-gen.lock" in out
+    assert "Upgraded 2 of 3 project(s): 1 file(s) updated, 0 merged, 1 skipped" in out
+    assert (one / WORKFLOW).read_text() == rendered
+    assert (
+        file_sha256(two / WORKFLOW)
+        == GenerationLock.load(two).files[WORKFLOW].output_sha256
+    )
+
+
+def test_upgrade_requires_project(tmp_path, capsys):
+    assert _upgrade(cwd=tmp_path) == 1
+    assert "--workspace" in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import io
+import threading
+
+from restack_gen.cli import ConcurrentProjectCreator, ExitCode
+from restack_gen.constants import Config
+from restack_gen.core.workers import AdaptiveLimit, create_project
+from restack_gen.utils.console import capture_output
+
+
+def test_capture_output_only_captures_current_thread(capsys):
+    buffer = io.StringIO()
+
+    def other():
+        print("from other thread")
+
+    with capture_output(buffer):
+        print("captured")
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+    print("after")
+    assert buffer.getvalue() == "captured\n"
+    assert capsys.readouterr().out == "from other thread\nafter\n"
+
+
+def test_create_project_returns_output(tmp_path, capsys):
+    result = create_project(Config(cwd=tmp_path), "app")
+    assert result.exit_code == 0 and result.seconds > 0
+    assert "Created new Restack app: app" in result.output
+    assert capsys.readouterr().out == ""
+
+
+def test_adaptive_limit_grows_then_backs_off():
+    limit = AdaptiveLimit(16, initial=4)
+    # Latency flat while concurrency grows: throughput improves
+    for _ in range(4):
+        limit.record(1.0)
+    assert limit.limit == 5
+    for _ in range(5):
+        limit.record(1.0)
+    assert limit.limit == 6
+    # Latency doubles: throughput drops, so the limit turns around
+    for _ in range(6):
+        limit.record(2.0)
+    assert limit.limit == 5
+    assert limit.completed == 15
+
+
+def test_fixed_limit_does_not_adapt():
+    limit = AdaptiveLimit(3, adaptive=False)
+    for _ in range(10):
+        limit.record(0.5)
+    assert limit.limit == 3
+    assert limit.mean_latency == 0.5
+
+
+def test_process_executor_creates_projects(tmp_path, capsys):
+    config = Config(cwd=tmp_path, executor="process", jobs=2, quiet=True)
+    rc = ConcurrentProjectCreator(config).create_projects(["one", "two", "three"])
+    assert rc == ExitCode.SUCCESS
+    for name in ("one", "two", "three"):
+        assert (tmp_path / name / "README.md").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["one", "three", "two"]
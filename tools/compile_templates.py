@@ -0,0 +1,30 @@
+"""Precompile the built-in template packs into importable modules.
+
+Usage: python tools/compile_templates.py [TEMPLATES_ROOT] [TARGET_ROOT]
+
+Writes restack_gen/_compiled_templates/<lang>/ by default. The release
+workflow runs this before building the wheel.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from restack_gen.core.compiled import COMPILED_ROOT, compile_all
+from restack_gen.core.templates import TEMPLATES_ROOT
+
+
+def main():
+    templates_root = Path(sys.argv[1]) if len(sys.argv) > 1 else TEMPLATES_ROOT
+    target_root = Path(sys.argv[2]) if len(sys.argv) > 2 else COMPILED_ROOT
+    if not templates_root.is_dir():
+        print(f"Templates directory not found: {templates_root}")
+        return 1
+    for lang, count in compile_all(templates_root, target_root).items():
+        print(f"Compiled {count} template(s) for {lang} -> {target_root / lang}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())